@@ -5,9 +5,14 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 from backend.services.minio_client import minio_client, MINIO_ENDPOINT, BUCKET_NAME
 from backend.services.dataset_manager import dataset_manager
+from backend.services.job_manager import job_manager
+from backend.services.upload_sessions import UploadSessionError, UploadSessionNotFound, upload_sessions
+from backend.services.zip_stream import ZipMember, object_fetcher, stream_zip
 from pydantic import BaseModel
 from typing import Optional
+from io import BytesIO
 import uvicorn
+import asyncio
 import shutil
 import os
 import secrets
@@ -102,6 +107,12 @@ async def api_key_guard(request: Request, call_next):
         )
     return await call_next(request)
 
+
+@app.on_event("startup")
+def start_metadata_compactor():
+    # Folds {split}/_deltas/*.jsonl written by uploads into metadata.csv.
+    dataset_manager.store.start_compactor()
+
 class TranscriptionUpdate(BaseModel):
     bucket_name: str
     split: str
@@ -190,18 +201,82 @@ def clone_bucket(req: CloneBucketRequest):
         # 1. Create new bucket
         minio_client.create_bucket(req.new_bucket_name)
         
-        # 2. Clone contents
-        count = dataset_manager.clone_bucket(req.source_bucket, req.new_bucket_name)
-        
-        return {"status": "success", "message": f"Cloned {count} objects to {req.new_bucket_name}"}
+        # 2. Clone contents in the background; poll /api/jobs/{job_id}
+        def run(ctx):
+            count = dataset_manager.clone_bucket(
+                req.source_bucket, req.new_bucket_name,
+                progress=ctx.progress, cancel_event=ctx.cancel_event,
+            )
+            return {"cloned_count": count}
+
+        job = job_manager.submit("clone", run, f"{req.source_bucket} -> {req.new_bucket_name}")
+        return {"status": "accepted", "job_id": job.id, "message": f"Cloning {req.source_bucket} to {req.new_bucket_name}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/jobs")
+def list_jobs(active: bool = False):
+    return {"jobs": job_manager.list_jobs(active_only=active)}
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.post("/api/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    if job_manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not job_manager.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+    return {"status": "success", "message": "Cancellation requested"}
+
 @app.get("/api/dataset/{bucket}/{split}")
-def get_dataset(bucket: str, split: str, page: int = 1, limit: int = 50, search: Optional[str] = None):
-    result = dataset_manager.get_dataset(bucket, split, page, limit, search)
+def get_dataset(bucket: str, split: str, page: int = 1, limit: int = 50, search: Optional[str] = None,
+                tags: Optional[str] = None, tag_mode: str = "and"):
+    # tags: comma separated; tag_mode: "and" (all tags) or "or" (any tag)
+    if tag_mode not in ("and", "or"):
+        raise HTTPException(status_code=400, detail="tag_mode must be 'and' or 'or'")
+    tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else None
+    result = dataset_manager.get_dataset(bucket, split, page, limit, search, tags=tag_list, tag_mode=tag_mode)
     return result
 
+@app.post("/api/dataset/{bucket}/{split}/compact")
+def compact_dataset(bucket: str, split: str):
+    try:
+        folded = dataset_manager.compact(bucket, split)
+        return {"status": "success", "folded_deltas": folded}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _compact_before_job(bucket: str, splits) -> None:
+    """Jobs that read metadata.csv directly (training, preprocessing) don't
+    see uncompacted deltas, so fold them in first."""
+    for split in splits:
+        try:
+            dataset_manager.compact(bucket, split)
+        except Exception:
+            logger.warning("Could not compact %s/%s before starting job", bucket, split, exc_info=True)
+
+@app.post("/api/dataset/{bucket}/{split}/probe")
+def probe_dataset_audio(bucket: str, split: str, all_rows: bool = False):
+    """Backfill duration / sample rate / channels / size from audio headers.
+    By default only rows without a duration are probed."""
+    def run(ctx):
+        return dataset_manager.probe_audio(
+            bucket, split, only_missing=not all_rows,
+            progress=ctx.progress, cancel_event=ctx.cancel_event,
+        )
+
+    try:
+        job = job_manager.submit("probe", run, f"{bucket}/{split}: audio headers")
+        return {"status": "accepted", "job_id": job.id}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/dataset/row")
 def update_row(update: TranscriptionUpdate):
     try:
@@ -219,9 +294,16 @@ def update_row(update: TranscriptionUpdate):
 
 @app.post("/api/dataset/batch/delete")
 def batch_delete(req: BatchOperationRequest):
+    def run(ctx):
+        count = dataset_manager.delete_rows(
+            req.bucket_name, req.split, req.file_names,
+            progress=ctx.progress, cancel_event=ctx.cancel_event,
+        )
+        return {"deleted_count": count}
+
     try:
-        count = dataset_manager.delete_rows(req.bucket_name, req.split, req.file_names)
-        return {"status": "success", "deleted_count": count}
+        job = job_manager.submit("delete", run, f"{req.bucket_name}/{req.split}: {len(req.file_names)} rows")
+        return {"status": "accepted", "job_id": job.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -235,55 +317,60 @@ def batch_add_tag(req: BatchTagRequest):
 
 @app.post("/api/dataset/batch/copy")
 def batch_copy(req: BatchCopyRequest):
+    def run(ctx):
+        count = dataset_manager.copy_rows(
+            req.bucket_name, req.target_bucket, req.split, req.file_names,
+            progress=ctx.progress, cancel_event=ctx.cancel_event,
+        )
+        return {"copied_count": count}
+
     try:
-        count = dataset_manager.copy_rows(req.bucket_name, req.target_bucket, req.split, req.file_names)
-        return {"status": "success", "copied_count": count}
+        job = job_manager.submit(
+            "copy", run, f"{req.bucket_name}/{req.split} -> {req.target_bucket}: {len(req.file_names)} rows"
+        )
+        return {"status": "accepted", "job_id": job.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.post("/api/dataset/batch/download")
 def batch_download(req: BatchOperationRequest):
-    """Download selected audio files and their metadata as a ZIP archive."""
+    """Download selected audio files and their metadata as a ZIP archive.
+
+    The archive is streamed: audio objects are fetched a few at a time ahead
+    of the writer and ZIP bytes are sent as soon as they are produced."""
     import zipfile
-    from io import BytesIO
 
     try:
-        buf = BytesIO()
         rows = dataset_manager.get_rows_metadata(req.bucket_name, req.split, req.file_names)
 
-        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
-            # Write metadata CSV
-            csv_lines = ["file_name,transcription,tags,description"]
-            for row in rows:
-                # Escape fields for CSV
-                fields = [
-                    row.get("file_name", ""),
-                    row.get("transcription", ""),
-                    row.get("tags", ""),
-                    row.get("description", ""),
-                ]
-                csv_lines.append(",".join(
-                    f'"{f.replace(chr(34), chr(34)+chr(34))}"' for f in fields
-                ))
-            zf.writestr("metadata.csv", "\n".join(csv_lines))
-
-            # Write audio files
-            for row in rows:
-                fname = row.get("file_name", "")
-                object_name = f"{req.split}/audio/{fname}"
-                try:
-                    resp = minio_client.get_object(req.bucket_name, object_name)
-                    zf.writestr(f"audio/{fname}", resp.read())
-                    resp.close()
-                    resp.release_conn()
-                except Exception:
-                    logger.warning("Skipping %s during batch download", fname, exc_info=True)
-
-        buf.seek(0)
+        # Write metadata CSV
+        csv_lines = ["file_name,transcription,tags,description"]
+        for row in rows:
+            # Escape fields for CSV
+            fields = [
+                row.get("file_name", ""),
+                row.get("transcription", ""),
+                row.get("tags", ""),
+                row.get("description", ""),
+            ]
+            csv_lines.append(",".join(
+                f'"{f.replace(chr(34), chr(34)+chr(34))}"' for f in fields
+            ))
+        csv_bytes = "\n".join(csv_lines).encode("utf-8")
+        members = [ZipMember("metadata.csv", lambda: (BytesIO(csv_bytes), len(csv_bytes)), zipfile.ZIP_DEFLATED)]
+
+        # Audio is already compressed (or incompressible PCM); store it as-is.
+        for row in rows:
+            fname = row.get("file_name", "")
+            members.append(ZipMember(
+                f"audio/{fname}",
+                object_fetcher(minio_client, req.bucket_name, f"{req.split}/audio/{fname}"),
+            ))
+
         archive_name = f"{req.bucket_name}_{req.split}_selected.zip"
         return StreamingResponse(
-            buf,
+            stream_zip(members),
             media_type="application/zip",
             headers={"Content-Disposition": f'attachment; filename="{archive_name}"'},
         )
@@ -302,7 +389,8 @@ async def upload_audio(
 ):
     try:
         content = await file.read()
-        dataset_manager.add_audio_record(
+        await asyncio.to_thread(
+            dataset_manager.add_audio_record,
             bucket,
             split,
             file.filename,
@@ -324,17 +412,74 @@ async def upload_bulk(
 ):
     try:
         csv_content = await csv_file.read()
-        count = await dataset_manager.add_bulk_records(
+        result = await dataset_manager.add_bulk_records(
             bucket,
             split,
             files,
             csv_content
         )
-        return {"status": "success", "count": count}
+        return {"status": "success", **result}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Resumable chunked uploads: init -> PUT parts -> commit (see upload_sessions.py)
+class UploadSessionFile(BaseModel):
+    file_name: str
+    size: int
+
+class UploadSessionInit(BaseModel):
+    bucket: str
+    split: str
+    files: list[UploadSessionFile]
+    metadata_csv: str
+
+
+def _upload_session_call(fn, *args):
+    try:
+        return fn(*args)
+    except UploadSessionNotFound:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    except UploadSessionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Upload session request failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/upload/sessions")
+def init_upload_session(req: UploadSessionInit):
+    return _upload_session_call(
+        upload_sessions.init,
+        req.bucket,
+        req.split,
+        [{"file_name": f.file_name, "size": f.size} for f in req.files],
+        req.metadata_csv.encode("utf-8"),
+    )
+
+@app.get("/api/upload/sessions/{session_id}")
+def get_upload_session(session_id: str, bucket: str):
+    return _upload_session_call(upload_sessions.status, bucket, session_id)
+
+@app.put("/api/upload/sessions/{session_id}/parts")
+async def upload_session_part(session_id: str, request: Request, bucket: str, file_name: str, part_number: int):
+    # The part body is the raw request body (at most one part size); it is
+    # forwarded to MinIO from a worker thread.
+    data = await request.body()
+    return await asyncio.to_thread(
+        _upload_session_call, upload_sessions.upload_part, bucket, session_id, file_name, part_number, data
+    )
+
+@app.post("/api/upload/sessions/{session_id}/commit")
+def commit_upload_session(session_id: str, bucket: str):
+    result = _upload_session_call(upload_sessions.commit, bucket, session_id)
+    return {"status": "success", **result}
+
+@app.delete("/api/upload/sessions/{session_id}")
+def abort_upload_session(session_id: str, bucket: str):
+    _upload_session_call(upload_sessions.abort, bucket, session_id)
+    return {"status": "success"}
+
+
 
 from backend.services.system_monitor import system_monitor
 
@@ -342,6 +487,11 @@ from backend.services.system_monitor import system_monitor
 def get_system_stats():
     return system_monitor.get_stats()
 
+@app.get("/api/system/metadata-cache")
+def get_metadata_cache_stats():
+    """Hit/miss counters of the shared metadata.csv cache."""
+    return dataset_manager.cache.stats()
+
 from backend.services.training_manager import training_manager
 
 class TrainingConfig(BaseModel):
@@ -366,6 +516,8 @@ class TrainingConfig(BaseModel):
 @app.post("/api/train/start")
 def start_training(config: TrainingConfig):
     try:
+        if config.bucket_name:
+            _compact_before_job(config.bucket_name, ("train", "test"))
         training_manager.start_training(config.dict())
         return {"status": "success", "message": "Training started"}
     except Exception as e:
@@ -456,6 +608,14 @@ class PreprocessLongAudioRequest(BaseModel):
     confidence_threshold: float = 0.7
     whisper_model: str = "small"
     language: str = "zh"
+    # Only reprocess source rows that are new or changed since the last run.
+    resume: bool = True
+    # Whisper worker processes, each with its own model and cores/workers threads.
+    workers: int = 1
+    # >1 decodes that many 30s windows per pass (faster-whisper batched pipeline).
+    whisper_batch_size: int = 1
+    # Longer files are decoded and chunked block by block (bounded memory); -1 never.
+    stream_above_sec: float = 1800.0
 
 
 @app.post("/api/dataset/preprocess-long-audio")
@@ -463,6 +623,7 @@ def preprocess_long_audio(req: PreprocessLongAudioRequest):
     """Queue a job that splits >25s audio into chunks with aligned transcripts.
     Progress is exposed through the same /api/train/status endpoint as training."""
     try:
+        _compact_before_job(req.source_bucket, [s.strip() for s in req.splits.split(",") if s.strip()])
         training_manager.start_preprocess_task(
             source_bucket=req.source_bucket,
             target_bucket=req.target_bucket,
@@ -472,6 +633,10 @@ def preprocess_long_audio(req: PreprocessLongAudioRequest):
             confidence_threshold=req.confidence_threshold,
             whisper_model=req.whisper_model,
             language=req.language,
+            resume=req.resume,
+            workers=req.workers,
+            whisper_batch_size=req.whisper_batch_size,
+            stream_above_sec=req.stream_above_sec,
         )
         return {"status": "success", "message": "Preprocess task started"}
     except (ValueError, RuntimeError) as e:
@@ -503,6 +668,13 @@ async def sse_events():
             except Exception:
                 logger.warning("Error getting training status", exc_info=True)
 
+            # 3. Background jobs (clone / copy / delete)
+            try:
+                jobs = job_manager.list_jobs()
+                yield f"event: jobs\ndata: {json.dumps(jobs)}\n\n"
+            except Exception:
+                logger.warning("Error getting job status", exc_info=True)
+
             await asyncio.sleep(2)
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Character alignment backends for audio_chunker.
+
+`get_opcodes(a, b)` returns difflib-style opcodes
+(`(tag, i1, i2, j1, j2)` with tags equal / replace / delete / insert,
+covering both strings left to right), so callers do not care which engine
+produced them:
+
+  - "difflib":  `difflib.SequenceMatcher(autojunk=False)`. Exact longest-
+                match recursion, but quadratic: an hour of transcript
+                (~15k chars a side) takes seconds to minutes.
+  - "anchored": exact-match anchors (k-grams unique in both strings, chained
+                by a longest increasing subsequence and extended char by
+                char), then a banded edit distance — vectorized row by row
+                with NumPy — inside each gap between anchors. Gaps are
+                re-anchored with shorter k-grams first, so the DP only ever
+                sees short stretches. Near-linear on real transcripts.
+  - "auto":     difflib for short inputs, where it is fast and exact;
+                anchored above AUTO_MAX_CHARS.
+
+Select with `ALIGNMENT_BACKEND` (default auto) or per call.
+"""
+from __future__ import annotations
+
+import bisect
+import difflib
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+ALIGNMENT_BACKEND = os.getenv("ALIGNMENT_BACKEND", "auto").strip().lower()
+BACKENDS = ("auto", "difflib", "anchored")
+# len(a) + len(b) up to which "auto" keeps difflib.
+AUTO_MAX_CHARS = 2000
+
+Opcode = Tuple[str, int, int, int, int]
+
+# Anchor k-gram lengths, longest first; a gap without anchors at one length
+# is retried with the next.
+_ANCHOR_KS = (8, 4, 2, 1)
+# Gaps up to this many DP cells skip anchoring and go straight to the DP.
+_DIRECT_DP_CELLS = 64 * 64
+# Half-width of the DP band around the gap's diagonal (widened to fit any
+# length difference between the two sides).
+_BAND = 64
+
+
+def get_opcodes(a: str, b: str, backend: Optional[str] = None) -> List[Opcode]:
+    backend = (backend or ALIGNMENT_BACKEND).lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown alignment backend {backend!r}; expected one of {BACKENDS}")
+    if backend == "auto":
+        backend = "difflib" if len(a) + len(b) <= AUTO_MAX_CHARS else "anchored"
+    if backend == "difflib":
+        return difflib.SequenceMatcher(a=a, b=b, autojunk=False).get_opcodes()
+    return anchored_opcodes(a, b)
+
+
+def anchored_opcodes(a: str, b: str) -> List[Opcode]:
+    pairs: List[Tuple[int, int]] = []  # matched (i, j) positions, increasing
+    _align(a, b, 0, len(a), 0, len(b), 0, pairs)
+    return _pairs_to_opcodes(pairs, len(a), len(b))
+
+
+# ---------------------------------------------------------------------------
+# Anchors
+# ---------------------------------------------------------------------------
+
+
+def _unique_kgrams(text: str, start: int, end: int, k: int) -> Dict[str, int]:
+    seen: Dict[str, int] = {}
+    for pos in range(start, end - k + 1):
+        gram = text[pos:pos + k]
+        seen[gram] = -1 if gram in seen else pos
+    return {gram: pos for gram, pos in seen.items() if pos >= 0}
+
+
+def _anchors(a: str, b: str, a0: int, a1: int, b0: int, b1: int, k: int) -> List[Tuple[int, int, int]]:
+    """Non-overlapping exact matches `(i, j, size)` inside the gap, in order:
+    k-grams unique on both sides, chained by a longest increasing subsequence
+    of their b positions, then merged and extended over equal neighbours."""
+    in_a = _unique_kgrams(a, a0, a1, k)
+    in_b = _unique_kgrams(b, b0, b1, k)
+    common = sorted((i, in_b[gram]) for gram, i in in_a.items() if gram in in_b)
+    if not common:
+        return []
+
+    # Patience-style LIS over j (the pairs are already sorted by i).
+    tails: List[int] = []
+    tail_idx: List[int] = []
+    prev = [-1] * len(common)
+    for idx, (_i, j) in enumerate(common):
+        pos = bisect.bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+        prev[idx] = tail_idx[pos - 1] if pos else -1
+    chain = []
+    idx = tail_idx[-1]
+    while idx >= 0:
+        chain.append(common[idx])
+        idx = prev[idx]
+    chain.reverse()
+
+    blocks: List[Tuple[int, int, int]] = []
+    for i, j in chain:
+        if blocks:
+            bi, bj, size = blocks[-1]
+            if i - bi == j - bj and i <= bi + size:  # overlapping k-grams on one diagonal
+                blocks[-1] = (bi, bj, max(size, i + k - bi))
+                continue
+            if i < bi + size or j < bj + size:
+                continue
+        blocks.append((i, j, k))
+
+    out = []
+    lo_a, lo_b = a0, b0
+    for n, (i, j, size) in enumerate(blocks):
+        hi_a = blocks[n + 1][0] if n + 1 < len(blocks) else a1
+        hi_b = blocks[n + 1][1] if n + 1 < len(blocks) else b1
+        while i > lo_a and j > lo_b and a[i - 1] == b[j - 1]:
+            i, j, size = i - 1, j - 1, size + 1
+        while i + size < hi_a and j + size < hi_b and a[i + size] == b[j + size]:
+            size += 1
+        out.append((i, j, size))
+        lo_a, lo_b = i + size, j + size
+    return out
+
+
+def _align(a: str, b: str, a0: int, a1: int, b0: int, b1: int, level: int,
+           pairs: List[Tuple[int, int]]) -> None:
+    """Append the matched positions of a[a0:a1] vs b[b0:b1] to `pairs`."""
+    # Common prefix / suffix never need the DP.
+    while a0 < a1 and b0 < b1 and a[a0] == b[b0]:
+        pairs.append((a0, b0))
+        a0, b0 = a0 + 1, b0 + 1
+    suffix = []
+    while a1 > a0 and b1 > b0 and a[a1 - 1] == b[b1 - 1]:
+        a1, b1 = a1 - 1, b1 - 1
+        suffix.append((a1, b1))
+    if a0 < a1 and b0 < b1:
+        if (a1 - a0) * (b1 - b0) <= _DIRECT_DP_CELLS or level >= len(_ANCHOR_KS):
+            pairs.extend(_banded_matches(a, b, a0, a1, b0, b1))
+        else:
+            blocks = _anchors(a, b, a0, a1, b0, b1, _ANCHOR_KS[level])
+            if not blocks:
+                _align(a, b, a0, a1, b0, b1, level + 1, pairs)
+            else:
+                lo_a, lo_b = a0, b0
+                for i, j, size in blocks:
+                    _align(a, b, lo_a, i, lo_b, j, level, pairs)
+                    pairs.extend((i + d, j + d) for d in range(size))
+                    lo_a, lo_b = i + size, j + size
+                _align(a, b, lo_a, a1, lo_b, b1, level, pairs)
+    pairs.extend(reversed(suffix))
+
+
+# ---------------------------------------------------------------------------
+# Banded edit distance
+# ---------------------------------------------------------------------------
+
+
+def _codes(text: str) -> np.ndarray:
+    return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+
+
+def _banded_matches(a: str, b: str, a0: int, a1: int, b0: int, b1: int) -> List[Tuple[int, int]]:
+    """Insert/delete edit distance (so the most characters are matched, as
+    in an LCS) of a[a0:a1] vs b[b0:b1], restricted to a band around the
+    diagonal; returns the matched positions. Each DP row is computed with
+    NumPy: the match / deletion candidates are elementwise, and the in-row
+    insertion chain is a running minimum (`D[j] = min_k<=j (T[k] + j - k)`)."""
+    x, y = _codes(a[a0:a1]), _codes(b[b0:b1])
+    n, m = len(x), len(y)
+    width = max(_BAND, abs(n - m) + 1)
+    inf = np.float64(np.inf)
+
+    los, rows = [], []
+    lo, hi = 0, min(m, width)
+    row = np.arange(lo, hi + 1, dtype=np.float64)
+    los.append(lo)
+    rows.append(row)
+    for i in range(1, n + 1):
+        centre = (i * m) // n
+        lo, hi = max(0, centre - width), min(m, centre + width)
+        cols = np.arange(lo, hi + 1)
+        prev_lo, prev = los[-1], rows[-1]
+
+        up = np.full(len(cols), inf)
+        k = cols - prev_lo
+        ok = (k >= 0) & (k < len(prev))
+        up[ok] = prev[k[ok]] + 1
+
+        diag = np.full(len(cols), inf)
+        k = cols - 1 - prev_lo
+        ok = (cols >= 1) & (k >= 0) & (k < len(prev))
+        diag[ok] = np.where(y[cols[ok] - 1] == x[i - 1], prev[k[ok]], inf)
+
+        best = np.minimum(up, diag)
+        row = np.minimum.accumulate(best - cols) + cols
+        los.append(lo)
+        rows.append(row)
+
+    def cell(r: int, c: int) -> float:
+        k = c - los[r]
+        return rows[r][k] if 0 <= k < len(rows[r]) else inf
+
+    matches = []
+    i, j = n, m
+    while i > 0 and j > 0:
+        here = cell(i, j)
+        if x[i - 1] == y[j - 1] and cell(i - 1, j - 1) == here:
+            matches.append((a0 + i - 1, b0 + j - 1))
+            i, j = i - 1, j - 1
+        elif cell(i - 1, j) + 1 == here:
+            i -= 1
+        else:
+            j -= 1
+    matches.reverse()
+    return matches
+
+
+def _pairs_to_opcodes(pairs: List[Tuple[int, int]], n: int, m: int) -> List[Opcode]:
+    """Matched positions -> opcodes: runs of consecutive matches are
+    `equal`, the stretch between two runs is one replace / delete / insert
+    (as difflib groups them)."""
+    ops: List[Opcode] = []
+    i = j = 0
+    idx = 0
+    while idx < len(pairs):
+        pi, pj = pairs[idx]
+        if pi > i or pj > j:
+            tag = "replace" if pi > i and pj > j else ("delete" if pi > i else "insert")
+            ops.append((tag, i, pi, j, pj))
+        run = 1
+        while idx + run < len(pairs) and pairs[idx + run] == (pi + run, pj + run):
+            run += 1
+        ops.append(("equal", pi, pi + run, pj, pj + run))
+        i, j = pi + run, pj + run
+        idx += run
+    if i < n or j < m:
+        tag = "replace" if i < n and j < m else ("delete" if i < n else "insert")
+        ops.append((tag, i, n, j, m))
+    return ops
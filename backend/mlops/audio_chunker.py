@@ -12,12 +12,18 @@ ground-truth transcript to match each sub-segment.
 Pipeline:
   1) Run silero-vad to find speech segments.
   2) Greedy-merge segments into chunks ≤ max_chunk_sec.
-  3) Run faster-whisper with word-level timestamps on the full audio.
+  3) Run faster-whisper with word-level timestamps on the full audio
+     (optionally batched over 30s windows, see transcribe_batch).
   4) For each chunk, gather whisper words inside its time window.
   5) Char-level align Whisper's full output to the ground-truth transcript
-     (difflib.SequenceMatcher) and read off the GT slice for each chunk.
-  6) Score each chunk (matching char ratio); flag low-confidence chunks for
-     manual review instead of training on them.
+     (see alignment.get_opcodes: difflib for short texts, an anchored
+     banded aligner for long ones) and read off the GT slice for each chunk.
+  6) Score each chunk (matching char ratio, counted from the same global
+     alignment); flag low-confidence chunks for manual review instead of
+     training on them.
+
+StreamingChunker runs the same pipeline on audio that arrives in blocks,
+window by window, so long recordings never have to sit in memory whole.
 
 Heavy ML deps (silero-vad, faster-whisper) are lazy-imported so the pure
 alignment logic remains unit-testable without GPU/model downloads.
@@ -26,13 +32,18 @@ alignment logic remains unit-testable without GPU/model downloads.
 from __future__ import annotations
 
 import difflib
+import hashlib
+import json
 import logging
+import os
 import re
 from dataclasses import dataclass, field
-from typing import List, Optional, Sequence, Tuple
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 
+from backend.mlops.alignment import get_opcodes
+
 logger = logging.getLogger(__name__)
 
 # Whisper's hard limit is 30s; we leave 5s of headroom so VAD jitter / word
@@ -40,6 +51,10 @@ logger = logging.getLogger(__name__)
 DEFAULT_MAX_CHUNK_SEC = 25.0
 DEFAULT_MIN_CHUNK_SEC = 1.0
 DEFAULT_CONFIDENCE_THRESHOLD = 0.7
+# Whisper windows decoded together by transcribe_batch(); 1 = one at a time.
+DEFAULT_WHISPER_BATCH_SIZE = 1
+# Audio handed to Whisper per call by StreamingChunker.
+DEFAULT_STREAM_WINDOW_SEC = 60.0
 
 # Punctuation we strip before alignment. Whisper output and human transcripts
 # disagree on punctuation in Chinese, but we keep it in the final output.
@@ -54,6 +69,19 @@ _PUNCT_RE = re.compile(
 # codepoints and confidence collapses. We normalize both sides to Simplified
 # *only* for matching — the original Traditional characters are preserved in
 # the final output via norm_to_orig mapping.
+#
+# OpenCC's convert() costs microseconds per call, and normalization runs over
+# every chunk plus the whole GT, so instead of one call per character we
+# apply a codepoint table with str.translate. The table is a dict whose
+# misses ask OpenCC once and remember the answer; with T2S_TABLE_CACHE set,
+# the CJK blocks are converted up front and the table is kept on disk.
+T2S_TABLE_CACHE = os.getenv("T2S_TABLE_CACHE", "")
+
+# CJK Extension A, Unified Ideographs, Compatibility Ideographs.
+_CJK_RANGES = ((0x3400, 0x4DC0), (0x4E00, 0xA000), (0xF900, 0xFB00))
+_T2S_CACHE_VERSION = 1
+
+
 def _make_t2s_converter():
     try:
         from opencc import OpenCC  # noqa: WPS433
@@ -62,21 +90,88 @@ def _make_t2s_converter():
         return None
 
 
+class T2STable(dict):
+    """codepoint -> Simplified codepoint, for `str.translate`. Codepoints
+    inside `covered` ranges that are absent map to themselves without asking
+    OpenCC. Every answer, identity included, is memoized so the next
+    translate never leaves C; only the changes are written to disk."""
+
+    def __init__(self, convert, entries=None, covered=()):
+        super().__init__(entries or {})
+        self.convert = convert
+        self.covered = tuple(tuple(r) for r in covered)
+
+    def __missing__(self, code: int) -> int:
+        for lo, hi in self.covered:
+            if lo <= code < hi:
+                self[code] = code
+                return code
+        converted = self.convert(chr(code))
+        # OpenCC may return a multi-char string for some Traditional chars
+        # (e.g., compound characters). Take the first char so we keep 1:1.
+        value = ord(converted[0]) if converted else code
+        self[code] = value
+        return value
+
+    @classmethod
+    def precomputed(cls, convert, ranges=_CJK_RANGES) -> "T2STable":
+        table = cls(convert)
+        for lo, hi in ranges:
+            for code in range(lo, hi):
+                table[code]  # noqa: B018 - fills the memo
+        table.covered = tuple(ranges)
+        return table
+
+    def changes(self) -> dict:
+        """The non-identity entries; identities are implied by `covered`."""
+        return {code: value for code, value in self.items() if code != value}
+
+
+def _converter_fingerprint(convert) -> str:
+    """Changes when OpenCC's dictionaries do: a sample of the CJK block."""
+    sample = "".join(chr(code) for code in range(0x4E00, 0xA000, 97))
+    return hashlib.sha1("".join(convert(ch) for ch in sample).encode("utf-8")).hexdigest()
+
+
+def load_t2s_table(convert, cache_path: str = "") -> Optional[T2STable]:
+    """The T→S table for `convert` (None without OpenCC). With `cache_path`,
+    reuse the table stored there if it was built by the same dictionaries,
+    else precompute it and write it back."""
+    if convert is None:
+        return None
+    if not cache_path:
+        return T2STable(convert)
+    fingerprint = _converter_fingerprint(convert)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") == _T2S_CACHE_VERSION and data.get("fingerprint") == fingerprint:
+            entries = {int(k): v for k, v in data["table"].items()}
+            return T2STable(convert, entries, data["covered"])
+    except (OSError, ValueError, KeyError):
+        pass
+    table = T2STable.precomputed(convert)
+    try:
+        tmp = f"{cache_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": _T2S_CACHE_VERSION, "fingerprint": fingerprint,
+                       "covered": table.covered, "table": table.changes()}, f)
+        os.replace(tmp, cache_path)
+    except OSError as e:
+        logger.warning("Could not write T2S table cache %s: %s", cache_path, e)
+    return table
+
+
 _T2S = _make_t2s_converter()
+_T2S_TABLE = load_t2s_table(_T2S, T2S_TABLE_CACHE)
 
 
 def _t2s_per_char(text: str) -> str:
     """Convert text Traditional→Simplified character by character so output
     length matches input length (alignment indices stay valid)."""
-    if not _T2S or not text:
+    if _T2S_TABLE is None or not text:
         return text or ""
-    out = []
-    for ch in text:
-        converted = _T2S(ch)
-        # OpenCC may return a multi-char string for some Traditional chars
-        # (e.g., compound characters). Take the first char so we keep 1:1.
-        out.append(converted[:1] if converted else ch)
-    return "".join(out)
+    return text.translate(_T2S_TABLE)
 
 
 @dataclass(frozen=True)
@@ -98,6 +193,54 @@ class WhisperWord:
     end_sec: float
 
 
+class WhisperWords:
+    """Array-backed sequence of WhisperWord: one list of texts plus start /
+    end arrays, instead of one object per token (an hour of Chinese speech
+    is tens of thousands of them). Indexing yields WhisperWord; slicing
+    yields a WhisperWords view."""
+
+    __slots__ = ("texts", "starts", "ends", "_midpoints")
+
+    def __init__(self, texts: Sequence[str], starts, ends):
+        self.texts = list(texts)
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.ends = np.asarray(ends, dtype=np.float64)
+        self._midpoints: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_words(cls, words: Iterable[WhisperWord]) -> "WhisperWords":
+        if isinstance(words, WhisperWords):
+            return words
+        words = list(words)
+        return cls([w.text for w in words], [w.start_sec for w in words], [w.end_sec for w in words])
+
+    @property
+    def midpoints(self) -> np.ndarray:
+        if self._midpoints is None:
+            self._midpoints = (self.starts + self.ends) / 2.0
+        return self._midpoints
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, idx: Union[int, slice]):
+        if isinstance(idx, slice):
+            return WhisperWords(self.texts[idx], self.starts[idx], self.ends[idx])
+        return WhisperWord(text=self.texts[idx], start_sec=float(self.starts[idx]), end_sec=float(self.ends[idx]))
+
+    def __iter__(self) -> Iterator[WhisperWord]:
+        return (self[i] for i in range(len(self)))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, WhisperWords):
+            return NotImplemented
+        return (self.texts == other.texts and np.array_equal(self.starts, other.starts)
+                and np.array_equal(self.ends, other.ends))
+
+    def __repr__(self) -> str:
+        return f"WhisperWords({len(self)} words)"
+
+
 @dataclass(frozen=True)
 class WhisperSegment:
     """A sentence-level segment as emitted by faster-whisper. Whisper's decoder
@@ -108,7 +251,7 @@ class WhisperSegment:
     start_sec: float
     end_sec: float
     text: str
-    words: Tuple["WhisperWord", ...] = ()
+    words: Sequence["WhisperWord"] = ()  # a WhisperWords view when built by _collect_segments
 
     @property
     def duration(self) -> float:
@@ -314,20 +457,31 @@ def merge_whisper_segments_to_chunks(
     return chunks
 
 
-def _build_alignment_mapping(whisper_text: str, gt_text: str) -> List[int]:
+def _build_alignment_mapping(whisper_text: str, gt_text: str, backend: Optional[str] = None) -> List[int]:
     """Map each position [0..len(whisper_text)] -> position in gt_text.
 
-    Uses difflib.SequenceMatcher opcodes; for non-equal blocks the mapping is
-    distributed linearly so chunk boundaries land in roughly the right place
-    even when Whisper deletes / replaces text relative to GT.
+    Uses difflib-style opcodes from the alignment `backend` (default:
+    ALIGNMENT_BACKEND); for non-equal blocks the mapping is distributed
+    linearly so chunk boundaries land in roughly the right place even when
+    Whisper deletes / replaces text relative to GT.
     """
+    mapping, _matched = _build_alignment(whisper_text, gt_text, backend)
+    return mapping
+
+
+def _build_alignment(whisper_text: str, gt_text: str,
+                     backend: Optional[str] = None) -> Tuple[List[int], np.ndarray]:
+    """`_build_alignment_mapping` plus a prefix count of matched chars:
+    `matched[k]` is how many of whisper_text[:k] sit in an equal block, so
+    any window's match count is one subtraction."""
     n_w = len(whisper_text)
     mapping = [0] * (n_w + 1)
-    sm = difflib.SequenceMatcher(a=whisper_text, b=gt_text, autojunk=False)
-    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+    equal = np.zeros(n_w + 1, dtype=np.int64)
+    for tag, i1, i2, j1, j2 in get_opcodes(whisper_text, gt_text, backend):
         w_len = i2 - i1
         g_len = j2 - j1
         if tag == "equal":
+            equal[i1 + 1:i2 + 1] = 1
             for k in range(w_len + 1):
                 if i1 + k <= n_w:
                     mapping[i1 + k] = j1 + k
@@ -346,11 +500,23 @@ def _build_alignment_mapping(whisper_text: str, gt_text: str) -> List[int]:
             # boundary i1 matters; subsequent opcodes update later indices.
             mapping[i1] = j1
     mapping[n_w] = len(gt_text)
-    return mapping
+    return mapping, np.cumsum(equal)
+
+
+def _window_confidence(matched: int, whisper_len: int, gt_len: int) -> float:
+    """`_confidence` (2·M / total chars, like SequenceMatcher.ratio) with M
+    taken from the global alignment instead of re-aligning the chunk."""
+    if not whisper_len and not gt_len:
+        return 1.0
+    if not whisper_len or not gt_len:
+        return 0.0
+    return 2.0 * min(matched, whisper_len, gt_len) / (whisper_len + gt_len)
 
 
 def _confidence(whisper_chunk: str, gt_chunk: str) -> float:
-    """0.0-1.0 char-overlap ratio. Empty strings return 0.0."""
+    """0.0-1.0 char-overlap ratio. Empty strings return 0.0. Re-aligns the
+    pair from scratch; assign_gt_to_chunks uses `_window_confidence` over
+    the global alignment instead."""
     if not whisper_chunk and not gt_chunk:
         return 1.0  # Both empty — trivially aligned.
     if not whisper_chunk or not gt_chunk:
@@ -358,6 +524,28 @@ def _confidence(whisper_chunk: str, gt_chunk: str) -> float:
     return difflib.SequenceMatcher(a=whisper_chunk, b=gt_chunk, autojunk=False).ratio()
 
 
+def _chunk_word_texts(words: WhisperWords, chunk_boundaries: Sequence[Tuple[float, float]]) -> List[str]:
+    """Concatenated text of the words whose midpoint falls in [start, end)
+    of each chunk, keeping the words' own order. One argsort plus two
+    searchsorted calls instead of a scan over all words per chunk."""
+    bounds = np.asarray(chunk_boundaries, dtype=np.float64).reshape(-1, 2)
+    mids = words.midpoints
+    order = np.argsort(mids, kind="stable")
+    in_order = bool(np.all(order[1:] > order[:-1])) if len(order) else True
+    lo = np.searchsorted(mids[order], bounds[:, 0], side="left")
+    hi = np.searchsorted(mids[order], bounds[:, 1], side="left")
+    texts = words.texts
+    out = []
+    for a, b in zip(lo.tolist(), hi.tolist()):
+        if a >= b:
+            out.append("")
+        elif in_order:
+            out.append("".join(texts[a:b]))
+        else:
+            out.append("".join(texts[i] for i in np.sort(order[a:b]).tolist()))
+    return out
+
+
 def assign_gt_to_chunks(
     whisper_words: Sequence[WhisperWord],
     chunk_boundaries: Sequence[Tuple[float, float]],
@@ -365,29 +553,22 @@ def assign_gt_to_chunks(
 ) -> List[ChunkAssignment]:
     """For each chunk window, slice gt_transcript to match Whisper's words
     inside that window. Char alignment is done once over the full text; per-
-    chunk slices are extracted from the alignment."""
+    chunk slices are extracted from the alignment. `whisper_words` may be a
+    WhisperWords or any sequence of WhisperWord."""
     if not chunk_boundaries:
         return []
 
-    # 1) Build per-chunk Whisper text (raw + normalized).
-    chunk_whisper_raw: List[str] = []
-    chunk_whisper_norm: List[str] = []
-    for t_start, t_end in chunk_boundaries:
-        words_in_chunk = [
-            w.text for w in whisper_words
-            # Word is "in" the chunk if its midpoint falls inside the window.
-            if (w.start_sec + w.end_sec) / 2.0 >= t_start
-            and (w.start_sec + w.end_sec) / 2.0 < t_end
-        ]
-        raw = "".join(words_in_chunk)
-        chunk_whisper_raw.append(raw)
-        chunk_whisper_norm.append(normalize_for_alignment(raw))
+    # 1) Build per-chunk Whisper text (raw + normalized). A word is "in" the
+    #    chunk if its midpoint falls inside the window.
+    chunk_whisper_raw = _chunk_word_texts(WhisperWords.from_words(whisper_words), chunk_boundaries)
+    chunk_whisper_norm = [normalize_for_alignment(raw) for raw in chunk_whisper_raw]
 
     full_whisper_norm = "".join(chunk_whisper_norm)
     gt_norm = normalize_for_alignment(gt_transcript)
 
-    # 2) Map normalized whisper positions -> normalized gt positions.
-    mapping = _build_alignment_mapping(full_whisper_norm, gt_norm)
+    # 2) Map normalized whisper positions -> normalized gt positions. This
+    #    single alignment also scores every chunk (matched-char prefix sums).
+    mapping, matched = _build_alignment(full_whisper_norm, gt_norm)
 
     # 3) For each chunk, read off the gt slice using cumulative whisper
     #    positions, then re-project that slice back into the original
@@ -412,7 +593,9 @@ def assign_gt_to_chunks(
             gt_transcript, norm_to_orig, gt_norm_start, gt_norm_end
         )
 
-        confidence = _confidence(w_norm, gt_slice_norm)
+        confidence = _window_confidence(
+            int(matched[w_end] - matched[w_start]), len(w_norm), len(gt_slice_norm)
+        )
         assignments.append(
             ChunkAssignment(
                 t_start_sec=float(t_start),
@@ -493,9 +676,12 @@ def load_whisper_model(
     model_size: str = "small",
     device: str = "auto",
     compute_type: str = "default",
+    cpu_threads: int = 0,
 ):
     """Load a faster-whisper model. Cache and reuse across many audio files
-    when batch-processing — model load time dominates per-file cost."""
+    when batch-processing — model load time dominates per-file cost.
+    `cpu_threads=0` lets CTranslate2 pick; set it when several models share
+    one machine."""
     from faster_whisper import WhisperModel  # noqa: WPS433  (lazy)
 
     if device == "auto":
@@ -504,7 +690,7 @@ def load_whisper_model(
             device = "cuda" if torch.cuda.is_available() else "cpu"
         except Exception:
             device = "cpu"
-    return WhisperModel(model_size, device=device, compute_type=compute_type)
+    return WhisperModel(model_size, device=device, compute_type=compute_type, cpu_threads=cpu_threads)
 
 
 def transcribe_with_word_timestamps(
@@ -516,7 +702,7 @@ def transcribe_with_word_timestamps(
     model_size: str = "small",
     device: str = "auto",
     compute_type: str = "default",
-) -> List[WhisperWord]:
+) -> WhisperWords:
     """Run faster-whisper to get word-level (in Chinese: char-level) timestamps.
     Pass `model=` to reuse a preloaded WhisperModel across many calls."""
     _segments, words = _transcribe_full(
@@ -536,7 +722,7 @@ def transcribe_with_segments(
     model_size: str = "small",
     device: str = "auto",
     compute_type: str = "default",
-) -> Tuple[List[WhisperSegment], List[WhisperWord]]:
+) -> Tuple[List[WhisperSegment], WhisperWords]:
     """Run faster-whisper and return both segment-level and word-level output.
 
     Segments are sentence-grouped by Whisper's decoder; words carry per-token
@@ -550,6 +736,64 @@ def transcribe_with_segments(
     )
 
 
+def transcribe_batch(
+    audios: Sequence[np.ndarray],
+    sample_rate: int,
+    *,
+    language: str = "zh",
+    model=None,
+    model_size: str = "small",
+    device: str = "auto",
+    compute_type: str = "default",
+    batch_size: int = 8,
+) -> List[Tuple[List[WhisperSegment], WhisperWords]]:
+    """`transcribe_with_segments` for many files: returns one
+    `(segments, words)` per input array, in order.
+
+    Uses faster-whisper's BatchedInferencePipeline, which cuts each file into
+    ≤30s speech windows and decodes `batch_size` of them per forward pass —
+    most of the speed-up for long recordings. Falls back to one sequential
+    `model.transcribe` per file when the pipeline is unavailable (older
+    faster-whisper) or fails on a file."""
+    if sample_rate != 16000:
+        raise ValueError("Pass 16kHz audio.")
+    if model is None:
+        model = load_whisper_model(model_size, device, compute_type)
+
+    pipeline = None
+    if batch_size > 1:
+        try:
+            from faster_whisper import BatchedInferencePipeline  # noqa: WPS433  (lazy)
+            pipeline = BatchedInferencePipeline(model=model)
+        except Exception as e:
+            logger.warning("Batched Whisper unavailable (%s) — transcribing sequentially.", e)
+
+    results = []
+    for audio in audios:
+        audio = audio.astype(np.float32, copy=False)
+        if pipeline is not None:
+            try:
+                raw_segments, _info = pipeline.transcribe(
+                    audio,
+                    language=language,
+                    word_timestamps=True,
+                    # Keep sentence-level segments: chunk boundaries are
+                    # picked from them (see merge_whisper_segments_to_chunks).
+                    without_timestamps=False,
+                    batch_size=batch_size,
+                )
+                results.append(_collect_segments(raw_segments))
+                continue
+            except Exception:
+                logger.warning("Batched Whisper failed — retrying this file sequentially.", exc_info=True)
+        results.append(_transcribe_full(
+            audio, sample_rate,
+            language=language, model=model, model_size=model_size,
+            device=device, compute_type=compute_type,
+        ))
+    return results
+
+
 def _transcribe_full(
     audio: np.ndarray,
     sample_rate: int,
@@ -559,7 +803,7 @@ def _transcribe_full(
     model_size: str,
     device: str,
     compute_type: str,
-) -> Tuple[List[WhisperSegment], List[WhisperWord]]:
+) -> Tuple[List[WhisperSegment], WhisperWords]:
     if sample_rate != 16000:
         raise ValueError("Pass 16kHz audio.")
     if model is None:
@@ -571,27 +815,46 @@ def _transcribe_full(
         word_timestamps=True,
         vad_filter=False,
     )
+    return _collect_segments(raw_segments)
+
 
-    segments: List[WhisperSegment] = []
-    words: List[WhisperWord] = []
+def _collect_segments(raw_segments) -> Tuple[List[WhisperSegment], WhisperWords]:
+    """faster-whisper's lazy segment generator -> our segments plus one
+    WhisperWords for the whole file (segments hold views into it)."""
+    bounds: List[Tuple[float, float, str, int, int]] = []
+    texts: List[str] = []
+    starts: List[float] = []
+    ends: List[float] = []
     for seg in raw_segments:
-        seg_words: List[WhisperWord] = []
-        if seg.words:
-            for w in seg.words:
-                if w.word is None:
-                    continue
-                ww = WhisperWord(text=w.word, start_sec=w.start, end_sec=w.end)
-                seg_words.append(ww)
-                words.append(ww)
-        segments.append(WhisperSegment(
-            start_sec=float(seg.start),
-            end_sec=float(seg.end),
-            text=seg.text or "",
-            words=tuple(seg_words),
-        ))
+        first = len(texts)
+        for w in seg.words or ():
+            if w.word is None:
+                continue
+            texts.append(w.word)
+            starts.append(w.start)
+            ends.append(w.end)
+        bounds.append((float(seg.start), float(seg.end), seg.text or "", first, len(texts)))
+    words = WhisperWords(texts, starts, ends)
+    segments = [
+        WhisperSegment(start_sec=start, end_sec=end, text=text, words=words[first:last])
+        for start, end, text, first, last in bounds
+    ]
     return segments, words
 
 
+def _transcribe(audio: np.ndarray, sample_rate: int, language: str, model, model_size: str,
+                batch_size: int) -> Tuple[List[WhisperSegment], WhisperWords]:
+    if batch_size > 1:
+        [result] = transcribe_batch(
+            [audio], sample_rate,
+            language=language, model=model, model_size=model_size, batch_size=batch_size,
+        )
+        return result
+    return transcribe_with_segments(
+        audio, sample_rate, language=language, model=model, model_size=model_size,
+    )
+
+
 def chunk_long_audio(
     audio: np.ndarray,
     sample_rate: int,
@@ -603,6 +866,7 @@ def chunk_long_audio(
     language: str = "zh",
     whisper_model=None,
     whisper_model_size: str = "small",
+    whisper_batch_size: int = DEFAULT_WHISPER_BATCH_SIZE,
 ) -> List[ChunkResult]:
     """End-to-end: Whisper full transcribe → merge sentence-level segments
     into ≤max_chunk_sec chunks → align GT to chunk windows.
@@ -610,7 +874,8 @@ def chunk_long_audio(
     Boundaries land on Whisper-decoder sentence breaks (not VAD silences),
     which keeps chunks from splitting mid-word on continuous speech. Audio
     short enough to fit Whisper's 30s window short-circuits without running
-    Whisper at all (single chunk, confidence=1.0)."""
+    Whisper at all (single chunk, confidence=1.0). `whisper_batch_size > 1`
+    transcribes through `transcribe_batch` (batched 30s windows)."""
     duration_sec = len(audio) / sample_rate
 
     if duration_sec <= max_chunk_sec:
@@ -626,12 +891,8 @@ def chunk_long_audio(
             )
         ]
 
-    whisper_segments, whisper_words = transcribe_with_segments(
-        audio,
-        sample_rate,
-        language=language,
-        model=whisper_model,
-        model_size=whisper_model_size,
+    whisper_segments, whisper_words = _transcribe(
+        audio, sample_rate, language, whisper_model, whisper_model_size, whisper_batch_size,
     )
     if not whisper_segments:
         logger.warning("Whisper returned no segments — skipping audio.")
@@ -667,3 +928,211 @@ def chunk_long_audio(
         )
     _ = confidence_threshold  # caller filters; kept here for symmetry.
     return results
+
+
+# ---------------------------------------------------------------------------
+# Streaming
+# ---------------------------------------------------------------------------
+
+
+def _shift_segment(seg: WhisperSegment, offset_sec: float) -> WhisperSegment:
+    words = WhisperWords.from_words(seg.words)
+    return WhisperSegment(
+        start_sec=seg.start_sec + offset_sec,
+        end_sec=seg.end_sec + offset_sec,
+        text=seg.text,
+        words=WhisperWords(words.texts, words.starts + offset_sec, words.ends + offset_sec),
+    )
+
+
+class StreamingChunker:
+    """`chunk_long_audio` for audio that arrives in blocks and never sits in
+    memory whole.
+
+    `feed()` appends decoded 16 kHz mono blocks; every `window_sec` of new
+    audio goes through Whisper. A window's last segment may be cut off by
+    the window edge, so it is dropped and the next window starts where the
+    previous kept segment ended. Segments are merged into chunks exactly as
+    `merge_whisper_segments_to_chunks` does; a chunk is final (and returned)
+    once two later chunks exist, since only the last two can still grow or
+    absorb a short tail. GT alignment moves forward with the stream: the
+    final chunks plus the not-yet-final text as right-hand context are
+    aligned against the GT from a cursor, and the cursor advances to the
+    end of the last final chunk.
+
+    Memory is the undecided audio (at most about two chunks) plus one
+    window, whatever the input length. `duration_sec`, when known, sizes the
+    GT lookahead from the transcript's chars per second."""
+
+    def __init__(
+        self,
+        gt_transcript: str,
+        *,
+        sample_rate: int = 16000,
+        max_chunk_sec: float = DEFAULT_MAX_CHUNK_SEC,
+        min_chunk_sec: float = DEFAULT_MIN_CHUNK_SEC,
+        language: str = "zh",
+        whisper_model=None,
+        whisper_model_size: str = "small",
+        whisper_batch_size: int = DEFAULT_WHISPER_BATCH_SIZE,
+        window_sec: float = DEFAULT_STREAM_WINDOW_SEC,
+        duration_sec: Optional[float] = None,
+        alignment_backend: Optional[str] = None,
+    ):
+        if sample_rate != 16000:
+            raise ValueError("Pass 16kHz audio.")
+        self.gt_transcript = gt_transcript or ""
+        self.sample_rate = sample_rate
+        self.max_chunk_sec = max_chunk_sec
+        self.min_chunk_sec = min_chunk_sec
+        self.language = language
+        self.whisper_model = whisper_model
+        self.whisper_model_size = whisper_model_size
+        self.whisper_batch_size = whisper_batch_size
+        # A window must hold more than one chunk, or nothing is ever final.
+        self.window = int(max(window_sec, max_chunk_sec + 5.0) * sample_rate)
+        self.duration_sec = duration_sec
+        self.alignment_backend = alignment_backend
+
+        self.gt_norm = normalize_for_alignment(self.gt_transcript)
+        self.norm_to_orig = _build_normalized_to_original_index(self.gt_transcript)
+        self.gt_cursor = 0
+
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.buffer_start = 0  # absolute sample index of buffer[0]
+        self.total = 0  # samples fed so far
+        self.transcribed_to = 0  # samples already through Whisper
+        self.segments: List[WhisperSegment] = []  # not yet in a final chunk
+        self.emitted_until = 0.0
+        self.emitted = 0
+        self.peak_buffer = 0
+
+    def feed(self, block: np.ndarray) -> List[ChunkResult]:
+        block = np.asarray(block, dtype=np.float32).reshape(-1)
+        self.buffer = np.concatenate([self.buffer, block]) if len(self.buffer) else block
+        self.total += len(block)
+        self.peak_buffer = max(self.peak_buffer, len(self.buffer))
+        out: List[ChunkResult] = []
+        while self.total - self.transcribed_to >= self.window:
+            self._transcribe_window(last=False)
+            out.extend(self._emit(final=False))
+        return out
+
+    def finish(self) -> List[ChunkResult]:
+        duration_sec = self.total / self.sample_rate
+        if not self.emitted and self.transcribed_to == 0 and duration_sec <= self.max_chunk_sec:
+            if not self.total:
+                return []
+            # Short enough for one Whisper window: same shortcut as chunk_long_audio.
+            return [ChunkResult(
+                t_start_sec=0.0, t_end_sec=duration_sec, gt_transcript=self.gt_transcript.strip(),
+                whisper_transcript="", confidence=1.0, audio=self.buffer, sample_rate=self.sample_rate,
+            )]
+        while self.transcribed_to < self.total:
+            self._transcribe_window(last=self.total - self.transcribed_to <= self.window)
+        return self._emit(final=True)
+
+    def _transcribe_window(self, last: bool) -> None:
+        start = self.transcribed_to
+        end = min(self.total, start + self.window)
+        audio = self.buffer[start - self.buffer_start:end - self.buffer_start]
+        segments, _words = _transcribe(
+            audio, self.sample_rate, self.language, self.whisper_model,
+            self.whisper_model_size, self.whisper_batch_size,
+        )
+        if not last and len(segments) > 1:
+            segments = segments[:-1]  # may run past the window edge
+            end = min(end, start + max(1, int(segments[-1].end_sec * self.sample_rate)))
+        offset_sec = start / self.sample_rate
+        self.segments.extend(_shift_segment(seg, offset_sec) for seg in segments)
+        self.transcribed_to = end
+
+    def _emit(self, final: bool) -> List[ChunkResult]:
+        chunks = merge_whisper_segments_to_chunks(
+            self.segments,
+            max_chunk_sec=self.max_chunk_sec,
+            min_chunk_sec=self.min_chunk_sec,
+            audio_duration_sec=self.total / self.sample_rate if final else None,
+        )
+        # Re-merging restarts at the first pending segment; a hard-split
+        # segment may straddle the last emitted chunk.
+        chunks = [c for c in chunks if c[0] >= self.emitted_until - 1e-6]
+        ready = chunks if final else chunks[:-2]
+        results = self._align(ready, chunks[len(ready):], final) if ready else []
+        if ready:
+            self.emitted_until = ready[-1][1]
+            self.emitted += len(ready)
+            self.segments = [s for s in self.segments if s.end_sec > self.emitted_until]
+        self._trim()
+        return results
+
+    def _align(self, ready, pending, final: bool) -> List[ChunkResult]:
+        parts = [WhisperWords.from_words(s.words) for s in self.segments]
+        words = WhisperWords(
+            [text for part in parts for text in part.texts],
+            np.concatenate([part.starts for part in parts]) if parts else [],
+            np.concatenate([part.ends for part in parts]) if parts else [],
+        )
+        raw = _chunk_word_texts(words, list(ready) + list(pending))
+        norm = [normalize_for_alignment(text) for text in raw]
+        ready_text = "".join(norm[:len(ready)])
+        context = "".join(norm[len(ready):])
+
+        if final:
+            gt_window = self.gt_norm[self.gt_cursor:]
+        else:
+            lookahead = 2 * (len(ready_text) + len(context))
+            if self.duration_sec:
+                span_sec = (pending[-1][1] if pending else ready[-1][1]) - ready[0][0]
+                lookahead = max(lookahead, int(1.5 * span_sec * len(self.gt_norm) / self.duration_sec))
+            gt_window = self.gt_norm[self.gt_cursor:self.gt_cursor + lookahead + 64]
+        mapping, matched = _build_alignment(ready_text + context, gt_window, self.alignment_backend)
+
+        results: List[ChunkResult] = []
+        cum = 0
+        for i, (t_start, t_end) in enumerate(ready):
+            w_start, w_end = cum, cum + len(norm[i])
+            cum = w_end
+            g_start = self.gt_cursor + mapping[w_start]
+            g_end = max(g_start, self.gt_cursor + mapping[w_end])
+            i_start = max(0, int(t_start * self.sample_rate) - self.buffer_start)
+            i_end = min(len(self.buffer), int(t_end * self.sample_rate) - self.buffer_start)
+            if i_end <= i_start:
+                continue
+            results.append(ChunkResult(
+                t_start_sec=float(t_start),
+                t_end_sec=float(t_end),
+                gt_transcript=_slice_original_by_norm_range(
+                    self.gt_transcript, self.norm_to_orig, g_start, g_end).strip(),
+                whisper_transcript=raw[i].strip(),
+                confidence=_window_confidence(
+                    int(matched[w_end] - matched[w_start]), len(norm[i]), g_end - g_start),
+                audio=self.buffer[i_start:i_end].copy(),
+                sample_rate=self.sample_rate,
+            ))
+        self.gt_cursor += mapping[len(ready_text)]
+        return results
+
+    def _trim(self) -> None:
+        """Drop audio no future chunk or window can need."""
+        keep_sec = min([self.transcribed_to / self.sample_rate]
+                       + [max(s.start_sec, self.emitted_until) for s in self.segments])
+        keep = int(keep_sec * self.sample_rate)
+        if keep > self.buffer_start:
+            self.buffer = self.buffer[keep - self.buffer_start:]
+            self.buffer_start = keep
+
+
+def stream_chunk_long_audio(
+    blocks: Iterable[np.ndarray],
+    sample_rate: int,
+    gt_transcript: str,
+    **kwargs,
+) -> Iterator[ChunkResult]:
+    """Yield chunks as soon as their boundaries are final. `blocks` are
+    16 kHz mono float32 arrays of any size; keyword arguments as for
+    StreamingChunker."""
+    chunker = StreamingChunker(gt_transcript, sample_rate=sample_rate, **kwargs)
+    for block in blocks:
+        yield from chunker.feed(block)
+    yield from chunker.finish()
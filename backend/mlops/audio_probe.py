@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Header-only audio probing.
+
+Knowing a file's duration used to mean downloading and decoding all of it.
+WAV and FLAC both state their length in the first few hundred bytes, so
+`probe_object()` reads one small ranged GET (`AUDIO_PROBE_BYTES`) and parses:
+
+  - WAV / RF64: walks the RIFF chunks to `fmt ` and `data`; a chunk beyond
+    the first read costs one more 8-byte ranged read per hop.
+  - FLAC: the mandatory STREAMINFO block (an ID3v2 prefix is skipped).
+
+Other formats (mp3, m4a, ...) return None; callers treat that as "unknown"
+and fall back to decoding.
+"""
+from __future__ import annotations
+
+import os
+import struct
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .metadata_format import format_cell
+
+AUDIO_PROBE_BYTES = int(os.getenv("AUDIO_PROBE_BYTES", "4096"))
+# Metadata columns written by the probe (see metadata_format for their types).
+PROBE_COLUMNS = ("duration", "sample_rate", "channels", "size_bytes")
+
+_MAX_CHUNK_HOPS = 32
+_UNKNOWN_SIZE = (0, 0xFFFFFFFF)
+
+
+@dataclass
+class AudioInfo:
+    duration: float
+    sample_rate: int
+    channels: int
+    size_bytes: Optional[int] = None
+
+    def to_row(self) -> dict:
+        """Metadata cells, stored as strings like every other column."""
+        return {
+            "duration": format_cell("duration", self.duration),
+            "sample_rate": format_cell("sample_rate", self.sample_rate),
+            "channels": format_cell("channels", self.channels),
+            "size_bytes": format_cell("size_bytes", self.size_bytes),
+        }
+
+
+class _RangeReader:
+    """Serves reads from the already-fetched header, fetching anything past it."""
+
+    def __init__(self, head: bytes, fetch: Callable[[int, int], bytes], size: Optional[int]):
+        self.head = head
+        self.fetch = fetch
+        self.size = size
+
+    def read(self, offset: int, length: int) -> bytes:
+        if self.size is not None:
+            length = min(length, self.size - offset)
+        if length <= 0:
+            return b""
+        if offset + length <= len(self.head):
+            return self.head[offset:offset + length]
+        return self.fetch(offset, length)
+
+
+def _probe_wav(reader: _RangeReader, size: Optional[int]) -> Optional[AudioInfo]:
+    riff = reader.read(0, 12)
+    if len(riff) < 12 or riff[:4] not in (b"RIFF", b"RF64") or riff[8:12] != b"WAVE":
+        return None
+    fmt = None
+    data_size = None
+    ds64_data_size = None
+    pos = 12
+    for _ in range(_MAX_CHUNK_HOPS):
+        header = reader.read(pos, 8)
+        if len(header) < 8:
+            break
+        chunk_id, chunk_size = header[:4], struct.unpack("<I", header[4:])[0]
+        if chunk_id == b"fmt ":
+            body = reader.read(pos + 8, 16)
+            if len(body) < 16:
+                return None
+            fmt = struct.unpack("<HHIIHH", body)
+        elif chunk_id == b"ds64":
+            body = reader.read(pos + 8, 16)
+            if len(body) == 16:
+                ds64_data_size = struct.unpack("<QQ", body)[1]
+        elif chunk_id == b"data":
+            data_size = chunk_size
+            if riff[:4] == b"RF64" and ds64_data_size is not None:
+                data_size = ds64_data_size
+            elif chunk_size in _UNKNOWN_SIZE and size is not None:
+                data_size = size - (pos + 8)  # streamed WAV: data runs to EOF
+            if size is not None:
+                data_size = min(data_size, max(size - (pos + 8), 0))
+            break
+        pos += 8 + chunk_size + (chunk_size & 1)
+    if fmt is None or data_size is None:
+        return None
+    _format_tag, channels, sample_rate, byte_rate, _block_align, _bits = fmt
+    if not sample_rate or not byte_rate:
+        return None
+    return AudioInfo(duration=data_size / byte_rate, sample_rate=sample_rate,
+                     channels=channels, size_bytes=size)
+
+
+def _probe_flac(reader: _RangeReader, size: Optional[int]) -> Optional[AudioInfo]:
+    offset = 0
+    id3 = reader.read(0, 10)
+    if id3[:3] == b"ID3" and len(id3) == 10:
+        tag_size = (id3[6] << 21) | (id3[7] << 14) | (id3[8] << 7) | id3[9]
+        offset = 10 + tag_size + (10 if id3[5] & 0x10 else 0)
+    head = reader.read(offset, 8 + 18)
+    if len(head) < 26 or head[:4] != b"fLaC" or head[4] & 0x7F != 0:
+        return None  # STREAMINFO must be the first metadata block
+    packed = int.from_bytes(head[8 + 10:8 + 18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return AudioInfo(duration=total_samples / sample_rate, sample_rate=sample_rate,
+                     channels=channels, size_bytes=size)
+
+
+def probe_header(head: bytes, fetch: Callable[[int, int], bytes] = None,
+                 size: Optional[int] = None) -> Optional[AudioInfo]:
+    """Parse `head` (the first bytes of a file). `fetch(offset, length)` is
+    called for anything past it; without it, such reads come back empty."""
+    reader = _RangeReader(head, fetch or (lambda _offset, _length: b""), size)
+    for probe in (_probe_wav, _probe_flac):
+        info = probe(reader, size)
+        if info is not None:
+            return info
+    return None
+
+
+def probe_bytes(data: bytes) -> Optional[AudioInfo]:
+    """Probe a file already in memory."""
+    return probe_header(data, size=len(data))
+
+
+def probe_fileobj(fileobj, size: Optional[int] = None) -> Optional[AudioInfo]:
+    """Probe a seekable file object; its position is restored afterwards."""
+    start = fileobj.tell()
+
+    def fetch(offset, length):
+        fileobj.seek(start + offset)
+        return fileobj.read(length)
+
+    try:
+        return probe_header(fetch(0, AUDIO_PROBE_BYTES), fetch, size)
+    finally:
+        fileobj.seek(start)
+
+
+def _content_range_total(headers) -> Optional[int]:
+    """`bytes 0-4095/123456` -> 123456."""
+    value = (headers or {}).get("Content-Range") or (headers or {}).get("content-range") or ""
+    total = value.rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def probe_object(client, bucket_name: str, object_name: str, size: Optional[int] = None,
+                 header_bytes: int = AUDIO_PROBE_BYTES) -> Optional[AudioInfo]:
+    """Probe a MinIO object with ranged GETs. `client` is a raw Minio client
+    or MinioClientWrapper; pass `size` when a listing already provided it."""
+    def fetch(offset, length):
+        response = client.get_object(bucket_name, object_name, offset=offset, length=length)
+        try:
+            return response.read(), getattr(response, "headers", None)
+        finally:
+            response.close()
+            response.release_conn()
+
+    head, headers = fetch(0, header_bytes)
+    if size is None:
+        size = _content_range_total(headers)
+    return probe_header(head, lambda offset, length: fetch(offset, length)[0], size)
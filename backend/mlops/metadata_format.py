@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar Parquet sidecar for `{split}/metadata.csv`.
+
+The CSV stays the source of truth (the delta log, conditional writes and the
+UI all key on it), but every reader used to re-parse it as `dtype=str`. When
+`METADATA_FORMAT=both`, writers also emit `{split}/metadata.parquet` with
+typed columns:
+
+    duration, confidence, t_start_sec, t_end_sec   -> float64
+    sample_rate, channels, size_bytes             -> int64
+    tags                                          -> list<string>
+    everything else                               -> string
+
+Writers put these columns into the CSV as `format_cell()` text (fixed
+decimals per float column, tags joined with ", "), and the Parquet reader
+renders typed cells with the same function, so a sidecar round-trips to
+byte-for-byte what `read_csv_bytes` gives for the same CSV. A cell whose
+text is not canonical (hand-edited, or from an older writer: "12" in a
+float column) is kept verbatim in a sparse `__raw__<column>` string column
+that is null everywhere else. Rewrites from the cache therefore never change
+user data or row hashes.
+
+The sidecar carries the ETag of the CSV it was built from
+(`x-amz-meta-source-etag`). Readers use it only while that still matches, so
+a CSV rewritten by an older writer (or by hand) never serves stale rows.
+
+pyarrow is optional: without it nothing is written and readers fall back to
+the CSV.
+"""
+from __future__ import annotations
+
+import io
+import os
+from typing import Iterable, Optional
+
+import pandas as pd
+
+METADATA_FORMAT = os.getenv("METADATA_FORMAT", "csv").strip().lower()  # csv | both
+SOURCE_ETAG_META_KEY = "source-etag"
+
+FLOAT_COLUMNS = ("duration", "confidence", "t_start_sec", "t_end_sec")
+INT_COLUMNS = ("sample_rate", "channels", "size_bytes")
+LIST_COLUMNS = ("tags",)
+# Decimals each float column is written with.
+FLOAT_DECIMALS = {"duration": 3, "confidence": 3, "t_start_sec": 2, "t_end_sec": 2}
+TAG_SEPARATOR = ", "
+
+# Prefix of the string columns that preserve the original text of a typed one.
+RAW_PREFIX = "__raw__"
+
+# What the training loader actually needs from a split.
+TRAINING_COLUMNS = ("file_name", "audio", "transcription")
+
+
+def parquet_key(csv_key: str) -> str:
+    """`train/metadata.csv` -> `train/metadata.parquet`."""
+    stem = csv_key[:-len(".csv")] if csv_key.endswith(".csv") else csv_key
+    return f"{stem}.parquet"
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def parquet_enabled() -> bool:
+    return METADATA_FORMAT == "both" and parquet_available()
+
+
+def _split_tags(value) -> list:
+    if not value:
+        return []
+    return [t.strip() for t in str(value).split(",") if t.strip()]
+
+
+def format_cell(column: str, value) -> str:
+    """Canonical CSV text of `value` in `column`. Use it for every typed
+    column a writer fills in, so the typed sidecar needs no raw copy."""
+    if value is None:
+        return ""
+    if column in LIST_COLUMNS:
+        tags = value if isinstance(value, (list, tuple)) else _split_tags(value)
+        return TAG_SEPARATOR.join(tags)
+    if column in FLOAT_COLUMNS:
+        if isinstance(value, str):
+            if not value.strip():
+                return ""
+            value = float(value)
+        if value != value:  # NaN
+            return ""
+        return f"{float(value):.{FLOAT_DECIMALS[column]}f}"
+    if column in INT_COLUMNS:
+        if isinstance(value, str):
+            if not value.strip():
+                return ""
+            value = int(value)
+        return str(int(value))
+    return str(value)
+
+
+def _numeric(values: pd.Series, integer: bool) -> Optional[pd.Series]:
+    """Typed copy of a string column, or None if any non-empty cell does not
+    parse (the column then stays a string rather than losing data)."""
+    text = values.fillna("").astype(str).str.strip()
+    parsed = pd.to_numeric(text.where(text != ""), errors="coerce")
+    if (parsed.isna() & (text != "")).any():
+        return None
+    if integer:
+        if ((parsed.dropna() % 1) != 0).any():
+            return None
+        return parsed.astype("Int64")
+    return parsed.astype("float64")
+
+
+def to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    """Serialize a string metadata DataFrame as typed Parquet."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrays, names, raw = [], [], []
+    for col in df.columns:
+        values = df[col]
+        text = values.fillna("").astype(str).tolist()
+        array = None
+        if col in LIST_COLUMNS:
+            array = pa.array([_split_tags(v) for v in values], type=pa.list_(pa.string()))
+        elif col in FLOAT_COLUMNS or col in INT_COLUMNS:
+            typed = _numeric(values, integer=col in INT_COLUMNS)
+            if typed is not None:
+                array = pa.array(typed, type=pa.int64() if col in INT_COLUMNS else pa.float64(),
+                                 from_pandas=True)
+        if array is None:
+            array = pa.array(text, type=pa.string())
+        else:
+            rendered = _cells(str(col), array.to_pylist())
+            if rendered != text:
+                verbatim = [t if t != r else None for t, r in zip(text, rendered)]
+                raw.append((RAW_PREFIX + str(col), pa.array(verbatim, type=pa.string())))
+        arrays.append(array)
+        names.append(str(col))
+    for name, array in raw:
+        arrays.append(array)
+        names.append(name)
+
+    buf = io.BytesIO()
+    pq.write_table(pa.Table.from_arrays(arrays, names=names), buf, compression="zstd")
+    return buf.getvalue()
+
+
+def _cells(name: str, values: list) -> list:
+    if name in LIST_COLUMNS or name in FLOAT_COLUMNS or name in INT_COLUMNS:
+        return [format_cell(name, v) for v in values]
+    return ["" if v is None else str(v) for v in values]
+
+
+def read_parquet_bytes(data: bytes, columns: Iterable[str] = None) -> pd.DataFrame:
+    """Typed Parquet -> the all-string DataFrame the CSV readers produce
+    (`dtype=str, keep_default_na=False`), using the `__raw__` text of a
+    cell wherever the writer kept it."""
+    import pyarrow.parquet as pq
+
+    available = pq.read_schema(io.BytesIO(data)).names
+    if columns is None:
+        columns = [name for name in available if not name.startswith(RAW_PREFIX)]
+    columns = list(columns)
+    raw = [RAW_PREFIX + name for name in columns if RAW_PREFIX + name in available]
+    table = pq.read_table(io.BytesIO(data), columns=columns + raw)
+    out = {}
+    for name in columns:
+        out[name] = _cells(name, table.column(name).to_pylist())
+        if RAW_PREFIX + name in raw:
+            verbatim = table.column(RAW_PREFIX + name).to_pylist()
+            out[name] = [r if r is not None else c for r, c in zip(verbatim, out[name])]
+    return pd.DataFrame(out, columns=columns, dtype=object)
+
+
+def read_csv_bytes(data: bytes) -> pd.DataFrame:
+    return pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False)
+
+
+def _user_metadata(stat, name: str) -> str:
+    wanted = f"x-amz-meta-{name}".lower()
+    for key, value in (getattr(stat, "metadata", None) or {}).items():
+        if key.lower() == wanted:
+            return value
+    return ""
+
+
+def fresh_parquet(client, bucket_name: str, csv_key: str, csv_etag: Optional[str]) -> bool:
+    """True if the Parquet sidecar of `csv_key` exists and was built from the
+    CSV with `csv_etag` (pass None when the CSV itself does not exist)."""
+    if not parquet_available():
+        return False
+    try:
+        stat = client.stat_object(bucket_name, parquet_key(csv_key))
+    except Exception:
+        return False
+    if csv_etag is None:
+        return True
+    return _user_metadata(stat, SOURCE_ETAG_META_KEY) == csv_etag
+
+
+def put_parquet(client, bucket_name: str, csv_key: str, df: pd.DataFrame, csv_etag: Optional[str]) -> None:
+    """Write the sidecar for a CSV that was just stored under `csv_etag`.
+    `client` is a raw Minio client or MinioClientWrapper."""
+    payload = to_parquet_bytes(df)
+    client.put_object(
+        bucket_name,
+        parquet_key(csv_key),
+        io.BytesIO(payload),
+        len(payload),
+        content_type="application/vnd.apache.parquet",
+        metadata={SOURCE_ETAG_META_KEY: csv_etag} if csv_etag else None,
+    )
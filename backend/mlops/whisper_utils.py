@@ -20,7 +20,10 @@ from transformers import (
     BitsAndBytesConfig,
 )
 
+from minio import Minio
+
 from .config import MinioConfig
+from .metadata_format import TRAINING_COLUMNS, fresh_parquet, parquet_key
 from .minio_utils import get_storage_options, set_minio_env_vars
 
 
@@ -61,6 +64,44 @@ def prepare_dataset_fn(processor: WhisperProcessor):
     return _prepare
 
 
+def _split_metadata_source(client: Minio, bucket_name: str, split: str) -> tuple[str, str]:
+    """("parquet", uri) when the split has a current Parquet sidecar, else ("csv", uri)."""
+    csv_key = f"{split}/metadata.csv"
+    try:
+        csv_etag = client.stat_object(bucket_name, csv_key).etag
+    except Exception:
+        csv_etag = None
+    if fresh_parquet(client, bucket_name, csv_key, csv_etag):
+        return "parquet", f"s3://{bucket_name}/{parquet_key(csv_key)}"
+    return "csv", f"s3://{bucket_name}/{csv_key}"
+
+
+def load_split_metadata(fmt: str, data_files: str, sampling_rate: int = 16000) -> IterableDataset:
+    """Stream one split's metadata, reading only TRAINING_COLUMNS: the file
+    also carries tags, description and the audio probe columns, which the
+    CSV builder would reject against a fixed feature list."""
+    if fmt == "parquet":
+        # Typed sidecar: only the columns training uses are read.
+        return load_dataset(
+            "parquet",
+            data_files=data_files,
+            streaming=True,
+            columns=list(TRAINING_COLUMNS),
+        )["train"].cast_column("audio", Audio(sampling_rate=sampling_rate))
+    features = Features({
+        "file_name": Value("string"),
+        "audio": Audio(sampling_rate=sampling_rate),
+        "transcription": Value("string"),
+    })
+    return load_dataset(
+        "csv",
+        data_files=data_files,
+        streaming=True,
+        usecols=list(TRAINING_COLUMNS),
+        features=features,
+    )["train"]
+
+
 def load_streaming_dataset(
     minio_cfg: MinioConfig,
     train_csv: str,
@@ -84,26 +125,17 @@ def load_streaming_dataset(
     # )
     # return dataset.cast_column("audio", Audio(sampling_rate=sampling_rate))
 
-    features = Features({
-        "file_name": Value("string"),
-        "audio": Audio(sampling_rate=16000),
-        "transcription": Value("string"),
-        "tags": Value("string"),
-        "description": Value("string"),
-    })
-
-    ds_train = load_dataset(
-        "csv",
-        data_files=f"s3://{minio_cfg.bucket_name}/train/metadata.csv",
-        streaming=True,
-        features=features,
-    )["train"]
-    ds_test = load_dataset(
-        "csv",
-        data_files=f"s3://{minio_cfg.bucket_name}/test/metadata.csv",
-        streaming=True,
-        features=features,
-    )["train"]
+    client = Minio(
+        minio_cfg.endpoint,
+        access_key=minio_cfg.access_key,
+        secret_key=minio_cfg.secret_key,
+        secure=minio_cfg.secure,
+    )
+    splits = {}
+    for split in ("train", "test"):
+        fmt, data_files = _split_metadata_source(client, minio_cfg.bucket_name, split)
+        splits[split] = load_split_metadata(fmt, data_files, sampling_rate)
+    ds_train, ds_test = splits["train"], splits["test"]
     
     return IterableDatasetDict({"train":  ds_train, "test": ds_test})
 
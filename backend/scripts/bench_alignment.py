@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark: alignment backends on synthetic long transcripts.
+
+Builds a Chinese-like ground truth (Zipf-distributed characters, so common
+characters repeat the way 的 / 是 do in real speech), derives a "Whisper"
+version with random substitutions / deletions / insertions, and times each
+backend of `backend.mlops.alignment` on it. Also reports how many characters
+each one matched and how far its GT mapping (as used by the chunker) lands
+from difflib's.
+
+Usage:
+  python -m backend.scripts.bench_alignment --lengths 2000,8000,15000 --error-rate 0.1
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from typing import List, Optional, Tuple
+
+from backend.mlops.alignment import get_opcodes
+from backend.mlops.audio_chunker import _build_alignment_mapping
+
+
+def synthetic_pair(length: int, error_rate: float, vocab: int = 800, seed: int = 0) -> Tuple[str, str]:
+    """(whisper_text, gt_text) of about `length` chars each."""
+    rng = random.Random(seed)
+    alphabet = [chr(0x4E00 + k) for k in range(vocab)]
+    weights = [1.0 / (rank + 1) for rank in range(vocab)]
+    gt = rng.choices(alphabet, weights, k=length)
+    whisper = list(gt)
+    for _ in range(int(length * error_rate)):
+        pos = rng.randrange(len(whisper))
+        roll = rng.random()
+        if roll < 0.4:
+            whisper[pos] = rng.choices(alphabet, weights)[0]
+        elif roll < 0.7:
+            del whisper[pos]
+        else:
+            whisper.insert(pos, rng.choices(alphabet, weights)[0])
+    return "".join(whisper), "".join(gt)
+
+
+def _matched(opcodes) -> int:
+    return sum(i2 - i1 for tag, i1, i2, _j1, _j2 in opcodes if tag == "equal")
+
+
+def run(lengths: List[int], error_rate: float, backends: List[str]) -> List[dict]:
+    rows = []
+    for length in lengths:
+        whisper, gt = synthetic_pair(length, error_rate)
+        reference = None
+        for backend in backends:
+            started = time.perf_counter()
+            opcodes = get_opcodes(whisper, gt, backend)
+            elapsed = time.perf_counter() - started
+            mapping = _build_alignment_mapping(whisper, gt, backend)
+            if reference is None:
+                reference = mapping
+            drift = sum(abs(x - y) for x, y in zip(mapping, reference)) / len(mapping)
+            rows.append({
+                "length": length,
+                "backend": backend,
+                "seconds": elapsed,
+                "matched": _matched(opcodes),
+                "mean_drift": drift,
+            })
+    return rows
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compare alignment backends on synthetic transcripts")
+    parser.add_argument("--lengths", default="2000,8000,15000",
+                        help="Comma-separated transcript lengths in characters.")
+    parser.add_argument("--error-rate", type=float, default=0.1,
+                        help="Edits per character applied to the Whisper side.")
+    parser.add_argument("--backends", default="difflib,anchored",
+                        help="Backends to time; the first is the drift reference.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    lengths = [int(n) for n in args.lengths.split(",") if n.strip()]
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    print(f"{'chars':>7} {'backend':>9} {'seconds':>9} {'matched':>8} {'drift':>7}")
+    for row in run(lengths, args.error_rate, backends):
+        print(f"{row['length']:>7} {row['backend']:>9} {row['seconds']:>9.3f} "
+              f"{row['matched']:>8} {row['mean_drift']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,36 @@ CLI: pre-process long audio files in a MinIO dataset bucket so each training
 sample fits Whisper's 30s window with a properly aligned transcript.
 
 For each row in {split}/metadata.csv of the source bucket:
-  - duration ≤ MAX_CHUNK_SEC → copied as-is to the target bucket.
+  - duration ≤ MAX_CHUNK_SEC → copied as-is to the target bucket. When the
+                                duration is known up front (a `duration`
+                                column, or a WAV/FLAC header read with a
+                                ranged GET) this is a server-side copy and
+                                the audio is never downloaded.
   - duration  > MAX_CHUNK_SEC → split via VAD; transcript split via Whisper
                                 word-level alignment to the user's GT.
 
 Outputs in the target bucket:
   - {split}/audio/<original_stem>_partNN.wav
-  - {split}/metadata.csv          (high-confidence chunks only)
+  - {split}/metadata.csv          (high-confidence chunks only; merged into
+                                   the existing metadata, whose other rows
+                                   and edits are kept)
   - {split}/low_confidence.csv    (chunks below --confidence-threshold,
                                    for human review — NOT used for training)
+  - {split}/metadata.parquet      (typed sidecar, when METADATA_FORMAT=both)
+  - {split}/_preprocess_manifest.json
+                                  (progress checkpoint; a re-run only processes
+                                   new or changed source rows — see --no-resume)
+
+Rows flow through a pipeline (see `run_pipeline`): a fetch pool downloads
+and decodes ahead of a single Whisper stage, and an upload pool encodes and
+writes chunks behind it, so the model does not idle on network I/O. With
+`--workers N` the rows are sharded across N processes, each running that
+pipeline with its own Whisper model on cores/N CPU threads.
+
+Downloads are spooled to a temp file. Files longer than --stream-above-sec
+are never decoded whole: they are read and resampled in blocks and chunked
+by `StreamingChunker`, whose chunks are uploaded as soon as they are final,
+so memory stays bounded by a few Whisper windows at any input length.
 
 Usage:
   python -m backend.scripts.preprocess_long_audio \\
@@ -27,13 +48,24 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import hashlib
 import io
+import json
 import logging
+import multiprocessing
 import os
+import queue
+import shutil
 import sys
+import tempfile
+import threading
+import time
+import traceback
 import warnings
-from dataclasses import dataclass
-from typing import List, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
 
 warnings.filterwarnings("ignore")
 
@@ -45,15 +77,34 @@ import librosa
 from backend.mlops.audio_chunker import (
     DEFAULT_CONFIDENCE_THRESHOLD,
     DEFAULT_MAX_CHUNK_SEC,
+    DEFAULT_WHISPER_BATCH_SIZE,
     ChunkResult,
+    StreamingChunker,
     chunk_long_audio,
     load_whisper_model,
 )
+from backend.mlops.audio_probe import PROBE_COLUMNS, AudioInfo, probe_object
+from backend.mlops.metadata_format import (
+    format_cell,
+    fresh_parquet,
+    parquet_key,
+    put_parquet,
+    read_csv_bytes,
+    read_parquet_bytes,
+    parquet_enabled,
+)
 
 logger = logging.getLogger("preprocess_long_audio")
 
 TARGET_SAMPLE_RATE = 16000
 SUPPORTED_SPLITS = ("train", "test")
+STAGE_LOG_INTERVAL_SEC = 30.0
+MANIFEST_NAME = "_preprocess_manifest.json"
+MANIFEST_VERSION = 1
+# faster-whisper (CTranslate2) is not fork-safe once it has started threads.
+SHARD_START_METHOD = "spawn"
+STREAM_BLOCK_SEC = 10.0
+SPOOL_CHUNK_BYTES = 1024 * 1024
 
 
 @dataclass
@@ -70,6 +121,15 @@ class CliArgs:
     confidence_threshold: float
     whisper_model: str
     language: str
+    fast_path: bool = True
+    download_workers: int = 4
+    upload_workers: int = 4
+    queue_size: int = 8
+    resume: bool = True
+    checkpoint_interval_sec: float = 60.0
+    workers: int = 1
+    whisper_batch_size: int = DEFAULT_WHISPER_BATCH_SIZE
+    stream_above_sec: float = 1800.0
 
 
 def parse_args(argv: Optional[List[str]] = None) -> CliArgs:
@@ -100,6 +160,72 @@ def parse_args(argv: Optional[List[str]] = None) -> CliArgs:
     )
     p.add_argument("--whisper-model", default="small")
     p.add_argument("--language", default="zh")
+    p.add_argument(
+        "--whisper-batch-size",
+        type=int,
+        default=DEFAULT_WHISPER_BATCH_SIZE,
+        help=(
+            "Decode this many 30s windows per Whisper pass via faster-whisper's "
+            "batched pipeline (default: 1, sequential)."
+        ),
+    )
+    p.add_argument(
+        "--stream-above-sec",
+        type=float,
+        default=1800.0,
+        help=(
+            "Chunk files longer than this while decoding them block by block, "
+            "instead of decoding them whole first (default: 1800; -1 never streams)."
+        ),
+    )
+    p.add_argument(
+        "--no-fast-path",
+        dest="fast_path",
+        action="store_false",
+        help="Download and decode every file, even ones whose header says they are short.",
+    )
+
+    p.add_argument(
+        "--download-workers",
+        type=int,
+        default=4,
+        help="Threads fetching + decoding source audio ahead of Whisper (default: 4).",
+    )
+    p.add_argument(
+        "--upload-workers",
+        type=int,
+        default=4,
+        help="Threads encoding + uploading chunk WAVs (default: 4).",
+    )
+    p.add_argument(
+        "--queue-size",
+        type=int,
+        default=8,
+        help="Max decoded files waiting for Whisper; bounds memory (default: 8).",
+    )
+
+    p.add_argument(
+        "--no-resume",
+        dest="resume",
+        action="store_false",
+        help=f"Ignore {{split}}/{MANIFEST_NAME} in the target bucket and reprocess every row.",
+    )
+    p.add_argument(
+        "--checkpoint-interval",
+        dest="checkpoint_interval_sec",
+        type=float,
+        default=60.0,
+        help="Seconds between progress-manifest saves (default: 60).",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Worker processes, each with its own Whisper model and cores/N CPU "
+            "threads; rows are sharded across them (default: 1, in-process)."
+        ),
+    )
 
     ns = p.parse_args(argv)
     if ns.source_bucket == ns.target_bucket:
@@ -120,6 +246,15 @@ def parse_args(argv: Optional[List[str]] = None) -> CliArgs:
         confidence_threshold=ns.confidence_threshold,
         whisper_model=ns.whisper_model,
         language=ns.language,
+        fast_path=ns.fast_path,
+        download_workers=ns.download_workers,
+        upload_workers=ns.upload_workers,
+        queue_size=ns.queue_size,
+        resume=ns.resume,
+        checkpoint_interval_sec=ns.checkpoint_interval_sec,
+        workers=max(1, ns.workers),
+        whisper_batch_size=max(1, ns.whisper_batch_size),
+        stream_above_sec=ns.stream_above_sec,
     )
 
 
@@ -143,8 +278,8 @@ def _read_object_bytes(client, bucket: str, key: str) -> bytes:
         resp.release_conn()
 
 
-def _put_object_bytes(client, bucket: str, key: str, data: bytes, content_type: str) -> None:
-    client.put_object(
+def _put_object_bytes(client, bucket: str, key: str, data: bytes, content_type: str):
+    return client.put_object(
         bucket,
         key,
         io.BytesIO(data),
@@ -153,8 +288,93 @@ def _put_object_bytes(client, bucket: str, key: str, data: bytes, content_type:
     )
 
 
-def _load_audio_mono16k(audio_bytes: bytes) -> np.ndarray:
-    audio, sr = sf.read(io.BytesIO(audio_bytes), dtype="float32", always_2d=False)
+def _known_duration(client, bucket: str, key: str, row: dict):
+    """`(duration_sec, stats)` without downloading the audio: from the row's
+    `duration` column if set, else from a ranged header read. `(None, {})`
+    when neither works (e.g. mp3)."""
+    try:
+        if row.get("duration"):
+            return float(row["duration"]), {}
+    except ValueError:
+        pass
+    try:
+        info = probe_object(client, bucket, key)
+    except Exception:
+        logger.debug("Header probe failed for %s/%s", bucket, key, exc_info=True)
+        return None, {}
+    if info is None:
+        return None, {}
+    return info.duration, info.to_row()
+
+
+def _copy_short_file(args: CliArgs, client, split: str, row_dict: dict) -> Optional[dict]:
+    """Fast path: server-side copy of a file known to fit in one chunk.
+    Returns the output row, or None if the file must go through decoding."""
+    from minio.commonconfig import CopySource  # noqa: WPS433
+
+    file_name = row_dict["file_name"]
+    audio_key = f"{split}/audio/{file_name}"
+    duration, stats = _known_duration(client, args.source_bucket, audio_key, row_dict)
+    if duration is None or duration > args.max_chunk_sec:
+        return None
+    client.copy_object(args.target_bucket, audio_key, CopySource(args.source_bucket, audio_key))
+    out_row = {
+        **row_dict,
+        **stats,
+        "audio": f"s3://{args.target_bucket}/{audio_key}",
+        "transcription": (row_dict["transcription"] or "").strip(),
+    }
+    out_row.setdefault("tags", "")
+    out_row.setdefault("description", "")
+    return out_row
+
+
+def _spool_object(client, bucket: str, key: str) -> str:
+    """Download an object to a temp file (removed by the caller) without
+    holding it in memory."""
+    suffix = os.path.splitext(key)[1]
+    resp = client.get_object(bucket, key)
+    try:
+        with tempfile.NamedTemporaryFile(prefix="preprocess-", suffix=suffix, delete=False) as f:
+            try:
+                shutil.copyfileobj(resp, f, SPOOL_CHUNK_BYTES)
+            except BaseException:
+                os.unlink(f.name)
+                raise
+            return f.name
+    finally:
+        resp.close()
+        resp.release_conn()
+
+
+def _spooled_duration(path: str) -> Optional[float]:
+    try:
+        info = sf.info(path)
+    except Exception:
+        return None
+    return info.frames / info.samplerate if info.samplerate else None
+
+
+def _iter_audio_mono16k(path: str, block_sec: float = STREAM_BLOCK_SEC):
+    """Yield the file as 16 kHz mono float32 blocks, decoding and resampling
+    `block_sec` at a time (soxr keeps filter state across blocks)."""
+    with sf.SoundFile(path) as f:
+        resampler = None
+        if f.samplerate != TARGET_SAMPLE_RATE:
+            import soxr  # noqa: WPS433  (librosa's resampler)
+            resampler = soxr.ResampleStream(f.samplerate, TARGET_SAMPLE_RATE, 1, dtype="float32")
+        for block in f.blocks(blocksize=max(1, int(block_sec * f.samplerate)), dtype="float32", always_2d=True):
+            mono = block.mean(axis=1)
+            yield resampler.resample_chunk(mono) if resampler else mono
+        if resampler is not None:
+            yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+
+def _load_audio_mono16k(source) -> np.ndarray:
+    """Decode a whole file (path, file object or bytes) to 16 kHz mono."""
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    audio, sr = sf.read(source, dtype="float32", always_2d=False)
     if audio.ndim == 2:
         audio = audio.mean(axis=1)
     if sr != TARGET_SAMPLE_RATE:
@@ -178,81 +398,188 @@ def _chunk_filename(original_filename: str, idx: int) -> str:
     return f"{stem}_part{idx:02d}.wav"
 
 
-def process_split(
-    args: CliArgs,
-    client,
-    split: str,
-    whisper_model,
-) -> None:
-    src_csv_key = f"{split}/metadata.csv"
-    try:
-        csv_bytes = _read_object_bytes(client, args.source_bucket, src_csv_key)
-    except Exception:
-        logger.warning("No %s in %s — skipping split.", src_csv_key, args.source_bucket)
-        return
+@dataclass
+class RowResult:
+    """Everything one source row produced, emitted in source-row order."""
+    row_idx: int
+    file_name: str
+    rows: List[dict] = field(default_factory=list)
+    low_conf_rows: List[dict] = field(default_factory=list)
+    confidences: List[float] = field(default_factory=list)  # one per emitted chunk
+    copied: bool = False  # short file copied server-side, never decoded
 
-    df = pd.read_csv(io.BytesIO(csv_bytes), dtype=str, keep_default_na=False)
-    required = {"file_name", "transcription"}
-    missing = required - set(df.columns)
-    if missing:
-        logger.error("Source %s missing columns: %s", src_csv_key, missing)
-        return
 
-    out_rows: List[dict] = []
-    low_conf_rows: List[dict] = []
+@dataclass
+class _Decoded:
+    row_idx: int
+    row_dict: dict
+    audio: np.ndarray
+
 
-    for row_idx, row in enumerate(df.itertuples(index=False)):
-        row_dict = {col: getattr(row, col, "") for col in df.columns}
-        file_name = row_dict["file_name"]
-        gt = row_dict["transcription"] or ""
+@dataclass
+class _Spooled:
+    """A file too long to decode whole; streamed from `path` by inference."""
+    row_idx: int
+    row_dict: dict
+    path: str
+    duration: float
+
+
+class StageStats:
+    """Busy time / item / byte counters for one pipeline stage. Stages run on
+    several threads, so `busy_sec` can exceed wall time."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.bytes = 0
+        self.busy_sec = 0.0
+        self.audio_sec = 0.0
+        self._lock = threading.Lock()
 
+    @contextmanager
+    def track(self):
+        started = time.monotonic()
         try:
-            src_audio_key = f"{split}/audio/{file_name}"
-            audio_bytes = _read_object_bytes(client, args.source_bucket, src_audio_key)
+            yield
+        finally:
+            with self._lock:
+                self.busy_sec += time.monotonic() - started
+
+    def add(self, items: int = 1, nbytes: int = 0, audio_sec: float = 0.0) -> None:
+        with self._lock:
+            self.items += items
+            self.bytes += nbytes
+            self.audio_sec += audio_sec
+
+    def merge(self, other: "StageStats") -> None:
+        """Fold in the counters of the same stage from another shard."""
+        with self._lock:
+            self.items += other.items
+            self.bytes += other.bytes
+            self.busy_sec += other.busy_sec
+            self.audio_sec += other.audio_sec
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def summary(self, wall_sec: float) -> str:
+        text = (
+            f"{self.name}: {self.items} item(s), {self.bytes / 1e6:.1f} MB, "
+            f"busy {self.busy_sec:.1f}s, {self.items / wall_sec if wall_sec > 0 else 0.0:.2f} item/s"
+        )
+        if self.audio_sec and self.busy_sec:
+            text += f", RTF {self.busy_sec / self.audio_sec:.3f}"
+        return text
+
+
+def _fetch_row(args: CliArgs, client, split: str, row_idx: int, row_dict: dict,
+               stats: StageStats):
+    """Fetch stage: fast-path copy, or download + decode. Returns a finished
+    RowResult, a _Decoded item for the inference stage, or None (skipped)."""
+    file_name = row_dict["file_name"]
+    with stats.track():
+        if args.fast_path:
+            try:
+                fast_row = _copy_short_file(args, client, split, row_dict)
+            except Exception:
+                logger.warning("[%s] server-side copy failed for %s — decoding instead.",
+                               split, file_name, exc_info=True)
+                fast_row = None
+            if fast_row is not None:
+                stats.add()
+                return RowResult(row_idx, file_name, rows=[fast_row], confidences=[1.0], copied=True)
+
+        src_audio_key = f"{split}/audio/{file_name}"
+        try:
+            path = _spool_object(client, args.source_bucket, src_audio_key)
         except Exception:
             logger.warning("[%s] cannot fetch audio: %s/%s — skipped.",
                            split, args.source_bucket, src_audio_key)
-            continue
+            return None
 
+        nbytes = os.path.getsize(path)
+        duration = _spooled_duration(path)
+        if (args.stream_above_sec >= 0 and duration is not None
+                and duration > max(args.stream_above_sec, args.max_chunk_sec)):
+            stats.add(nbytes=nbytes, audio_sec=duration)
+            return _Spooled(row_idx, row_dict, path, duration)
         try:
-            audio = _load_audio_mono16k(audio_bytes)
+            audio = _load_audio_mono16k(path)
         except Exception:
             logger.exception("[%s] failed to decode %s — skipped.", split, file_name)
-            continue
+            return None
+        finally:
+            os.unlink(path)
+        stats.add(nbytes=nbytes, audio_sec=len(audio) / TARGET_SAMPLE_RATE)
+        return _Decoded(row_idx, row_dict, audio)
+
 
-        duration = len(audio) / TARGET_SAMPLE_RATE
+def _infer_row(args: CliArgs, split: str, item: _Decoded, whisper_model, stats: StageStats):
+    """Inference stage (single thread: one Whisper model)."""
+    file_name = item.row_dict["file_name"]
+    duration = len(item.audio) / TARGET_SAMPLE_RATE
+    with stats.track():
         try:
             chunks = chunk_long_audio(
-                audio,
+                item.audio,
                 TARGET_SAMPLE_RATE,
-                gt,
+                item.row_dict["transcription"] or "",
                 max_chunk_sec=args.max_chunk_sec,
                 min_chunk_sec=args.min_chunk_sec,
                 confidence_threshold=args.confidence_threshold,
                 language=args.language,
                 whisper_model=whisper_model,
                 whisper_model_size=args.whisper_model,
+                whisper_batch_size=args.whisper_batch_size,
             )
         except Exception:
             logger.exception("[%s] chunking failed for %s — skipped.", split, file_name)
-            continue
+            return None
+    stats.add(audio_sec=duration)
 
-        if not chunks:
-            logger.warning("[%s] %s produced no chunks (silent or VAD failed).",
-                           split, file_name)
-            continue
+    if not chunks:
+        logger.warning("[%s] %s produced no chunks (silent or VAD failed).",
+                       split, file_name)
+        return None
 
-        logger.info(
-            "[%s] %s: %.1fs -> %d chunk(s)", split, file_name, duration, len(chunks),
-        )
+    logger.info(
+        "[%s] %s: %.1fs -> %d chunk(s)", split, file_name, duration, len(chunks),
+    )
+    return chunks
 
-        for idx, chunk in enumerate(chunks, start=1):
-            chunk_name = _chunk_filename(file_name, idx) if len(chunks) > 1 else file_name
+
+def _emit_chunks(args: CliArgs, client, split: str, row_idx: int, row_dict: dict,
+                 chunks: List[ChunkResult], stats: StageStats,
+                 first_idx: int = 1, multi: Optional[bool] = None) -> RowResult:
+    """Encode/upload stage: write each chunk's WAV and build its metadata row.
+    A streamed file is emitted in several calls: `first_idx` numbers the
+    batch's first chunk, and `multi` says whether the file has more than one
+    chunk overall (defaults to this batch having more than one)."""
+    file_name = row_dict["file_name"]
+    result = RowResult(row_idx, file_name)
+    if multi is None:
+        multi = len(chunks) > 1
+    with stats.track():
+        for idx, chunk in enumerate(chunks, start=first_idx):
+            chunk_name = _chunk_filename(file_name, idx) if multi else file_name
             chunk_audio_key = f"{split}/audio/{chunk_name}"
             target_audio_uri = f"s3://{args.target_bucket}/{chunk_audio_key}"
 
+            wav_bytes = _encode_wav(chunk.audio, chunk.sample_rate)
+            # The source row's probe stats describe the long file, not this
+            # chunk: describe the WAV actually written instead.
+            chunk_info = AudioInfo(duration=len(chunk.audio) / chunk.sample_rate,
+                                   sample_rate=chunk.sample_rate, channels=1, size_bytes=len(wav_bytes))
             base_row = {
-                **row_dict,
+                **{k: v for k, v in row_dict.items() if k not in PROBE_COLUMNS},
+                **chunk_info.to_row(),
                 "file_name": chunk_name,
                 "audio": target_audio_uri,
                 "transcription": chunk.gt_transcript,
@@ -260,25 +587,543 @@ def process_split(
             base_row.setdefault("tags", row_dict.get("tags", ""))
             base_row.setdefault("description", row_dict.get("description", ""))
 
-            wav_bytes = _encode_wav(chunk.audio, chunk.sample_rate)
             _put_object_bytes(
                 client, args.target_bucket, chunk_audio_key, wav_bytes, "audio/wav"
             )
+            stats.add(nbytes=len(wav_bytes), audio_sec=len(chunk.audio) / chunk.sample_rate)
+            result.confidences.append(round(float(chunk.confidence), 4))
 
-            if chunk.confidence < args.confidence_threshold and len(chunks) > 1:
-                base_row["confidence"] = f"{chunk.confidence:.3f}"
+            if chunk.confidence < args.confidence_threshold and multi:
+                base_row["confidence"] = format_cell("confidence", chunk.confidence)
                 base_row["whisper_transcript"] = chunk.whisper_transcript
-                base_row["t_start_sec"] = f"{chunk.t_start_sec:.2f}"
-                base_row["t_end_sec"] = f"{chunk.t_end_sec:.2f}"
+                base_row["t_start_sec"] = format_cell("t_start_sec", chunk.t_start_sec)
+                base_row["t_end_sec"] = format_cell("t_end_sec", chunk.t_end_sec)
                 base_row["source_file"] = file_name
-                low_conf_rows.append(base_row)
+                result.low_conf_rows.append(base_row)
+            else:
+                result.rows.append(base_row)
+    return result
+
+
+def _stream_row(args: CliArgs, client, split: str, item: _Spooled, whisper_model,
+                stats: Dict[str, StageStats], upload_pool: ThreadPoolExecutor) -> Optional[RowResult]:
+    """Inference for a spooled file: decode block by block, chunk with
+    StreamingChunker and upload each batch of final chunks while Whisper
+    carries on. Returns the row's merged result (None if nothing came out)."""
+    file_name = item.row_dict["file_name"]
+    chunker = StreamingChunker(
+        item.row_dict["transcription"] or "",
+        sample_rate=TARGET_SAMPLE_RATE,
+        max_chunk_sec=args.max_chunk_sec,
+        min_chunk_sec=args.min_chunk_sec,
+        language=args.language,
+        whisper_model=whisper_model,
+        whisper_model_size=args.whisper_model,
+        whisper_batch_size=args.whisper_batch_size,
+        duration_sec=item.duration,
+    )
+    uploads = []
+    emitted = 0
+
+    def submit(chunks: List[ChunkResult], multi: bool) -> None:
+        nonlocal emitted, uploads
+        if not chunks:
+            return
+        uploads.append(upload_pool.submit(
+            _emit_chunks, args, client, split, item.row_idx, item.row_dict, chunks,
+            stats["upload"], emitted + 1, multi,
+        ))
+        emitted += len(chunks)
+        # Chunk audio waiting for upload is the other thing that could grow.
+        while sum(not f.done() for f in uploads) > max(1, args.upload_workers) * 2:
+            wait(uploads, return_when=FIRST_COMPLETED)
+
+    try:
+        with stats["inference"].track():
+            for block in _iter_audio_mono16k(item.path):
+                submit(chunker.feed(block), multi=True)  # a final chunk always has two after it
+            tail = chunker.finish()
+        submit(tail, multi=emitted + len(tail) > 1)
+    except Exception:
+        logger.exception("[%s] streaming chunking failed for %s — skipped.", split, file_name)
+        wait(uploads)
+        return None
+    finally:
+        os.unlink(item.path)
+    stats["inference"].add(audio_sec=item.duration)
+    logger.info("[%s] %s: %.1fs -> %d chunk(s) (streamed, peak buffer %.0fs)", split, file_name,
+                item.duration, emitted, chunker.peak_buffer / TARGET_SAMPLE_RATE)
+    if not emitted:
+        logger.warning("[%s] %s produced no chunks (silent or VAD failed).", split, file_name)
+        return None
+
+    result = RowResult(item.row_idx, file_name)
+    for future in uploads:
+        part = future.result()
+        result.rows += part.rows
+        result.low_conf_rows += part.low_conf_rows
+        result.confidences += part.confidences
+    return result
+
+
+def _log_stages(split: str, stages: Dict[str, StageStats], wall_sec: float, done: int, total: int) -> None:
+    logger.info("[%s] %d/%d rows done in %.0fs", split, done, total, wall_sec)
+    for stage in stages.values():
+        logger.info("[%s]   %s", split, stage.summary(wall_sec))
+
+
+def _discard_spooled(fetched: "queue.Queue") -> None:
+    """Remove temp files of fetched rows that inference never got to."""
+    while not fetched.empty():
+        item = fetched.get_nowait()
+        if isinstance(item, BaseException) or item.cancelled() or item.exception() is not None:
+            continue
+        if isinstance(item.result(), _Spooled):
+            os.unlink(item.result().path)
+
+
+def run_pipeline(args: CliArgs, client, split: str, rows: List[Tuple[int, dict]], whisper_model,
+                 on_result: Callable[[RowResult], None] = None) -> Tuple[List[RowResult], Dict[str, StageStats]]:
+    """Run `rows` (`(row_idx, row_dict)`) through three stages:
+
+        fetch pool (server-side copy, or download + decode)
+          -> bounded queue (at most --queue-size decoded files in memory)
+          -> inference on this thread (one Whisper model, not shared)
+          -> encode/upload pool
+
+    so Whisper keeps working while the pools wait on MinIO. Returns the
+    per-row results sorted by row index plus the per-stage counters.
+    `on_result` is called on this thread as each row finishes."""
+    stages = {name: StageStats(name) for name in ("fetch", "inference", "upload")}
+    fetched: "queue.Queue" = queue.Queue()
+    # A slot is held from fetch submission until inference has consumed the row.
+    slots = threading.Semaphore(max(1, args.queue_size))
+    stop = threading.Event()
+    results: Dict[int, RowResult] = {}
+    started = last_log = time.monotonic()
+
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, args.download_workers), thread_name_prefix="fetch")
+    upload_pool = ThreadPoolExecutor(max_workers=max(1, args.upload_workers), thread_name_prefix="upload")
+
+    def feed() -> None:
+        try:
+            for row_idx, row_dict in rows:
+                while not slots.acquire(timeout=0.5):
+                    if stop.is_set():
+                        return
+                if stop.is_set():
+                    return
+                future = fetch_pool.submit(_fetch_row, args, client, split, row_idx, row_dict, stages["fetch"])
+                future.add_done_callback(fetched.put)
+        except BaseException as e:  # surface feeder failures on the main thread
+            fetched.put(e)
+
+    def finish(result: Optional[RowResult]) -> None:
+        if result is None:
+            return
+        results[result.row_idx] = result
+        if on_result is not None:
+            on_result(result)
+
+    def collect(pending: list, keep: int) -> list:
+        while len(pending) > keep:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending = [f for f in pending if f not in done]
+            for future in done:
+                try:
+                    finish(future.result())
+                except Exception:
+                    logger.exception("[%s] upload stage failed — row skipped.", split)
+        return pending
+
+    feeder = threading.Thread(target=feed, name=f"{split}-feeder", daemon=True)
+    uploads = []
+    try:
+        feeder.start()
+        for _ in range(len(rows)):
+            item = fetched.get()
+            if isinstance(item, BaseException):
+                raise item
+            try:
+                value = item.result()
+            except Exception:
+                logger.exception("[%s] fetch stage failed — row skipped.", split)
+                value = None
+
+            if isinstance(value, _Spooled):
+                try:
+                    streamed = _stream_row(args, client, split, value, whisper_model, stages, upload_pool)
+                except Exception:
+                    logger.exception("[%s] upload stage failed — row skipped.", split)
+                    streamed = None
+                slots.release()
+                finish(streamed)
+            elif isinstance(value, _Decoded):
+                chunks = _infer_row(args, split, value, whisper_model, stages["inference"])
+                slots.release()
+                if chunks:
+                    uploads.append(upload_pool.submit(
+                        _emit_chunks, args, client, split, value.row_idx, value.row_dict,
+                        chunks, stages["upload"],
+                    ))
+            else:
+                slots.release()
+                finish(value)
+            # Bound the chunk audio waiting for upload as well.
+            uploads = collect(uploads, keep=max(1, args.upload_workers) * 2)
+
+            now = time.monotonic()
+            if now - last_log >= STAGE_LOG_INTERVAL_SEC:
+                last_log = now
+                _log_stages(split, stages, now - started, len(results), len(rows))
+        collect(uploads, keep=0)
+    finally:
+        stop.set()
+        feeder.join()
+        fetch_pool.shutdown(wait=True, cancel_futures=True)
+        upload_pool.shutdown(wait=True)
+        _discard_spooled(fetched)
+
+    _log_stages(split, stages, time.monotonic() - started, len(results), len(rows))
+    return [results[i] for i in sorted(results)], stages
+
+
+def _configure_logging() -> None:
+    logging.basicConfig(
+        level=os.getenv("BACKEND_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s [%(levelname)s] %(processName)s %(name)s: %(message)s",
+    )
+
+
+def _shard_worker(args: CliArgs, split: str, shard_idx: int, rows: List[Tuple[int, dict]],
+                  cpu_threads: int, out) -> None:
+    """Body of one `--workers` process: its own MinIO client and Whisper
+    model, the usual pipeline over its shard. Every finished row is sent to
+    the parent as `("result", shard, RowResult)`, then `("done", shard,
+    stages)` — or `("error", shard, traceback)`."""
+    try:
+        _configure_logging()
+        client = _make_minio_client(args)
+        whisper_model = load_whisper_model(args.whisper_model, cpu_threads=cpu_threads)
+        _results, stages = run_pipeline(
+            args, client, split, rows, whisper_model,
+            on_result=lambda result: out.put(("result", shard_idx, result)),
+        )
+        out.put(("done", shard_idx, stages))
+    except BaseException:
+        out.put(("error", shard_idx, traceback.format_exc()))
+
+
+def run_sharded(args: CliArgs, split: str, rows: List[Tuple[int, dict]],
+                on_result: Callable[[RowResult], None] = None) -> Tuple[List[RowResult], Dict[str, StageStats]]:
+    """`run_pipeline` across `args.workers` processes. Rows are dealt out
+    round-robin so every shard gets a similar mix of short and long files.
+    Results reach `on_result` (in this process) as each row finishes; the
+    merged list is returned sorted by row index with the summed stage
+    counters. Raises RuntimeError after the other shards finish if any
+    shard failed."""
+    n = min(args.workers, len(rows))
+    cpu_threads = max(1, (os.cpu_count() or 1) // n)
+    ctx = multiprocessing.get_context(SHARD_START_METHOD)
+    out = ctx.Queue()
+    procs = [
+        ctx.Process(target=_shard_worker, name=f"{split}-shard{i}",
+                    args=(args, split, i, rows[i::n], cpu_threads, out))
+        for i in range(n)
+    ]
+    logger.info("[%s] sharding %d row(s) across %d worker(s), %d CPU thread(s) each.",
+                split, len(rows), n, cpu_threads)
+
+    stages = {name: StageStats(name) for name in ("fetch", "inference", "upload")}
+    results: List[RowResult] = []
+    running = set(range(n))
+    failed = []
+    started = time.monotonic()
+    try:
+        for proc in procs:
+            proc.start()
+        while running:
+            try:
+                kind, shard, payload = out.get(timeout=1.0)
+            except queue.Empty:
+                for i in list(running):
+                    if procs[i].exitcode not in (None, 0):  # killed before reporting
+                        running.discard(i)
+                        failed.append(i)
+                        logger.error("[%s] worker %d exited with code %s.", split, i, procs[i].exitcode)
+                continue
+            if kind == "result":
+                results.append(payload)
+                if on_result is not None:
+                    on_result(payload)
+            elif kind == "done":
+                running.discard(shard)
+                for name, stage in payload.items():
+                    stages[name].merge(stage)
             else:
-                out_rows.append(base_row)
+                running.discard(shard)
+                failed.append(shard)
+                logger.error("[%s] worker %d failed:\n%s", split, shard, payload)
+    finally:
+        for proc in procs:
+            if proc.is_alive() and running:
+                proc.terminate()
+            proc.join()
+
+    wall_sec = time.monotonic() - started
+    _log_stages(split, stages, wall_sec, len(results), len(rows))
+    audio_sec = stages["inference"].audio_sec
+    if audio_sec:
+        logger.info(
+            "[%s] %d worker(s): %.0fs of audio in %.0fs wall — aggregate RTF %.3f "
+            "(per-worker %.3f)",
+            split, n, audio_sec, wall_sec, wall_sec / audio_sec,
+            stages["inference"].busy_sec / audio_sec,
+        )
+    if failed:
+        raise RuntimeError(f"[{split}] preprocess worker(s) {sorted(failed)} failed")
+    return sorted(results, key=lambda result: result.row_idx), stages
+
+
+def _fingerprint(audio_etag: str, transcription: str) -> str:
+    """What a source row's output depends on: its audio bytes (ETag) and
+    its transcript. The file name is the manifest key."""
+    digest = hashlib.sha1((transcription or "").encode("utf-8")).hexdigest()[:16]
+    return f"{audio_etag}:{digest}"
+
+
+def _source_fingerprints(client, args: CliArgs, split: str, rows: List[Tuple[int, dict]]) -> Dict[str, str]:
+    """One LIST of the source audio prefix gives every ETag."""
+    prefix = f"{split}/audio/"
+    etags = {
+        obj.object_name[len(prefix):]: (obj.etag or "").strip('"')
+        for obj in client.list_objects(args.source_bucket, prefix=prefix, recursive=True)
+    }
+    return {
+        row_dict["file_name"]: _fingerprint(etags.get(row_dict["file_name"], ""), row_dict["transcription"])
+        for _idx, row_dict in rows
+    }
+
+
+def _settings(args: CliArgs) -> dict:
+    """Arguments that change the output; a manifest written with other values is not reused."""
+    return {
+        "max_chunk_sec": args.max_chunk_sec,
+        "min_chunk_sec": args.min_chunk_sec,
+        "confidence_threshold": args.confidence_threshold,
+        "whisper_model": args.whisper_model,
+        "language": args.language,
+        "whisper_batch_size": args.whisper_batch_size,  # batched decoding segments differently
+        "stream_above_sec": args.stream_above_sec,
+    }
+
+
+def _chunk_names(entry: dict) -> set:
+    return {row["file_name"] for row in entry["rows"] + entry["low_conf_rows"]}
+
+
+class PreprocessManifest:
+    """Progress checkpoint at `{split}/_preprocess_manifest.json` in the
+    target bucket: for every finished source file, its fingerprint (audio
+    ETag + transcript hash), the metadata rows its chunks produced and their
+    confidences. Saved every `--checkpoint-interval` seconds, so a job that
+    dies only redoes the rows that were in flight, and a re-run only
+    processes source rows that are new or whose fingerprint changed."""
+
+    def __init__(self, client, args: CliArgs, split: str, entries: Dict[str, dict] = None):
+        self.client = client
+        self.bucket = args.target_bucket
+        self.source_bucket = args.source_bucket
+        self.settings = _settings(args)
+        self.split = split
+        self.interval_sec = args.checkpoint_interval_sec
+        self.entries: Dict[str, dict] = entries or {}
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    @property
+    def key(self) -> str:
+        return f"{self.split}/{MANIFEST_NAME}"
+
+    @classmethod
+    def load(cls, client, args: CliArgs, split: str) -> "PreprocessManifest":
+        manifest = cls(client, args, split)
+        try:
+            data = json.loads(_read_object_bytes(client, args.target_bucket, manifest.key))
+        except Exception:
+            return manifest  # first run (or unreadable): start empty
+        if (data.get("version") != MANIFEST_VERSION or data.get("source_bucket") != args.source_bucket
+                or data.get("settings") != manifest.settings):
+            logger.warning("[%s] %s was written for another source, version or settings — ignoring it.",
+                           split, manifest.key)
+            return manifest
+        manifest.entries = data.get("files", {})
+        return manifest
 
-        if (row_idx + 1) % 25 == 0:
-            logger.info("[%s] processed %d/%d rows", split, row_idx + 1, len(df))
+    def lookup(self, row_idx: int, row_dict: dict, fingerprint: str) -> Optional[RowResult]:
+        """The stored result for an unchanged source row, else None."""
+        entry = self.entries.get(row_dict["file_name"])
+        if entry is None or entry.get("fingerprint") != fingerprint:
+            return None
+        return RowResult(row_idx, row_dict["file_name"], rows=entry["rows"],
+                         low_conf_rows=entry["low_conf_rows"], confidences=entry["confidences"])
 
-    _write_csv(client, args.target_bucket, f"{split}/metadata.csv", out_rows)
+    def record(self, result: RowResult, fingerprint: str) -> None:
+        self.entries[result.file_name] = {
+            "fingerprint": fingerprint,
+            "rows": result.rows,
+            "low_conf_rows": result.low_conf_rows,
+            "confidences": result.confidences,
+        }
+        self._dirty = True
+        if time.monotonic() - self._saved_at >= self.interval_sec:
+            self.save()
+
+    def retain(self, file_names) -> Dict[str, dict]:
+        """Forget source files that are no longer in the source metadata;
+        returns their entries."""
+        keep = set(file_names)
+        removed = {name: entry for name, entry in self.entries.items() if name not in keep}
+        for name in removed:
+            del self.entries[name]
+            self._dirty = True
+        return removed
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        payload = json.dumps({
+            "version": MANIFEST_VERSION,
+            "source_bucket": self.source_bucket,
+            "settings": self.settings,
+            "split": self.split,
+            "updated_at": time.time(),
+            "files": self.entries,
+        }, ensure_ascii=False).encode("utf-8")
+        _put_object_bytes(self.client, self.bucket, self.key, payload, "application/json")
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        logger.info("[%s] checkpoint: %d source file(s) done", self.split, len(self.entries))
+
+
+def _remove_target_audio(client, args: CliArgs, split: str, chunk_names) -> None:
+    from minio.deleteobjects import DeleteObject  # noqa: WPS433
+
+    keys = [f"{split}/audio/{name}" for name in sorted(chunk_names)]
+    if not keys:
+        return
+    for error in client.remove_objects(args.target_bucket, [DeleteObject(k) for k in keys]):
+        logger.warning("[%s] could not delete stale chunk %s: %s", split, error.name, error)
+    logger.info("[%s] removed %d stale chunk(s) from %s.", split, len(keys), args.target_bucket)
+
+
+def _target_store(client, args: CliArgs):
+    """MetadataStore for the target bucket, so the merge below goes through
+    the same delta log and conditional PUTs as the backend's own writers.
+    Those need `put_object_if_match`, which a raw Minio client lacks."""
+    from backend.services.metadata_store import MetadataStore  # noqa: WPS433
+    from backend.services.minio_client import MinioClientWrapper  # noqa: WPS433
+
+    if not hasattr(client, "put_object_if_match"):
+        client = MinioClientWrapper(args.minio_endpoint, args.minio_access_key,
+                                    args.minio_secret_key, secure=args.minio_secure)
+    return MetadataStore(client)
+
+
+def _merge_target_metadata(client, args: CliArgs, split: str, results: List[RowResult],
+                           new_results: List[RowResult], stale_chunks: set) -> None:
+    """Merge this run into the target `{split}/metadata.csv`: upsert the rows
+    of (re)processed source files, delete chunks their source no longer
+    produces, re-add rows of unchanged files only if they are missing (so
+    edits made in the target since the last run survive) and keep every
+    other row, e.g. files uploaded to the target directly."""
+    from backend.services.metadata_store import apply_delta_ops  # noqa: WPS433
+
+    reprocessed = {result.file_name for result in new_results}
+
+    def mutate(df: pd.DataFrame):
+        present = set(df["file_name"])
+        ops = [{"op": "delete", "file_name": name} for name in sorted(stale_chunks)]
+        for result in results:
+            for row in result.rows:
+                if result.file_name in reprocessed or row["file_name"] not in present:
+                    ops.append({"op": "upsert", "row": {k: "" if pd.isna(v) else str(v) for k, v in row.items()}})
+        return apply_delta_ops(df, ops), None
+
+    _target_store(client, args).update(args.target_bucket, split, mutate)
+
+
+def process_split(
+    args: CliArgs,
+    client,
+    split: str,
+    whisper_model,
+) -> None:
+    src_csv_key = f"{split}/metadata.csv"
+    try:
+        df = _read_metadata(client, args.source_bucket, src_csv_key)
+    except Exception:
+        logger.warning("No %s in %s — skipping split.", src_csv_key, args.source_bucket)
+        return
+
+    required = {"file_name", "transcription"}
+    missing = required - set(df.columns)
+    if missing:
+        logger.error("Source %s missing columns: %s", src_csv_key, missing)
+        return
+
+    rows = [
+        (row_idx, {col: getattr(row, col, "") for col in df.columns})
+        for row_idx, row in enumerate(df.itertuples(index=False))
+    ]
+    fingerprints = _source_fingerprints(client, args, split, rows)
+    if args.resume:
+        manifest = PreprocessManifest.load(client, args, split)
+    else:
+        manifest = PreprocessManifest(client, args, split)
+    stale_chunks = set()
+    for entry in manifest.retain(fingerprints).values():
+        stale_chunks |= _chunk_names(entry)
+
+    done, todo, changed = [], [], {}
+    for row_idx, row_dict in rows:
+        previous = manifest.lookup(row_idx, row_dict, fingerprints[row_dict["file_name"]])
+        if previous is not None:
+            done.append(previous)
+            continue
+        todo.append((row_idx, row_dict))
+        if row_dict["file_name"] in manifest.entries:
+            changed[row_dict["file_name"]] = _chunk_names(manifest.entries[row_dict["file_name"]])
+    if done:
+        logger.info("[%s] incremental: %d row(s) unchanged, %d new, %d changed.",
+                    split, len(done), len(todo) - len(changed), len(changed))
+
+    def record(result: RowResult) -> None:
+        manifest.record(result, fingerprints[result.file_name])
+
+    try:
+        if args.workers > 1 and len(todo) > 1:
+            new_results, _stages = run_sharded(args, split, todo, on_result=record)
+        else:
+            if whisper_model is None and args.workers > 1 and todo:
+                whisper_model = load_whisper_model(args.whisper_model)  # a single row left
+            new_results, _stages = run_pipeline(args, client, split, todo, whisper_model, on_result=record)
+    finally:
+        # Keep whatever finished, even if the run is dying.
+        manifest.save()
+
+    # Chunks that a changed or removed source row no longer produces.
+    for result in new_results:
+        stale_chunks |= changed.get(result.file_name, set()) - _chunk_names(manifest.entries[result.file_name])
+    _remove_target_audio(client, args, split, stale_chunks)
+
+    results = sorted(done + new_results, key=lambda result: result.row_idx)
+    low_conf_rows = [r for result in results for r in result.low_conf_rows]
+    if args.fast_path:
+        logger.info("[%s] %d/%d short file(s) copied server-side without decoding.",
+                    split, sum(result.copied for result in results), len(rows))
+
+    _merge_target_metadata(client, args, split, results, new_results, stale_chunks)
     if low_conf_rows:
         _write_csv(
             client, args.target_bucket, f"{split}/low_confidence.csv", low_conf_rows
@@ -292,6 +1137,18 @@ def process_split(
         )
 
 
+def _read_metadata(client, bucket: str, csv_key: str) -> pd.DataFrame:
+    """Split metadata as an all-string DataFrame, from the Parquet sidecar
+    when it is current and from the CSV otherwise."""
+    etag = client.stat_object(bucket, csv_key).etag
+    if fresh_parquet(client, bucket, csv_key, etag):
+        try:
+            return read_parquet_bytes(_read_object_bytes(client, bucket, parquet_key(csv_key)))
+        except Exception:
+            logger.warning("Unreadable %s — falling back to CSV.", parquet_key(csv_key), exc_info=True)
+    return read_csv_bytes(_read_object_bytes(client, bucket, csv_key))
+
+
 def _write_csv(client, bucket: str, key: str, rows: List[dict]) -> None:
     if not rows:
         # Still write an empty CSV with whatever schema we know — downstream
@@ -302,14 +1159,13 @@ def _write_csv(client, bucket: str, key: str, rows: List[dict]) -> None:
     buf = io.BytesIO()
     df.to_csv(buf, index=False)
     payload = buf.getvalue()
-    _put_object_bytes(client, bucket, key, payload, "text/csv")
+    result = _put_object_bytes(client, bucket, key, payload, "text/csv")
+    if parquet_enabled():
+        put_parquet(client, bucket, key, df.fillna(""), getattr(result, "etag", None))
 
 
 def main(argv: Optional[List[str]] = None) -> int:
-    logging.basicConfig(
-        level=os.getenv("BACKEND_LOG_LEVEL", "INFO").upper(),
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    )
+    _configure_logging()
     args = parse_args(argv)
 
     invalid_splits = [s for s in args.splits if s not in SUPPORTED_SPLITS]
@@ -325,8 +1181,10 @@ def main(argv: Optional[List[str]] = None) -> int:
         logger.info("Target bucket %s does not exist — creating it.", args.target_bucket)
         client.make_bucket(args.target_bucket)
 
-    logger.info("Loading Whisper model %s ...", args.whisper_model)
-    whisper_model = load_whisper_model(args.whisper_model)
+    whisper_model = None
+    if args.workers == 1:  # otherwise each worker process loads its own
+        logger.info("Loading Whisper model %s ...", args.whisper_model)
+        whisper_model = load_whisper_model(args.whisper_model)
 
     for split in args.splits:
         logger.info("=== Processing split: %s ===", split)
@@ -1,80 +1,91 @@
+import asyncio
+import re
 import pandas as pd
-from io import BytesIO, StringIO
-from .minio_client import minio_client, MinioClientWrapper
+from io import BytesIO
+from backend.mlops.audio_probe import PROBE_COLUMNS, probe_bytes, probe_fileobj, probe_object
+from backend.mlops.metadata_format import format_cell
+from .minio_client import minio_client, MinioClientWrapper, TransferEngine
+from .metadata_index import MetadataIndex, metadata_index
+from .metadata_store import MetadataStore
+
+# {split}/metadata.csv (+ its .parquet sidecar), {split}/_deltas/* and {split}/_folded/* — rebuilt, not copied, by clone_bucket.
+_SPLIT_METADATA_RE = re.compile(r"^([^/]+)/(?:metadata\.(?:csv|parquet)$|_deltas/|_folded/)")
+
+
+def audio_stats(info, size: int = None) -> dict:
+    """Metadata cells for a probe result. Formats the probe cannot parse
+    still get their byte size."""
+    if info is not None:
+        return info.to_row()
+    return {"size_bytes": format_cell("size_bytes", size)}
+
+
+def probe_audio_objects(client, bucket_name: str, objects, *, progress=None, cancel_event=None,
+                        engine: TransferEngine = None):
+    """Probe `(object_name, size)` pairs in parallel with ranged header reads.
+    Returns `({object_name: stats cells}, TransferReport)`."""
+    sizes = dict(objects)
+    stats = {}
+
+    def probe_one(name):
+        info = probe_object(client, bucket_name, name, size=sizes[name])
+        stats[name] = audio_stats(info, sizes[name])
+        return 0
+
+    report = (engine or TransferEngine()).run(list(sizes), probe_one, progress=progress, cancel_event=cancel_event)
+    return stats, report
+
 
 class DatasetManager:
-    def __init__(self, client: MinioClientWrapper):
+    def __init__(self, client: MinioClientWrapper, index: MetadataIndex = metadata_index):
         self.client = client
+        self.index = index
+        self.store = MetadataStore(client)
+        self.cache = self.store.cache
 
-    def get_dataset(self, bucket_name: str, split: str, page: int = 1, limit: int = 50, search: str = None):
+    def get_dataset(self, bucket_name: str, split: str, page: int = 1, limit: int = 50, search: str = None,
+                    tags: list[str] = None, tag_mode: str = "and"):
         """
-        Reads metadata.csv from the specified bucket and split (train/test),
-        and generates presigned URLs for each audio file.
-        Returns paginated results.
+        Serves one page of {split}/metadata.csv (plus pending deltas) from the
+        local metadata index, and generates presigned URLs for each audio file.
+        The index is resynced only when the object's ETag or the delta log changes;
+        `search` supports phrases ("..."), prefixes (foo*) and tag:name filters;
+        `tags` keeps rows with all (tag_mode="and") or any ("or") of the tags.
         """
-        csv_key = f"{split}/metadata.csv"
         try:
-            # Get the object from MinIO
-            response = self.client.get_object(bucket_name, csv_key)
-            csv_content = response.read()
-            response.close()
-            response.release_conn()
-
-            # Parse CSV
-            df = pd.read_csv(BytesIO(csv_content), dtype=str, keep_default_na=False)
-            
-            # Ensure tags and description columns exist
-            if 'tags' not in df.columns:
-                df['tags'] = ""
-            if 'description' not in df.columns:
-                df['description'] = ""
-            
-            # Aggregate Unique Tags
-            unique_tags = set()
-            if 'tags' in df.columns:
-                for tags_str in df['tags']:
-                    if not tags_str: continue # Skip empty strings
-                    # Split by comma, strip whitespace
-                    current_tags = [t.strip() for t in str(tags_str).split(',') if t.strip()]
-                    unique_tags.update(current_tags)
-            
-            # Search Filter
-            if search:
-                search_lower = search.lower()
-                mask = (
-                    df['file_name'].str.lower().str.contains(search_lower, na=False) |
-                    df['transcription'].str.lower().str.contains(search_lower, na=False) |
-                    df['tags'].str.lower().str.contains(search_lower, na=False)
-                )
-                df = df[mask]
-            
-            total_items = len(df)
-            
-            # Pagination Logic
-            start_idx = (page - 1) * limit
-            end_idx = start_idx + limit
-            
-            # Slice the dataframe
-            paginated_df = df.iloc[start_idx:end_idx].copy()
-            
-            # Add presigned URL
-            def generate_url(s3_uri):
-                if not isinstance(s3_uri, str):
-                    return None
-                prefix = f"s3://{bucket_name}/"
-                if s3_uri.startswith(prefix):
-                    object_name = s3_uri[len(prefix):]
-                    return self.client.get_presigned_url(bucket_name, object_name)
-                return None
-
-            paginated_df['audio_url'] = paginated_df['audio'].apply(generate_url)
-            
+            # Cheap HEAD + LIST — tells us whether the index is stale.
+            version = self.store.version(bucket_name, split)
+            if not self.store.exists(version):
+                raise FileNotFoundError(f"{split}/metadata.csv not found in {bucket_name}")
+            self.index.ensure(
+                bucket_name,
+                split,
+                version.token,
+                lambda: self.store.load(bucket_name, split, version)[0],
+            )
+            result = self.index.query(
+                bucket_name, split, page=page, limit=limit, search=search, tags=tags, tag_mode=tag_mode
+            )
+
+            # Add presigned URLs, signed in one batch (repeat views hit the cache)
+            prefix = f"s3://{bucket_name}/"
+            signable = [
+                row for row in result["data"]
+                if isinstance(row.get("audio"), str) and row["audio"].startswith(prefix)
+            ]
+            urls = self.client.get_presigned_urls(bucket_name, [row["audio"][len(prefix):] for row in signable])
+            for row in result["data"]:
+                row["audio_url"] = None
+            for row, url in zip(signable, urls):
+                row["audio_url"] = url
+
             return {
-                "total": total_items,
+                "total": result["total"],
                 "page": page,
                 "limit": limit,
-                "unique_tags": sorted(list(unique_tags)),
-                "data": paginated_df.to_dict(orient="records")
+                "unique_tags": result["unique_tags"],
+                "tag_counts": result["tag_counts"],
+                "data": result["data"]
             }
 
         except Exception as e:
@@ -84,25 +95,37 @@ class DatasetManager:
                 "page": page,
                 "limit": limit,
                 "unique_tags": [],
+                "tag_counts": [],
                 "data": []
             }
 
+    def _read_metadata(self, bucket_name: str, split: str):
+        """Merged metadata (CSV + pending deltas) and the version it was read at.
+        Raises FileNotFoundError when the split has no metadata at all."""
+        df, version = self.store.load(bucket_name, split)
+        if not self.store.exists(version):
+            raise FileNotFoundError(f"{split}/metadata.csv not found in {bucket_name}")
+        return df, version
+
+    def _update_metadata(self, bucket_name: str, split: str, mutate):
+        """Transactional read -> mutate -> conditional write of the split's
+        metadata; `mutate(df)` returns `(new_df, result)`. Concurrent edits
+        to the same split are batched and retried on conflict."""
+        if not self.store.exists(self.store.version(bucket_name, split)):
+            raise FileNotFoundError(f"{split}/metadata.csv not found in {bucket_name}")
+        return self.store.update(bucket_name, split, mutate)
+
+    def compact(self, bucket_name: str, split: str) -> int:
+        """Fold pending metadata deltas into {split}/metadata.csv."""
+        return self.store.compact(bucket_name, split)
+
     def update_transcription(self, bucket_name: str, split: str, file_name: str, new_transcription: str, tags: str = None, description: str = None):
         """
         Updates the transcription for a specific file in metadata.csv.
-        Note: This is not atomic and not safe for concurrent writes.
+        Safe under concurrent edits: the write is conditional on the ETag that
+        was read and is retried on conflict.
         """
-        csv_key = f"{split}/metadata.csv"
-        try:
-            # 1. Download
-            response = self.client.get_object(bucket_name, csv_key)
-            csv_content = response.read()
-            response.close()
-            response.release_conn()
-            
-            df = pd.read_csv(BytesIO(csv_content), dtype=str, keep_default_na=False)
-            
-            # 2. Update
+        def mutate(df):
             # Find row by file_name
             mask = df['file_name'] == file_name
             if not mask.any():
@@ -113,26 +136,16 @@ class DatasetManager:
             if tags is not None:
                 if 'tags' not in df.columns:
                     df['tags'] = ""
-                df.loc[mask, 'tags'] = tags
+                df.loc[mask, 'tags'] = format_cell('tags', tags)
                 
             if description is not None:
                 if 'description' not in df.columns:
                     df['description'] = ""
                 df.loc[mask, 'description'] = description
-            
-            # 3. Upload back
-            csv_buffer = StringIO()
-            df.to_csv(csv_buffer, index=False)
-            new_csv_content = csv_buffer.getvalue().encode('utf-8')
-            
-            self.client.put_object(
-                bucket_name, 
-                csv_key, 
-                BytesIO(new_csv_content), 
-                len(new_csv_content), 
-                content_type="text/csv"
-            )
-            return True
+            return df, True
+
+        try:
+            return self._update_metadata(bucket_name, split, mutate)
             
         except Exception as e:
             print(f"Error updating transcription: {e}")
@@ -140,10 +153,9 @@ class DatasetManager:
 
     def add_audio_record(self, bucket_name: str, split: str, file_name: str, transcription: str, audio_data: bytes, tags: str = None, description: str = None):
         """
-        Uploads an audio file and appends it to metadata.csv
+        Uploads an audio file and appends it to the metadata delta log
         """
         audio_key = f"{split}/audio/{file_name}"
-        csv_key = f"{split}/metadata.csv"
         
         try:
             # 1. Upload Audio
@@ -155,41 +167,17 @@ class DatasetManager:
                 content_type="audio/wav"
             )
             
-            # 2. Update CSV
-            # Download first
-            try:
-                response = self.client.get_object(bucket_name, csv_key)
-                csv_content = response.read()
-                response.close()
-                response.release_conn()
-                df = pd.read_csv(BytesIO(csv_content), dtype=str, keep_default_na=False)
-            except Exception:
-                # If CSV doesn't exist, create new DataFrame
-                df = pd.DataFrame(columns=['file_name', 'audio', 'transcription', 'tags', 'description'])
-            
-            # Append new row
+            # 2. Append the row as a small delta object — no CSV download needed.
+            # The compactor folds it into metadata.csv later.
             new_row = {
                 'file_name': file_name,
                 'audio': f"s3://{bucket_name}/{audio_key}",
                 'transcription': transcription,
-                'tags': tags if tags else "",
-                'description': description if description else ""
+                'tags': format_cell('tags', tags),
+                'description': description if description else "",
+                **audio_stats(probe_bytes(audio_data), len(audio_data)),
             }
-            # Using concatenation instead of append (deprecated)
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            
-            # Upload back
-            csv_buffer = StringIO()
-            df.to_csv(csv_buffer, index=False)
-            new_csv_content = csv_buffer.getvalue().encode('utf-8')
-            
-            self.client.put_object(
-                bucket_name, 
-                csv_key, 
-                BytesIO(new_csv_content), 
-                len(new_csv_content), 
-                content_type="text/csv"
-            )
+            self.store.append(bucket_name, split, [{"op": "upsert", "row": new_row}])
             return True
             
         except Exception as e:
@@ -198,8 +186,22 @@ class DatasetManager:
 
     async def add_bulk_records(self, bucket_name: str, split: str, audio_files: list, metadata_content: bytes):
         """
-        Uploads multiple audio files and appends entries from uploaded CSV to metadata.csv
+        Uploads multiple audio files and appends entries from uploaded CSV to the metadata delta log.
+        The blocking MinIO work runs off the event loop.
         """
+        uploads = []
+        for file in audio_files:
+            # UploadFile has already spooled the body to a temp file; stream
+            # from it instead of reading it into memory.
+            fileobj = file.file
+            size = file.size
+            if size is None:
+                size = fileobj.seek(0, 2)
+                fileobj.seek(0)
+            uploads.append((file.filename, fileobj, size))
+        return await asyncio.to_thread(self._add_bulk_records, bucket_name, split, uploads, metadata_content)
+
+    def _add_bulk_records(self, bucket_name: str, split: str, uploads: list, metadata_content: bytes):
         try:
             # 1. Parse Uploaded CSV
             new_df = pd.read_csv(BytesIO(metadata_content), dtype=str, keep_default_na=False)
@@ -207,36 +209,31 @@ class DatasetManager:
             if not required_cols.issubset(new_df.columns):
                 raise ValueError(f"CSV missing required columns: {required_cols}")
 
-            # 2. Upload Audio Files
-            for file in audio_files:
-                audio_key = f"{split}/audio/{file.filename}"
-                content = await file.read()
-                self.client.put_object(
-                    bucket_name,
-                    audio_key,
-                    BytesIO(content),
-                    len(content),
-                    content_type="audio/wav"
-                )
+            # Header-only probe of the spooled files, before they are streamed out.
+            stats = {}
+            for name, fileobj, size in uploads:
+                try:
+                    stats[name] = audio_stats(probe_fileobj(fileobj, size), size)
+                except Exception as e:
+                    print(f"Could not probe {name}: {e}")
 
-            # 3. Update master metadata.csv
-            csv_key = f"{split}/metadata.csv"
-            
-            # Download existing CSV
-            try:
-                response = self.client.get_object(bucket_name, csv_key)
-                existing_csv_content = response.read()
-                response.close()
-                response.release_conn()
-                master_df = pd.read_csv(BytesIO(existing_csv_content), dtype=str, keep_default_na=False)
-            except Exception:
-                master_df = pd.DataFrame(columns=['file_name', 'audio', 'transcription'])
-
-            # Prepare new rows
+            # 2. Upload Audio Files (bounded parallel pool, multipart for large files)
+            audio_prefix = f"{split}/audio/"
+            report = self.client.upload_objects(
+                bucket_name,
+                [(audio_prefix + name, fileobj, size, "audio/wav") for name, fileobj, size in uploads],
+            )
+            failed = {name[len(audio_prefix):]: error for name, error in report.failed.items()}
+            for file_name, error in failed.items():
+                print(f"Failed to upload {file_name}: {error}")
+
+            # 3. Prepare new rows
             rows_to_add = []
             for _, row in new_df.iterrows():
-                # Check if this file was part of the upload or just a reference
-                # Ideally, we verify against `audio_files` names, but for bulk it might be loose.
+                # Rows may reference audio that is already in the bucket, so only
+                # rows whose upload failed in this request are skipped.
+                if row['file_name'] in failed:
+                    continue
                 # format: s3://{bucket_name}/{split}/audio/{file_name}
                 s3_path = f"s3://{bucket_name}/{split}/audio/{row['file_name']}"
                 
@@ -244,89 +241,106 @@ class DatasetManager:
                     'file_name': row['file_name'],
                     'audio': s3_path,
                     'transcription': row['transcription'],
-                    'tags': row['tags'] if 'tags' in row else "",
-                    'description': row['description'] if 'description' in row else ""
+                    'tags': format_cell('tags', row['tags'] if 'tags' in row else ""),
+                    'description': row['description'] if 'description' in row else "",
+                    **stats.get(row['file_name'], {}),
                 }
                 rows_to_add.append(new_record)
 
-            # Append using concat
+            # 4. Append as one delta. Upserts are keyed on file_name, so
+            # re-uploading a file replaces its row instead of duplicating it.
             if rows_to_add:
-                master_df = pd.concat([master_df, pd.DataFrame(rows_to_add)], ignore_index=True)
-            
-            # Deduplicate based on file_name, keeping the latest one to prevent unlimited expansion
-            if not master_df.empty:
-                master_df.drop_duplicates(subset=['file_name'], keep='last', inplace=True)
-
-            # Upload back
-            csv_buffer = StringIO()
-            master_df.to_csv(csv_buffer, index=False)
-            new_csv_content = csv_buffer.getvalue().encode('utf-8')
-            
-            self.client.put_object(
-                bucket_name, 
-                csv_key, 
-                BytesIO(new_csv_content), 
-                len(new_csv_content), 
-                content_type="text/csv"
-            )
-            return len(rows_to_add)
+                self.store.append(bucket_name, split, [{"op": "upsert", "row": r} for r in rows_to_add])
+
+            elapsed = report.elapsed_sec
+            return {
+                "count": len(rows_to_add),
+                "files": [
+                    {"file_name": name, "status": "failed" if name in failed else "uploaded", "error": failed.get(name)}
+                    for name, _fileobj, _size in uploads
+                ],
+                "uploaded_bytes": report.bytes,
+                "elapsed_sec": round(elapsed, 3),
+                "mb_per_sec": round(report.bytes / elapsed / (1024 * 1024), 3) if elapsed > 0 else 0.0,
+            }
 
         except Exception as e:
             print(f"Error in bulk upload: {e}")
             raise e
 
+    def probe_audio(self, bucket_name: str, split: str, only_missing: bool = True, progress=None, cancel_event=None):
+        """
+        Backfill duration / sample_rate / channels / size_bytes for a split
+        from ranged header reads of its audio objects.
+        """
+        df, _version = self._read_metadata(bucket_name, split)
+        names = df['file_name']
+        if only_missing and 'duration' in df.columns:
+            names = names[df['duration'] == ""]
+
+        audio_prefix = f"{split}/audio/"
+        sizes = {
+            obj.object_name[len(audio_prefix):]: obj.size
+            for obj in self.client.list_objects(bucket_name, prefix=audio_prefix, recursive=True)
+        }
+        targets = [name for name in dict.fromkeys(names) if name in sizes]
+        stats, report = probe_audio_objects(
+            self.client, bucket_name, [(audio_prefix + name, sizes[name]) for name in targets],
+            progress=progress, cancel_event=cancel_event,
+        )
+        for object_name, error in report.failed.items():
+            print(f"Failed to probe {object_name}: {error}")
+        updates = {name[len(audio_prefix):]: cells for name, cells in stats.items()}
+
+        def apply_stats(df):
+            df = df.copy()
+            for col in PROBE_COLUMNS:
+                values = {name: cells[col] for name, cells in updates.items() if col in cells}
+                if not values:
+                    continue
+                if col not in df.columns:
+                    df[col] = ""
+                df[col] = df['file_name'].map(values).fillna(df[col])
+            return df, None
+
+        if updates:
+            self._update_metadata(bucket_name, split, apply_stats)
+        return {
+            "probed": sum(1 for cells in updates.values() if cells.get("duration")),
+            "unknown_format": sum(1 for cells in updates.values() if not cells.get("duration")),
+            "missing_audio": len(set(names)) - len(targets),
+            "failed": len(report.failed),
+            "cancelled": report.cancelled,
+        }
+
     def get_rows_metadata(self, bucket_name: str, split: str, file_names: list[str]) -> list[dict]:
         """Return metadata dicts for the given file names."""
-        csv_key = f"{split}/metadata.csv"
-        response = self.client.get_object(bucket_name, csv_key)
-        csv_content = response.read()
-        response.close()
-        response.release_conn()
-
-        df = pd.read_csv(BytesIO(csv_content), dtype=str, keep_default_na=False)
+        df, _version = self._read_metadata(bucket_name, split)
         matched = df[df["file_name"].isin(file_names)]
         return matched.to_dict(orient="records")
 
-    def delete_rows(self, bucket_name: str, split: str, file_names: list[str]):
+    def delete_rows(self, bucket_name: str, split: str, file_names: list[str], progress=None, cancel_event=None):
         """
         Batch delete rows from metadata.csv and delete associated audio files from MinIO.
         """
-        csv_key = f"{split}/metadata.csv"
+        def mutate(df):
+            # Filter out deleted rows
+            kept = df[~df['file_name'].isin(file_names)]
+            return kept, len(df) - len(kept)
+
         try:
-            # 1. Download CSV
-            response = self.client.get_object(bucket_name, csv_key)
-            csv_content = response.read()
-            response.close()
-            response.release_conn()
-            df = pd.read_csv(BytesIO(csv_content), dtype=str, keep_default_na=False)
-            
-            # 2. Filter out deleted rows
-            original_len = len(df)
-            df = df[~df['file_name'].isin(file_names)]
-            deleted_count = original_len - len(df)
-            
-            # 3. Upload updated CSV
-            csv_buffer = StringIO()
-            df.to_csv(csv_buffer, index=False)
-            new_csv_content = csv_buffer.getvalue().encode('utf-8')
-            
-            self.client.put_object(
-                bucket_name, 
-                csv_key, 
-                BytesIO(new_csv_content), 
-                len(new_csv_content), 
-                content_type="text/csv"
-            )
+            # 1-3. Remove the rows from metadata.csv (transactional)
+            deleted_count = self._update_metadata(bucket_name, split, mutate)
 
-            # 4. Delete Audio Files from MinIO
-            # Note: This could be slow if many files. In production, use remove_objects for batch delete.
-            # But minio python sdk remove_objects takes a list of DeleteObject.
-            from minio.deleteobjects import DeleteObject
-            
-            objects_to_delete = [DeleteObject(f"{split}/audio/{fname}") for fname in file_names]
-            errors = self.client.remove_objects(bucket_name, objects_to_delete)
-            for error in errors:
-                print(f"Error deleting object {error}")
+            # 4. Delete Audio Files from MinIO (parallel 1000-key DeleteObjects batches)
+            report = self.client.delete_objects(
+                bucket_name,
+                [f"{split}/audio/{fname}" for fname in file_names],
+                progress=progress,
+                cancel_event=cancel_event,
+            )
+            for object_name, error in report.failed.items():
+                print(f"Error deleting object {object_name}: {error}")
                 
             return deleted_count
 
@@ -338,67 +352,39 @@ class DatasetManager:
         """
         Batch add a tag to multiple rows.
         """
-        csv_key = f"{split}/metadata.csv"
-        try:
-            # 1. Download CSV
-            response = self.client.get_object(bucket_name, csv_key)
-            csv_content = response.read()
-            response.close()
-            response.release_conn()
-            df = pd.read_csv(BytesIO(csv_content), dtype=str, keep_default_na=False)
+        def append_tag(existing_tags):
+            tags_list = [t.strip() for t in str(existing_tags).split(',') if t.strip()]
+            # Handle multiple new tags (comma separated)
+            new_tags_list = [t.strip() for t in new_tag.split(',') if t.strip()]
             
+            for t in new_tags_list:
+                if t not in tags_list:
+                    tags_list.append(t)
+            return format_cell('tags', tags_list)
+
+        def mutate(df):
             # Ensure tags column exists
             if 'tags' not in df.columns:
                 df['tags'] = ""
-            
-            # 2. Update Tags
             mask = df['file_name'].isin(file_names)
-            
-            def append_tag(existing_tags):
-                tags_list = [t.strip() for t in str(existing_tags).split(',') if t.strip()]
-                # Handle multiple new tags (comma separated)
-                new_tags_list = [t.strip() for t in new_tag.split(',') if t.strip()]
-                
-                for t in new_tags_list:
-                    if t not in tags_list:
-                        tags_list.append(t)
-                return ", ".join(tags_list)
-            
             df.loc[mask, 'tags'] = df.loc[mask, 'tags'].apply(append_tag)
-            
-            # 3. Upload updated CSV
-            csv_buffer = StringIO()
-            df.to_csv(csv_buffer, index=False)
-            new_csv_content = csv_buffer.getvalue().encode('utf-8')
-            
-            self.client.put_object(
-                bucket_name, 
-                csv_key, 
-                BytesIO(new_csv_content), 
-                len(new_csv_content), 
-                content_type="text/csv"
-            )
-            return int(mask.sum())
+            return df, int(mask.sum())
+
+        try:
+            return self._update_metadata(bucket_name, split, mutate)
 
         except Exception as e:
             print(f"Error in batch tag update: {e}")
             raise e
 
 
-    def copy_rows(self, source_bucket: str, target_bucket: str, split: str, file_names: list[str]):
+    def copy_rows(self, source_bucket: str, target_bucket: str, split: str, file_names: list[str], progress=None, cancel_event=None):
         """
         Copies selected files and metadata from source bucket to target bucket.
         """
-        source_csv_key = f"{split}/metadata.csv"
-        target_csv_key = f"{split}/metadata.csv"
-        
         try:
             # 1. Get Source Metadata
-            response = self.client.get_object(source_bucket, source_csv_key)
-            source_content = response.read()
-            response.close()
-            response.release_conn()
-            source_df = pd.read_csv(BytesIO(source_content), dtype=str, keep_default_na=False)
+            source_df, _version = self._read_metadata(source_bucket, split)
             
             # 2. Filter rows
             rows_to_copy = source_df[source_df['file_name'].isin(file_names)].copy()
@@ -406,18 +392,19 @@ class DatasetManager:
             if rows_to_copy.empty:
                  return 0
 
-            # 3. Copy objects
-            successful_files = []
-            for _, row in rows_to_copy.iterrows():
-                file_name = row['file_name']
-                # Assume standard path: split/audio/file_name
-                object_name = f"{split}/audio/{file_name}"
-                
-                try:
-                    self.client.copy_object(source_bucket, object_name, target_bucket, object_name)
-                    successful_files.append(file_name)
-                except Exception as e:
-                    print(f"Failed to copy object {object_name}: {e}")
+            # 3. Copy objects in parallel
+            # Assume standard path: split/audio/file_name
+            audio_prefix = f"{split}/audio/"
+            report = self.client.copy_objects(
+                source_bucket,
+                target_bucket,
+                [audio_prefix + name for name in rows_to_copy['file_name']],
+                progress=progress,
+                cancel_event=cancel_event,
+            )
+            for object_name, error in report.failed.items():
+                print(f"Failed to copy object {object_name}: {error}")
+            successful_files = [name[len(audio_prefix):] for name in report.succeeded]
 
             # 4. Prepare matched rows for Target Metadata
             # Filter only successful
@@ -426,33 +413,11 @@ class DatasetManager:
             # Update audio path to target bucket
             final_rows['audio'] = final_rows['file_name'].apply(lambda x: f"s3://{target_bucket}/{split}/audio/{x}")
             
-            # 5. Update Target Metadata
-            target_df = pd.DataFrame(columns=['file_name', 'audio', 'transcription', 'tags', 'description'])
-            try:
-                response = self.client.get_object(target_bucket, target_csv_key)
-                target_content = response.read()
-                response.close()
-                response.release_conn()
-                target_df = pd.read_csv(BytesIO(target_content), dtype=str, keep_default_na=False)
-            except Exception:
-                pass # New bucket/dataset
-            
-            # Append
-            target_df = pd.concat([target_df, final_rows], ignore_index=True)
-            # Remove duplicates? relying on file_name
-            target_df.drop_duplicates(subset=['file_name'], keep='last', inplace=True)
-            
-            # Upload
-            csv_buffer = StringIO()
-            target_df.to_csv(csv_buffer, index=False)
-            csv_data = csv_buffer.getvalue().encode('utf-8')
-            
-            self.client.put_object(
+            # 5. Update Target Metadata — one delta, upserted by file_name
+            self.store.append(
                 target_bucket,
-                target_csv_key,
-                BytesIO(csv_data),
-                len(csv_data),
-                content_type="text/csv"
+                split,
+                [{"op": "upsert", "row": r} for r in final_rows.to_dict(orient="records")],
             )
             
             return len(successful_files)
@@ -463,56 +428,45 @@ class DatasetManager:
 
 
 
-    def clone_bucket(self, source_bucket: str, target_bucket: str):
+    def clone_bucket(self, source_bucket: str, target_bucket: str, progress=None, cancel_event=None):
         """
-        Clones an entire bucket to a new bucket using minio client.
+        Clones an entire bucket to a new bucket using parallel server-side copies.
         Assumes target bucket has already been created.
         """
         try:
-            # List all objects in source bucket
-            objects = self.client.list_objects(source_bucket, recursive=True)
-            
-            count = 0
-            for obj in objects:
-                # obj.object_name contains the full path including prefix if any, but since we scan root, it's the full key
-                try:
-                    self.client.copy_object(source_bucket, obj.object_name, target_bucket, obj.object_name)
-                    count += 1
-                except Exception as e:
-                    print(f"Failed to copy object {obj.object_name}: {e}")
+            # List all objects in source bucket. Split metadata (metadata.csv and
+            # its delta log) is not copied verbatim: each split's merged metadata
+            # is written once at the end with the audio paths rewritten.
+            objects = []
+            splits = set()
+            for obj in self.client.list_objects(source_bucket, recursive=True):
+                match = _SPLIT_METADATA_RE.match(obj.object_name)
+                if match:
+                    splits.add(match.group(1))
+                    continue
+                objects.append((obj.object_name, obj.size or 0))
+
+            report = self.client.copy_objects(
+                source_bucket, target_bucket, objects, progress=progress, cancel_event=cancel_event
+            )
+            for object_name, error in report.failed.items():
+                print(f"Failed to copy object {object_name}: {error}")
+            count = len(report.succeeded)
+            if report.cancelled:
+                return count
 
             # We also need to update the 'audio' path in metadata.csv files for the new bucket
             # because the s3:// paths will still point to the old bucket.
-            for split in ['train', 'test', 'val']: # common splits
-                 csv_key = f"{split}/metadata.csv"
-                 try:
-                    # check if exists (cheap way might be just try get)
-                    response = self.client.get_object(target_bucket, csv_key)
-                    content = response.read()
-                    response.close()
-                    response.release_conn()
-                    
-                    df = pd.read_csv(BytesIO(content), dtype=str, keep_default_na=False)
-                    
-                    # Update audio column
+            for split in sorted(splits):
+                try:
+                    df, _version = self._read_metadata(source_bucket, split)
                     if 'audio' in df.columns:
                         df['audio'] = df['audio'].astype(str).str.replace(f"s3://{source_bucket}/", f"s3://{target_bucket}/")
-                        
-                        # Upload back
-                        csv_buffer = StringIO()
-                        df.to_csv(csv_buffer, index=False)
-                        new_content = csv_buffer.getvalue().encode('utf-8')
-                        
-                        self.client.put_object(
-                            target_bucket,
-                            csv_key,
-                            BytesIO(new_content),
-                            len(new_content),
-                            content_type="text/csv"
-                        )
-                 except Exception:
-                     # Split might not exist or metadata might not exist
-                     pass
+                    # Replace whatever the target had with the rewritten copy.
+                    self.store.update(target_bucket, split, lambda _existing, df=df: (df, None))
+                    count += 1
+                except Exception as e:
+                    print(f"Failed to write metadata for split {split}: {e}")
             
             return count
 
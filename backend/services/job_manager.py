@@ -0,0 +1,166 @@
+"""
+In-process background jobs for long-running bucket operations.
+
+Cloning a bucket or copying / deleting thousands of rows used to run inside
+the HTTP request and time out on big datasets. `JobManager.submit()` runs
+the work on a daemon thread and returns a job ID immediately; the work
+function receives a `JobContext` for progress reporting and cancellation.
+Status (objects/s, MB/s, ETA) is served by `/api/jobs/{id}` and pushed on
+the `/api/events` SSE stream.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger("jtb.jobs")
+
+# Finished jobs kept around for status queries.
+MAX_FINISHED_JOBS = 100
+
+ACTIVE_STATES = ("pending", "running", "cancelling")
+
+
+class JobCancelled(Exception):
+    """Raised by `JobContext.check_cancelled()` once cancellation is requested."""
+
+
+class JobContext:
+    """Handle passed to a job's work function."""
+
+    def __init__(self, job: "Job"):
+        self._job = job
+        self.cancel_event = job.cancel_event
+
+    def progress(self, done: int, total: int = None, nbytes: int = None) -> None:
+        """Progress callback, compatible with `TransferEngine.run(progress=...)`."""
+        with self._job.lock:
+            self._job.done = done
+            if total is not None:
+                self._job.total = total
+            if nbytes is not None:
+                self._job.bytes = nbytes
+
+    def set_message(self, message: str) -> None:
+        with self._job.lock:
+            self._job.message = message
+
+    def check_cancelled(self) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+
+class Job:
+    def __init__(self, kind: str, description: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.description = description
+        self.status = "pending"  # pending, running, cancelling, completed, cancelled, error
+        self.message = ""
+        self.result = None
+        self.error = None
+        self.done = 0
+        self.total = None
+        self.bytes = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            end = self.finished_at or time.time()
+            elapsed = end - self.started_at if self.started_at else 0.0
+            objects_per_sec = self.done / elapsed if elapsed > 0 else 0.0
+            eta_sec = None
+            if self.status in ACTIVE_STATES and self.total and objects_per_sec > 0:
+                eta_sec = round(max(self.total - self.done, 0) / objects_per_sec, 1)
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "description": self.description,
+                "status": self.status,
+                "message": self.message,
+                "done": self.done,
+                "total": self.total,
+                "bytes": self.bytes,
+                "elapsed_sec": round(elapsed, 2),
+                "objects_per_sec": round(objects_per_sec, 2),
+                "mb_per_sec": round(self.bytes / elapsed / (1024 * 1024), 3) if elapsed > 0 else 0.0,
+                "eta_sec": eta_sec,
+                "result": self.result,
+                "error": self.error,
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+            }
+
+
+class JobManager:
+    def __init__(self, max_finished: int = MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._jobs = OrderedDict()  # id -> Job, oldest first
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, fn, description: str = "") -> Job:
+        """Run `fn(ctx)` on a background thread. Its return value becomes the
+        job's `result`; raising `JobCancelled` (or returning after the cancel
+        event is set) marks the job cancelled."""
+        job = Job(kind, description)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        thread = threading.Thread(target=self._run, args=(job, fn), name=f"job-{job.id}", daemon=True)
+        thread.start()
+        return job
+
+    def _run(self, job: Job, fn) -> None:
+        with job.lock:
+            job.status = "running"
+            job.started_at = time.time()
+        try:
+            result = fn(JobContext(job))
+            with job.lock:
+                job.result = result
+                job.status = "cancelled" if job.cancel_event.is_set() else "completed"
+        except JobCancelled:
+            with job.lock:
+                job.status = "cancelled"
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job.id, job.kind)
+            with job.lock:
+                job.status = "error"
+                job.error = str(e)
+        finally:
+            with job.lock:
+                job.finished_at = time.time()
+
+    def _prune(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status not in ACTIVE_STATES]
+        for job in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Request cancellation. Returns False if the job is unknown or already finished."""
+        job = self.get(job_id)
+        if job is None:
+            return False
+        with job.lock:
+            if job.status not in ACTIVE_STATES:
+                return False
+            job.status = "cancelling"
+        job.cancel_event.set()
+        return True
+
+    def list_jobs(self, active_only: bool = False) -> list[dict]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [j.to_dict() for j in jobs if not active_only or j.status in ACTIVE_STATES]
+
+
+job_manager = JobManager()
@@ -0,0 +1,103 @@
+"""
+In-process LRU cache of parsed metadata DataFrames.
+
+Every DatasetManager method used to `get_object` + `pd.read_csv` the same
+metadata.csv. Entries are keyed by (bucket, key) and revalidated with a
+`stat_object` ETag check, so re-reading an unchanged split costs one HEAD
+request instead of a full download and parse.
+
+With `METADATA_FORMAT=both`, a miss reads the typed `metadata.parquet`
+sidecar (see `backend.mlops.metadata_format`) instead of the CSV whenever it
+was built from the current CSV ETag.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from backend.mlops.metadata_format import (
+    fresh_parquet,
+    parquet_enabled,
+    parquet_key,
+    read_csv_bytes,
+    read_parquet_bytes,
+)
+
+METADATA_CACHE_SIZE = int(os.getenv("METADATA_CACHE_SIZE", "16"))
+
+
+class MetadataCache:
+    def __init__(self, client, max_entries: int = METADATA_CACHE_SIZE):
+        self.client = client
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (bucket, key) -> (etag, DataFrame)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, bucket_name: str, key: str, etag: str = None):
+        """Return `(df, etag)` for the object. The DataFrame is a copy, so
+        callers may mutate it freely. Pass `etag` when the caller already
+        knows it (e.g. from its own stat) to skip the HEAD request."""
+        if etag is None:
+            etag = self.client.stat_object(bucket_name, key).etag
+
+        with self._lock:
+            entry = self._entries.get((bucket_name, key))
+            if entry is not None and entry[0] == etag:
+                self._entries.move_to_end((bucket_name, key))
+                self.hits += 1
+                return entry[1].copy(), etag
+            self.misses += 1
+
+        df = self._read(bucket_name, key, etag)
+        # The object may have changed between the HEAD and the GET; storing it
+        # under the stale ETag only costs one extra miss on the next read.
+        self.put(bucket_name, key, etag, df)
+        return df.copy(), etag
+
+    def _read(self, bucket_name: str, key: str, etag: str) -> pd.DataFrame:
+        if parquet_enabled() and key.endswith(".csv") and fresh_parquet(self.client, bucket_name, key, etag):
+            try:
+                return read_parquet_bytes(self._download(bucket_name, parquet_key(key)))
+            except Exception as e:
+                print(f"Falling back to CSV for {bucket_name}/{key}: {e}")
+        return read_csv_bytes(self._download(bucket_name, key))
+
+    def _download(self, bucket_name: str, key: str) -> bytes:
+        response = self.client.get_object(bucket_name, key)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def put(self, bucket_name: str, key: str, etag: str, df: pd.DataFrame) -> None:
+        """Record a DataFrame we just wrote (or read) under its ETag."""
+        if not etag:
+            return
+        with self._lock:
+            self._entries[(bucket_name, key)] = (etag, df.copy())
+            self._entries.move_to_end((bucket_name, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, bucket_name: str, key: str = None) -> None:
+        with self._lock:
+            if key is not None:
+                self._entries.pop((bucket_name, key), None)
+                return
+            for cached in [k for k in self._entries if k[0] == bucket_name]:
+                del self._entries[cached]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
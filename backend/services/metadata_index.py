@@ -0,0 +1,439 @@
+"""
+Local SQLite index over `{split}/metadata.csv` objects.
+
+The dataset browser used to download and parse the whole CSV for every page
+click. The index keeps one SQLite file per (bucket, split) on local disk,
+stamped with the version (ETag) of the object it was built from. As long as
+the object is unchanged, pagination, tag aggregation and search are served
+straight from the index; a changed ETag triggers a resync.
+
+Search goes through a character-bigram inverted index (`grams`), so it works
+for Chinese text without a tokenizer. Each field is indexed as
+"\x02" + text + "\x03", which makes single characters and field/word starts
+searchable too. A query term is answered by intersecting the posting lists of
+its bigrams and then verifying the few candidates, instead of scanning every
+row. Supported syntax (terms are ANDed):
+
+    hello            substring of file name, transcription or tags
+    "good morning"   phrase, spaces included
+    hel*             prefix of a word (start of a field or after a separator)
+    tag:noisy        rows carrying exactly this tag
+
+Tag facets are maintained alongside: `row_tags` (tag -> rows) and
+`tag_counts` (tag -> number of rows), so the UI gets per-tag counts and can
+filter on several tags (AND / OR) without touching the rows.
+
+When the metadata changes, the index is diffed against the new rows and only
+changed rows have their grams rewritten; a full rebuild is the fallback.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+
+METADATA_INDEX_DIR = os.getenv("METADATA_INDEX_DIR", os.path.join(".cache", "metadata_index"))
+
+# Bump when the table layout changes so old index files get rebuilt.
+INDEX_SCHEMA = "3"
+
+_FIELD_START = "\x02"
+_FIELD_END = "\x03"
+_MAX_CHAR = "\U0010ffff"
+_WORD_SEPARATORS = " \t\r\n,，。、_-./:;()[]"
+_WORD_START_RE = re.compile(f"(?<=[{re.escape(_WORD_SEPARATORS)}])[^{re.escape(_WORD_SEPARATORS)}]")
+_QUERY_TERM_RE = re.compile(r'(tag:)?(?:"([^"]*)"|(\S+))')
+_SEARCH_COLUMNS = ("file_name_lc", "transcription_lc", "tags_lc")
+
+
+def split_tags(tags_str) -> list[str]:
+    """Split a comma separated tags cell into clean tag names."""
+    if not tags_str:
+        return []
+    return [t.strip() for t in str(tags_str).split(",") if t.strip()]
+
+
+def _field_grams(text: str) -> set[str]:
+    padded = f"{_FIELD_START}{text}{_FIELD_END}"
+    grams = {padded[i:i + 2] for i in range(len(padded) - 1)}
+    # Word starts inside the field are indexed like field starts, for prefix queries.
+    grams.update(_FIELD_START + ch for ch in _WORD_START_RE.findall(text))
+    return grams
+
+
+def _term_grams(term: str) -> list[str]:
+    return sorted({term[i:i + 2] for i in range(len(term) - 1)})
+
+
+def _starts_word(text, term) -> int:
+    """SQL function: does `term` start `text` or any word inside it?"""
+    if text is None:
+        return 0
+    start = text.find(term)
+    while start != -1:
+        if start == 0 or text[start - 1] in _WORD_SEPARATORS:
+            return 1
+        start = text.find(term, start + 1)
+    return 0
+
+
+def parse_query(search: str) -> list[tuple[str, str]]:
+    """Split a search string into `(kind, value)` terms, kind being one of
+    "tag", "phrase", "prefix" or "substring"."""
+    terms = []
+    for tag, quoted, bare in _QUERY_TERM_RE.findall(search or ""):
+        value = quoted if quoted else bare
+        if not value:
+            continue
+        if tag:
+            terms.append(("tag", value.strip()))
+        elif quoted:
+            terms.append(("phrase", value.lower()))
+        elif len(value) > 1 and value.endswith("*"):
+            terms.append(("prefix", value[:-1].lower()))
+        else:
+            terms.append(("substring", value.lower()))
+    return terms
+
+
+def _row_values(pos: int, rec: dict, data: str) -> tuple:
+    return (
+        pos,
+        rec["file_name"],
+        str(rec["file_name"]).lower(),
+        str(rec["transcription"]).lower(),
+        str(rec["tags"]).lower(),
+        data,
+    )
+
+
+def _row_tags(values: tuple) -> list[str]:
+    """Distinct tags of a row tuple, in order."""
+    return list(dict.fromkeys(split_tags(json.loads(values[5])["tags"])))
+
+
+def _row_grams(values: tuple) -> set[str]:
+    grams = set()
+    for text in values[2:5]:
+        grams |= _field_grams(text)
+    return grams
+
+
+class MetadataIndex:
+    def __init__(self, root_dir: str = METADATA_INDEX_DIR):
+        self.root_dir = root_dir
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, bucket_name: str, split: str) -> str:
+        # Bucket/split come from the URL path — never use them verbatim as
+        # file names.
+        safe = re.sub(r"[^A-Za-z0-9._-]", "_", f"{bucket_name}__{split}")[:80]
+        digest = hashlib.sha1(f"{bucket_name}/{split}".encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.root_dir, f"{safe}-{digest}.sqlite3")
+
+    def _lock_for(self, bucket_name: str, split: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((bucket_name, split), threading.Lock())
+
+    def _connect(self, path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.create_function("starts_word", 2, _starts_word, deterministic=True)
+        return conn
+
+    def version(self, bucket_name: str, split: str):
+        """Version string the index was built from, or None if there is no
+        (current-schema) index."""
+        path = self._path(bucket_name, split)
+        if not os.path.exists(path):
+            return None
+        try:
+            conn = self._connect(path)
+            try:
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+                return meta.get("version") if meta.get("schema") == INDEX_SCHEMA else None
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+
+    def ensure(self, bucket_name: str, split: str, version: str, loader) -> None:
+        """Make sure the index matches `version`, calling `loader()` for the
+        DataFrame only when it is stale. Changed rows are patched in place;
+        the file is rebuilt from scratch only if that is not possible."""
+        current = self.version(bucket_name, split)
+        if current == version:
+            return
+        with self._lock_for(bucket_name, split):
+            # Another request may have rebuilt it while we waited.
+            current = self.version(bucket_name, split)
+            if current == version:
+                return
+            df = loader()
+            if current is None or not self._sync(bucket_name, split, version, df):
+                self.rebuild(bucket_name, split, version, df)
+
+    @staticmethod
+    def _records(df) -> list[dict]:
+        for col in ("file_name", "transcription", "tags", "description"):
+            if col not in df.columns:
+                df[col] = ""
+        return df.to_dict(orient="records")
+
+    def _sync(self, bucket_name: str, split: str, version: str, df) -> bool:
+        """Bring an existing index up to date by diffing rows on file_name.
+        Returns False when the change cannot be expressed as in-place
+        updates, deletions and appends (duplicates, reordering)."""
+        records = self._records(df)
+        names = [rec["file_name"] for rec in records]
+        if len(set(names)) != len(names):
+            return False
+
+        conn = self._connect(self._path(bucket_name, split))
+        try:
+            old = {}  # file_name -> stored row tuple (same layout as _row_values)
+            for row in conn.execute(
+                "SELECT pos, file_name, file_name_lc, transcription_lc, tags_lc, data FROM rows"
+            ):
+                if row["file_name"] in old:
+                    return False
+                old[row["file_name"]] = tuple(row)
+
+            next_pos = max((values[0] for values in old.values()), default=-1) + 1
+            last_pos = -1
+            changed, added, stale = [], [], []
+            for rec in records:
+                data = json.dumps(rec, ensure_ascii=False)
+                prev = old.pop(rec["file_name"], None)
+                if prev is None:
+                    added.append(_row_values(next_pos, rec, data))
+                    last_pos = next_pos
+                    next_pos += 1
+                    continue
+                if prev[0] < last_pos:
+                    return False  # rows were reordered
+                last_pos = prev[0]
+                if prev[5] != data:
+                    stale.append(prev)
+                    changed.append(_row_values(prev[0], rec, data))
+            removed = list(old.values())
+            stale.extend(removed)
+
+            with conn:
+                self._remove_derived(conn, stale)
+                conn.executemany("DELETE FROM rows WHERE pos = ?", ((values[0],) for values in removed))
+                fresh = changed + added
+                conn.executemany("INSERT OR REPLACE INTO rows VALUES (?, ?, ?, ?, ?, ?)", fresh)
+                self._insert_derived(conn, fresh)
+                conn.execute("UPDATE meta SET value = ? WHERE key = 'version'", (version,))
+                conn.execute("UPDATE meta SET value = ? WHERE key = 'row_count'", (str(len(records)),))
+            return True
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _remove_derived(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+        """Undo `_insert_derived` for the stored row tuples `rows`. Postings
+        are recomputed from the row text and deleted by key."""
+        postings = [(gram, values[0]) for values in rows for gram in _row_grams(values)]
+        conn.executemany("DELETE FROM grams WHERE gram = ? AND pos = ?", postings)
+        conn.executemany(
+            "UPDATE gram_counts SET n = n - ? WHERE gram = ?",
+            ((n, gram) for gram, n in Counter(gram for gram, _pos in postings).items()),
+        )
+        tags = [(tag, values[0]) for values in rows for tag in _row_tags(values)]
+        conn.executemany("DELETE FROM row_tags WHERE tag = ? AND pos = ?", tags)
+        conn.executemany(
+            "UPDATE tag_counts SET n = n - ? WHERE tag = ?",
+            ((n, tag) for tag, n in Counter(tag for tag, _pos in tags).items()),
+        )
+        conn.execute("DELETE FROM tag_counts WHERE n <= 0")
+
+    @staticmethod
+    def _insert_derived(conn: sqlite3.Connection, rows: list[tuple]) -> None:
+        """Insert the bigram postings (and their counts) and tag rows for
+        `rows` (row tuples) into an existing index."""
+        postings = [(gram, values[0]) for values in rows for gram in _row_grams(values)]
+        conn.executemany("INSERT INTO grams VALUES (?, ?)", postings)
+        conn.executemany(
+            "INSERT INTO gram_counts VALUES (?, ?) ON CONFLICT (gram) DO UPDATE SET n = n + excluded.n",
+            Counter(gram for gram, _pos in postings).items(),
+        )
+        tags = [(tag, values[0]) for values in rows for tag in _row_tags(values)]
+        conn.executemany("INSERT INTO row_tags VALUES (?, ?)", tags)
+        conn.executemany(
+            "INSERT INTO tag_counts VALUES (?, ?) ON CONFLICT (tag) DO UPDATE SET n = n + excluded.n",
+            Counter(tag for tag, _pos in tags).items(),
+        )
+
+    def rebuild(self, bucket_name: str, split: str, version: str, df) -> None:
+        """Build a fresh index file from `df` and atomically swap it in."""
+        os.makedirs(self.root_dir, exist_ok=True)
+        path = self._path(bucket_name, split)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        records = self._records(df)
+
+        conn = self._connect(tmp_path)
+        try:
+            conn.executescript(
+                """
+                PRAGMA journal_mode = OFF;
+                PRAGMA synchronous = OFF;
+                PRAGMA cache_size = -262144;
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE rows (
+                    pos INTEGER PRIMARY KEY,
+                    file_name TEXT,
+                    file_name_lc TEXT,
+                    transcription_lc TEXT,
+                    tags_lc TEXT,
+                    data TEXT
+                );
+                CREATE TABLE row_tags (tag TEXT, pos INTEGER);
+                CREATE TABLE tag_counts (tag TEXT PRIMARY KEY, n INTEGER) WITHOUT ROWID;
+                CREATE TABLE grams (gram TEXT, pos INTEGER, PRIMARY KEY (gram, pos)) WITHOUT ROWID;
+                CREATE TABLE gram_counts (gram TEXT PRIMARY KEY, n INTEGER) WITHOUT ROWID;
+                CREATE TEMP TABLE staged_grams (gram TEXT, pos INTEGER);
+                """
+            )
+            rows = [
+                _row_values(pos, rec, json.dumps(rec, ensure_ascii=False))
+                for pos, rec in enumerate(records)
+            ]
+            conn.executemany("INSERT INTO rows VALUES (?, ?, ?, ?, ?, ?)", rows)
+            tags = [(tag, values[0]) for values in rows for tag in _row_tags(values)]
+            conn.executemany("INSERT INTO row_tags VALUES (?, ?)", tags)
+            conn.executemany("INSERT INTO tag_counts VALUES (?, ?)", Counter(tag for tag, _pos in tags).items())
+            # Appending postings in key order is far cheaper than random
+            # inserts into the WITHOUT ROWID b-tree, so stage and sort first.
+            counts = Counter()
+
+            def postings():
+                for values in rows:
+                    for gram in _row_grams(values):
+                        counts[gram] += 1
+                        yield gram, values[0]
+
+            conn.executemany("INSERT INTO staged_grams VALUES (?, ?)", postings())
+            conn.execute("INSERT INTO grams SELECT gram, pos FROM staged_grams ORDER BY gram, pos")
+            conn.execute("DROP TABLE staged_grams")
+            conn.executemany("INSERT INTO gram_counts VALUES (?, ?)", counts.items())
+            conn.execute("CREATE INDEX idx_row_tags_tag ON row_tags (tag, pos)")
+            conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+            conn.execute("INSERT INTO meta VALUES ('schema', ?)", (INDEX_SCHEMA,))
+            conn.execute("INSERT INTO meta VALUES ('row_count', ?)", (str(len(rows)),))
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+
+    def query(self, bucket_name: str, split: str, page: int = 1, limit: int = 50, search: str = None,
+              tags: list[str] = None, tag_mode: str = "and") -> dict:
+        """Return one page of rows plus the split-wide tag facets. `tags`
+        keeps rows carrying all (tag_mode="and") or any ("or") of them."""
+        conn = self._connect(self._path(bucket_name, split))
+        try:
+            offset = max(page - 1, 0) * limit
+            where, params = self._search_clause(conn, search, tags, tag_mode)
+            if where is None:
+                total, page_rows = 0, []
+            elif not where:
+                # COUNT(*) would walk every page of the wide rows table.
+                total = int(conn.execute("SELECT value FROM meta WHERE key = 'row_count'").fetchone()[0])
+                page_rows = conn.execute(
+                    "SELECT data FROM rows ORDER BY pos LIMIT ? OFFSET ?", (limit, offset)
+                ).fetchall()
+            else:
+                # Evaluate the search once; count and page from the match list.
+                matches = [r[0] for r in conn.execute(f"SELECT pos FROM rows WHERE {where} ORDER BY pos", params)]
+                total = len(matches)
+                wanted = matches[offset:offset + limit]
+                page_rows = conn.execute(
+                    f"SELECT data FROM rows WHERE pos IN ({','.join('?' * len(wanted))}) ORDER BY pos", wanted
+                ).fetchall() if wanted else []
+            tag_counts = [
+                {"tag": r["tag"], "count": r["n"]}
+                for r in conn.execute("SELECT tag, n FROM tag_counts WHERE n > 0 ORDER BY tag")
+            ]
+        finally:
+            conn.close()
+
+        return {
+            "total": total,
+            "unique_tags": [t["tag"] for t in tag_counts],
+            "tag_counts": tag_counts,
+            "data": [json.loads(r["data"]) for r in page_rows],
+        }
+
+    @staticmethod
+    def _search_clause(conn: sqlite3.Connection, search: str, tags: list[str] = None, tag_mode: str = "and"):
+        """`(where, params)` for `search`: the WHERE clause without the
+        keyword, "" for no search or None if some term cannot match at all.
+
+        Each text term is driven by the posting list of its rarest bigram;
+        the other bigrams are point lookups on the (gram, pos) key, and the
+        surviving candidates are verified against the row text."""
+        terms = parse_query(search)
+        tags = list(dict.fromkeys(t.strip() for t in tags or [] if t.strip()))
+        if tag_mode == "or" and len(tags) > 1:
+            any_tags, tags = tags, []
+        else:
+            any_tags = []
+        terms += [("tag", tag) for tag in tags]
+        has_text = any(kind != "tag" for kind, _value in terms)
+        clauses, params = [], []
+        if any_tags:
+            placeholders = ",".join("?" * len(any_tags))
+            clauses.append(
+                f"EXISTS (SELECT 1 FROM row_tags WHERE tag IN ({placeholders}) AND row_tags.pos = rows.pos)"
+                if has_text else f"pos IN (SELECT pos FROM row_tags WHERE tag IN ({placeholders}))"
+            )
+            params.extend(any_tags)
+        for kind, value in terms:
+            if kind == "tag":
+                # Alongside a text term, check the tag per candidate (a
+                # (tag, pos) key lookup) so the rarer bigram drives the query.
+                clauses.append(
+                    "EXISTS (SELECT 1 FROM row_tags WHERE tag = ? AND row_tags.pos = rows.pos)" if has_text
+                    else "pos IN (SELECT pos FROM row_tags WHERE tag = ?)"
+                )
+                params.append(value)
+                continue
+
+            grams = _term_grams(_FIELD_START + value) if kind == "prefix" else _term_grams(value)
+            if grams:
+                placeholders = ",".join("?" * len(grams))
+                counts = dict(conn.execute(
+                    f"SELECT gram, n FROM gram_counts WHERE gram IN ({placeholders}) AND n > 0", grams
+                ).fetchall())
+                if len(counts) < len(grams):
+                    return None, []
+                grams.sort(key=counts.get)
+                candidates = "SELECT g0.pos FROM grams g0 WHERE g0.gram = ?" + "".join(
+                    f" AND EXISTS (SELECT 1 FROM grams g{i} WHERE g{i}.gram = ? AND g{i}.pos = g0.pos)"
+                    for i in range(1, len(grams))
+                )
+                params.extend(grams)
+            else:
+                # Single character: every bigram that starts with it.
+                candidates = "SELECT pos FROM grams WHERE gram >= ? AND gram < ?"
+                params.extend([value, value + _MAX_CHAR])
+
+            verify = "starts_word({col}, ?)" if kind == "prefix" else "instr({col}, ?) > 0"
+            clauses.append(
+                f"pos IN ({candidates}) AND ("
+                + " OR ".join(verify.format(col=col) for col in _SEARCH_COLUMNS)
+                + ")"
+            )
+            params.extend([value] * len(_SEARCH_COLUMNS))
+
+        return " AND ".join(f"({c})" for c in clauses), params
+
+
+metadata_index = MetadataIndex()
@@ -0,0 +1,429 @@
+"""
+Read/write layer for `{split}/metadata.csv` with an append-only delta log.
+
+Appending one row used to download, re-serialize and re-upload the whole
+CSV (O(N) bytes per write, and concurrent writers lost rows). Small writes
+now go to immutable delta objects:
+
+    {split}/_deltas/<time_ns>-<rand>.jsonl    one JSON op per line
+
+    {"op": "upsert", "row": {...}}            insert or replace by file_name
+    {"op": "delete", "file_name": "..."}
+
+Every rewrite of metadata.csv first stores the exact list of delta names it
+folds in as an immutable manifest, and points at it from the CSV:
+
+    {split}/_folded/<time_ns>-<rand>.json     {"deltas": [...]}
+    x-amz-meta-folded-manifest: <time_ns>-<rand>.json
+
+Reads merge the base CSV with every listed delta that its manifest does not
+name. Delta names are never compared against a cutoff: a delta whose PUT
+lands after a compactor listed the prefix, or whose clock runs behind, stays
+pending until a rewrite that actually read it names it. A background
+compactor folds pending deltas into metadata.csv and removes exactly the
+named delta objects (a name whose delete failed is carried into the next
+manifest). Ops are idempotent, so a reader that races with compaction can
+never see a different result.
+
+Full rewrites (edits, tag/delete batches, compaction) go through `update()`:
+read -> mutate -> conditional PUT keyed on the ETag that was read, retried on
+conflict. Edits queued for the same split while a rewrite is in flight are
+batched into the next rewrite (group commit), so parallel annotators neither
+lose updates nor pay one full rewrite each.
+
+With `METADATA_FORMAT=both` every rewrite also refreshes the typed
+`{split}/metadata.parquet` sidecar, which the cache prefers on a miss.
+"""
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from io import BytesIO, StringIO
+from typing import Callable, Optional
+
+import pandas as pd
+from minio.deleteobjects import DeleteObject
+from minio.error import S3Error
+
+from backend.mlops.metadata_format import put_parquet, parquet_enabled
+
+from .metadata_cache import MetadataCache
+from .minio_client import ConditionalWriteConflict
+
+METADATA_COLUMNS = ['file_name', 'audio', 'transcription', 'tags', 'description']
+FOLDED_META_KEY = "folded-manifest"
+METADATA_COMPACT_INTERVAL_SEC = float(os.getenv("METADATA_COMPACT_INTERVAL_SEC", "30"))
+METADATA_WRITE_RETRIES = int(os.getenv("METADATA_WRITE_RETRIES", "8"))
+
+_MISSING_CODES = ("NoSuchKey", "NoSuchObject", "ResourceNotFound")
+
+
+def metadata_key(split: str) -> str:
+    return f"{split}/metadata.csv"
+
+
+def delta_prefix(split: str) -> str:
+    return f"{split}/_deltas/"
+
+
+def folded_prefix(split: str) -> str:
+    return f"{split}/_folded/"
+
+
+def is_missing_object(exc: Exception) -> bool:
+    return isinstance(exc, S3Error) and exc.code in _MISSING_CODES
+
+
+def _header(headers, name: str) -> str:
+    """Case-insensitive lookup of an `x-amz-meta-*` header."""
+    wanted = f"x-amz-meta-{name}".lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == wanted:
+            return value
+    return ""
+
+
+def _unique_name() -> str:
+    return f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}"
+
+
+def apply_delta_ops(df: pd.DataFrame, ops: list[dict]) -> pd.DataFrame:
+    """Apply delta ops to `df`. Upserts replace matching rows in place (so
+    row order stays stable) and append unknown file names at the end."""
+    changes = {}  # file_name -> row dict, or None for a delete
+    for op in ops:
+        if op.get("op") == "upsert":
+            changes[op["row"]["file_name"]] = op["row"]
+        elif op.get("op") == "delete":
+            changes[op["file_name"]] = None
+    if not changes:
+        return df
+
+    df = df.copy()
+    for row in changes.values():
+        for col in row or {}:
+            if col not in df.columns:
+                df[col] = ""
+
+    hit = df['file_name'].isin(changes.keys())
+    existing = set(df.loc[hit, 'file_name'])
+    for idx in df.index[hit]:
+        row = changes[df.at[idx, 'file_name']]
+        if row is not None:
+            for col, value in row.items():
+                df.at[idx, col] = value
+    deleted = [name for name, row in changes.items() if row is None]
+    if deleted:
+        df = df[~df['file_name'].isin(deleted)]
+
+    new_rows = [row for name, row in changes.items() if row is not None and name not in existing]
+    if new_rows:
+        df = pd.concat([df, pd.DataFrame(new_rows)], ignore_index=True)
+    return df.fillna("").reset_index(drop=True)
+
+
+@dataclass
+class MetadataVersion:
+    """What a split's metadata currently consists of."""
+    etag: Optional[str]  # None while metadata.csv does not exist yet
+    manifest: str = ""  # folded manifest named by metadata.csv, "" if none
+    deltas: list = field(default_factory=list)  # pending delta names, oldest first
+    folded: list = field(default_factory=list)  # named in the manifest but not deleted yet
+
+    @property
+    def token(self) -> str:
+        """Opaque string that changes whenever the merged metadata changes."""
+        last = self.deltas[-1] if self.deltas else ""
+        return f"{self.etag}|{last}|{len(self.deltas)}"
+
+
+class MetadataStore:
+    def __init__(self, client, cache: MetadataCache = None):
+        self.client = client
+        self.cache = cache or MetadataCache(client)
+        self._delta_ops = {}  # delta name -> parsed ops (deltas are immutable)
+        self._manifests = {}  # manifest key -> folded delta names (also immutable)
+        self._dirty = set()  # (bucket, split) with pending deltas
+        self._dirty_lock = threading.Lock()
+        self._compactor = None
+        self._stop = threading.Event()
+        self._edit_queues = {}  # (bucket, split) -> list of (mutate, Future)
+        self._leaders = set()  # (bucket, split) with a thread currently committing
+        self._queue_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def version(self, bucket_name: str, split: str) -> MetadataVersion:
+        """One HEAD on metadata.csv plus one LIST of the delta prefix (and one
+        GET of its folded manifest the first time this process sees it)."""
+        for _attempt in range(METADATA_WRITE_RETRIES):
+            try:
+                stat = self.client.stat_object(bucket_name, metadata_key(split))
+                version = MetadataVersion(etag=stat.etag, manifest=_header(stat.metadata, FOLDED_META_KEY))
+            except Exception as e:
+                if not is_missing_object(e):
+                    raise
+                version = MetadataVersion(etag=None)
+
+            names = sorted(
+                obj.object_name
+                for obj in self.client.list_objects(bucket_name, prefix=delta_prefix(split), recursive=True)
+            )
+            try:
+                folded = self._read_manifest(bucket_name, split, version.manifest)
+            except Exception as e:
+                if not is_missing_object(e):
+                    raise
+                # metadata.csv was rewritten (and its old manifest removed)
+                # between our HEAD and GET; start over on the new version.
+                continue
+            version.deltas = [n for n in names if n not in folded]
+            version.folded = [n for n in names if n in folded]
+            if version.deltas:
+                self._mark_dirty(bucket_name, split)
+            return version
+        raise ConditionalWriteConflict(
+            f"{bucket_name}/{metadata_key(split)}: rewritten during every one of {METADATA_WRITE_RETRIES} reads"
+        )
+
+    def load(self, bucket_name: str, split: str, version: MetadataVersion = None) -> tuple[pd.DataFrame, MetadataVersion]:
+        """Merged view of metadata.csv + pending deltas."""
+        if version is None:
+            version = self.version(bucket_name, split)
+        if version.etag is None:
+            df = pd.DataFrame(columns=METADATA_COLUMNS)
+        else:
+            df, _etag = self.cache.get(bucket_name, metadata_key(split), etag=version.etag)
+        ops = []
+        for name in version.deltas:
+            ops.extend(self._read_delta(bucket_name, name))
+        return apply_delta_ops(df, ops), version
+
+    def exists(self, version: MetadataVersion) -> bool:
+        return version.etag is not None or bool(version.deltas)
+
+    def _read_delta(self, bucket_name: str, name: str) -> list[dict]:
+        ops = self._delta_ops.get(name)
+        if ops is None:
+            response = self.client.get_object(bucket_name, name)
+            try:
+                content = response.read().decode("utf-8")
+            finally:
+                response.close()
+                response.release_conn()
+            ops = [json.loads(line) for line in content.splitlines() if line.strip()]
+            if len(self._delta_ops) > 4096:
+                self._delta_ops.clear()
+            self._delta_ops[name] = ops
+        return ops
+
+    def _read_manifest(self, bucket_name: str, split: str, manifest: str) -> frozenset:
+        if not manifest:
+            return frozenset()
+        key = folded_prefix(split) + manifest
+        folded = self._manifests.get(key)
+        if folded is None:
+            response = self.client.get_object(bucket_name, key)
+            try:
+                content = response.read().decode("utf-8")
+            finally:
+                response.close()
+                response.release_conn()
+            folded = frozenset(json.loads(content)["deltas"])
+            if len(self._manifests) > 256:
+                self._manifests.clear()
+            self._manifests[key] = folded
+        return folded
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def append(self, bucket_name: str, split: str, ops: list[dict]) -> str:
+        """Append ops as a new delta object. Costs O(len(ops)) bytes."""
+        if not ops:
+            return ""
+        payload = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops).encode("utf-8")
+        name = f"{delta_prefix(split)}{_unique_name()}.jsonl"
+        self.client.put_object(
+            bucket_name, name, BytesIO(payload), len(payload), content_type="application/x-ndjson"
+        )
+        self._delta_ops[name] = ops
+        self._mark_dirty(bucket_name, split)
+        return name
+
+    def write(self, bucket_name: str, split: str, df: pd.DataFrame, version: MetadataVersion) -> None:
+        """Rewrite metadata.csv with `df`, which must already include every
+        delta in `version`; those deltas are folded in and removed.
+
+        The PUT is conditional on metadata.csv still having `version.etag`
+        and raises ConditionalWriteConflict otherwise. Prefer `update()`,
+        which retries for you."""
+        # Exactly the deltas this write read, plus earlier ones whose delete
+        # failed: a delta missing here stays pending, whatever its name.
+        folded = version.folded + version.deltas
+        manifest = ""
+        if folded:
+            manifest = f"{_unique_name()}.json"
+            payload = json.dumps({"deltas": folded}).encode("utf-8")
+            self.client.put_object(
+                bucket_name, folded_prefix(split) + manifest, BytesIO(payload), len(payload),
+                content_type="application/json",
+            )
+            self._manifests[folded_prefix(split) + manifest] = frozenset(folded)
+        csv_buffer = StringIO()
+        df.to_csv(csv_buffer, index=False)
+        content = csv_buffer.getvalue().encode('utf-8')
+
+        try:
+            result = self.client.put_object_if_match(
+                bucket_name,
+                metadata_key(split),
+                content,
+                etag=version.etag,
+                content_type="text/csv",
+                metadata={FOLDED_META_KEY: manifest} if manifest else None,
+            )
+        except ConditionalWriteConflict:
+            self.cache.invalidate(bucket_name, metadata_key(split))
+            if manifest:
+                self._remove_objects(bucket_name, [folded_prefix(split) + manifest])
+            raise
+        etag = getattr(result, "etag", None)
+        self.cache.put(bucket_name, metadata_key(split), etag, df)
+        if parquet_enabled():
+            # Best effort: a stale or missing sidecar only means readers use the CSV.
+            try:
+                put_parquet(self.client, bucket_name, metadata_key(split), df, etag)
+            except Exception as e:
+                print(f"Error writing Parquet metadata for {bucket_name}/{split}: {e}")
+        self._remove_deltas(bucket_name, folded)
+        if version.manifest:
+            self._remove_objects(bucket_name, [folded_prefix(split) + version.manifest])
+
+    def update(self, bucket_name: str, split: str, mutate: Callable) -> object:
+        """Transactionally apply `mutate(df) -> (new_df, result)` to the merged
+        metadata and return `result`.
+
+        `mutate` may run more than once (on conflict the batch is re-applied
+        to a fresh read) and must not modify `df` before raising. If it
+        raises, only that edit fails; the rest of the batch still commits."""
+        future = Future()
+        key = (bucket_name, split)
+        with self._queue_lock:
+            self._edit_queues.setdefault(key, []).append((mutate, future))
+            is_leader = key not in self._leaders
+            if is_leader:
+                self._leaders.add(key)
+        if is_leader:
+            self._drain_edits(bucket_name, split)
+        return future.result()
+
+    def _drain_edits(self, bucket_name: str, split: str) -> None:
+        key = (bucket_name, split)
+        while True:
+            with self._queue_lock:
+                batch = self._edit_queues.pop(key, [])
+                if not batch:
+                    self._leaders.discard(key)
+                    return
+            try:
+                self._commit_batch(bucket_name, split, batch)
+            except Exception as e:
+                for _mutate, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit_batch(self, bucket_name: str, split: str, batch: list) -> None:
+        for attempt in range(METADATA_WRITE_RETRIES):
+            df, version = self.load(bucket_name, split)
+            outcomes = []
+            for mutate, _future in batch:
+                try:
+                    df, result = mutate(df)
+                    outcomes.append((True, result))
+                except Exception as e:
+                    outcomes.append((False, e))
+
+            if any(ok for ok, _ in outcomes):
+                try:
+                    self.write(bucket_name, split, df, version)
+                except ConditionalWriteConflict:
+                    # Someone else rewrote metadata.csv since we read it.
+                    # Back off with jitter and replay the batch on a fresh read.
+                    time.sleep(random.uniform(0, 0.05 * (2 ** attempt)))
+                    continue
+
+            for (_mutate, future), (ok, value) in zip(batch, outcomes):
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+            return
+        raise ConditionalWriteConflict(
+            f"{bucket_name}/{metadata_key(split)}: gave up after {METADATA_WRITE_RETRIES} conflicting writes"
+        )
+
+    def _remove_deltas(self, bucket_name: str, names: list[str]) -> None:
+        self._remove_objects(bucket_name, names)
+        for name in names:
+            self._delta_ops.pop(name, None)
+
+    def _remove_objects(self, bucket_name: str, names: list[str]) -> None:
+        if not names:
+            return
+        errors = self.client.remove_objects(bucket_name, [DeleteObject(n) for n in names])
+        for error in errors:
+            print(f"Error deleting {error}")
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def compact(self, bucket_name: str, split: str) -> int:
+        """Fold pending deltas into metadata.csv. Returns the number folded."""
+        version = self.version(bucket_name, split)
+        self._remove_deltas(bucket_name, version.folded)
+        if not version.deltas:
+            self._clear_dirty(bucket_name, split)
+            return 0
+        # An identity edit: update() folds every pending delta on write.
+        self.update(bucket_name, split, lambda df: (df, None))
+        self._clear_dirty(bucket_name, split)
+        return len(version.deltas)
+
+    def _mark_dirty(self, bucket_name: str, split: str) -> None:
+        with self._dirty_lock:
+            self._dirty.add((bucket_name, split))
+
+    def _clear_dirty(self, bucket_name: str, split: str) -> None:
+        with self._dirty_lock:
+            self._dirty.discard((bucket_name, split))
+
+    def start_compactor(self, interval_sec: float = METADATA_COMPACT_INTERVAL_SEC) -> None:
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._stop.clear()
+        self._compactor = threading.Thread(target=self._compact_loop, args=(interval_sec,), daemon=True)
+        self._compactor.start()
+
+    def stop_compactor(self) -> None:
+        self._stop.set()
+
+    def _compact_loop(self, interval_sec: float) -> None:
+        while not self._stop.wait(interval_sec):
+            with self._dirty_lock:
+                pending = list(self._dirty)
+            for bucket_name, split in pending:
+                try:
+                    folded = self.compact(bucket_name, split)
+                    if folded:
+                        print(f"Compacted {folded} delta(s) into {bucket_name}/{metadata_key(split)}")
+                except Exception as e:
+                    print(f"Error compacting {bucket_name}/{split}: {e}")
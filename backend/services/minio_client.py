@@ -1,7 +1,155 @@
 from minio import Minio
 from minio.commonconfig import CopySource
+from minio.datatypes import Part
+from minio.deleteobjects import DeleteObject
 from minio.error import S3Error
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
 import os
+import random
+import threading
+import time
+
+MINIO_TRANSFER_CONCURRENCY = int(os.getenv("MINIO_TRANSFER_CONCURRENCY", "16"))
+MINIO_TRANSFER_RETRIES = int(os.getenv("MINIO_TRANSFER_RETRIES", "3"))
+# Objects larger than one part are sent as parallel-safe multipart uploads.
+MINIO_UPLOAD_PART_SIZE = int(os.getenv("MINIO_UPLOAD_PART_SIZE", str(16 * 1024 * 1024)))
+# S3 DeleteObjects accepts at most 1000 keys per request.
+DELETE_BATCH_SIZE = 1000
+# Lifetime of presigned GET URLs (SDK default: 7 days) and how many to cache.
+PRESIGNED_URL_EXPIRY_SEC = int(os.getenv("PRESIGNED_URL_EXPIRY_SEC", str(7 * 24 * 3600)))
+PRESIGNED_URL_CACHE_SIZE = int(os.getenv("PRESIGNED_URL_CACHE_SIZE", "20000"))
+
+
+class ConditionalWriteConflict(Exception):
+    """A conditional PUT lost the race: the object changed since it was read."""
+
+
+@dataclass
+class TransferReport:
+    """Outcome of a TransferEngine run."""
+    total: int
+    succeeded: list = field(default_factory=list)
+    failed: dict = field(default_factory=dict)  # item -> error message
+    bytes: int = 0
+    elapsed_sec: float = 0.0
+    cancelled: bool = False
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "succeeded": len(self.succeeded),
+            "failed": self.failed,
+            "bytes": self.bytes,
+            "elapsed_sec": round(self.elapsed_sec, 3),
+            "cancelled": self.cancelled,
+        }
+
+
+class TransferEngine:
+    """Runs one blocking MinIO call per item on a bounded thread pool, with
+    per-item retry + exponential backoff, progress callbacks and a failure
+    report. At most 2 x concurrency items are in flight, so feeding it a
+    100k-object listing does not queue 100k futures up front."""
+
+    def __init__(self, concurrency: int = MINIO_TRANSFER_CONCURRENCY,
+                 retries: int = MINIO_TRANSFER_RETRIES, backoff_sec: float = 0.5):
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.backoff_sec = backoff_sec
+
+    def _attempt(self, fn, item):
+        for attempt in range(self.retries + 1):
+            try:
+                return fn(item)
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                time.sleep(self.backoff_sec * (2 ** attempt) * random.uniform(0.5, 1.0))
+
+    def run(self, items, fn, *, progress=None, cancel_event: threading.Event = None) -> TransferReport:
+        """Call `fn(item)` for every item. `fn` returns the number of bytes
+        it moved (or None). `progress(done, total, bytes)` is called after
+        each item; setting `cancel_event` stops submitting new items."""
+        items = list(items)
+        report = TransferReport(total=len(items))
+        started = time.monotonic()
+        pending = {}
+        it = iter(items)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < self.concurrency * 2:
+                    if cancel_event is not None and cancel_event.is_set():
+                        report.cancelled = True
+                        exhausted = True
+                        break
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[pool.submit(self._attempt, fn, item)] = item
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    try:
+                        report.bytes += future.result() or 0
+                        report.succeeded.append(item)
+                    except Exception as e:
+                        report.failed[item] = str(e)
+                    if progress is not None:
+                        progress(len(report.succeeded) + len(report.failed), report.total, report.bytes)
+        report.elapsed_sec = time.monotonic() - started
+        return report
+
+
+class PresignedUrlCache:
+    """LRU of presigned URLs keyed by (bucket, object). An entry is served
+    only while it has more than `refresh_margin` of its lifetime left, so
+    the browser never receives a URL that is about to expire."""
+
+    def __init__(self, sign, expiry_sec: int = PRESIGNED_URL_EXPIRY_SEC,
+                 max_entries: int = PRESIGNED_URL_CACHE_SIZE, clock=time.time):
+        self.sign = sign  # sign(bucket, [object_names], expires, request_date) -> [urls]
+        self.expiry_sec = expiry_sec
+        self.max_entries = max_entries
+        self.refresh_margin = max(60, expiry_sec // 10)
+        self.clock = clock
+        self._entries = OrderedDict()  # (bucket, object) -> (expires_at, url)
+        self._lock = threading.Lock()
+
+    def get_many(self, bucket_name: str, object_names: list[str]) -> list[str]:
+        now = self.clock()
+        urls = {}
+        with self._lock:
+            for name in object_names:
+                entry = self._entries.get((bucket_name, name))
+                if entry is not None and entry[0] - now > self.refresh_margin:
+                    self._entries.move_to_end((bucket_name, name))
+                    urls[name] = entry[1]
+        missing = list(dict.fromkeys(n for n in object_names if n not in urls))
+        if missing:
+            # One request date for the whole batch, so expiry is the same for all.
+            signed = self.sign(bucket_name, missing, timedelta(seconds=self.expiry_sec),
+                               datetime.fromtimestamp(now, timezone.utc))
+            with self._lock:
+                for name, url in zip(missing, signed):
+                    urls[name] = url
+                    self._entries[(bucket_name, name)] = (now + self.expiry_sec, url)
+                    self._entries.move_to_end((bucket_name, name))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return [urls[name] for name in object_names]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
 
 class MinioClientWrapper:
     # Set region explicitly so the MinIO SDK never performs a GetBucketLocation
@@ -33,19 +181,58 @@ class MinioClientWrapper:
             secure=secure,
             region=self.DEFAULT_REGION,
         ) if ext != endpoint else self.client
+        self.presigned_urls = PresignedUrlCache(self._sign_urls)
 
     def list_buckets(self):
         return self.client.list_buckets()
 
+    def _sign_urls(self, bucket_name, object_names, expires, request_date):
+        return [
+            self._presign_client.get_presigned_url(
+                "GET", bucket_name, name, expires=expires, request_date=request_date
+            )
+            for name in object_names
+        ]
+
     def get_presigned_url(self, bucket_name, object_name):
-        return self._presign_client.get_presigned_url("GET", bucket_name, object_name)
+        return self.presigned_urls.get_many(bucket_name, [object_name])[0]
+
+    def get_presigned_urls(self, bucket_name, object_names: list[str]) -> list[str]:
+        """Presigned GET URLs for many objects; cached ones cost no signing."""
+        return self.presigned_urls.get_many(bucket_name, object_names)
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        """`offset` / `length` request a byte range (length 0 = to the end)."""
+        return self.client.get_object(bucket_name, object_name, offset=offset, length=length)
 
-    def get_object(self, bucket_name, object_name):
-        return self.client.get_object(bucket_name, object_name)
+    def stat_object(self, bucket_name, object_name):
+        return self.client.stat_object(bucket_name, object_name)
 
-    def put_object(self, bucket_name, object_name, data, length, content_type="application/octet-stream"):
-        return self.client.put_object(bucket_name, object_name, data, length, content_type=content_type)
+    def put_object(self, bucket_name, object_name, data, length, content_type="application/octet-stream", metadata=None,
+                   part_size=0):
+        return self.client.put_object(bucket_name, object_name, data, length, content_type=content_type, metadata=metadata,
+                                      part_size=part_size)
     
+    def put_object_if_match(self, bucket_name, object_name, data: bytes, etag=None,
+                            content_type="application/octet-stream", metadata=None):
+        """Single-part PUT that only succeeds if the object still has `etag`
+        (or, with `etag=None`, does not exist yet). Raises
+        ConditionalWriteConflict otherwise.
+
+        The public put_object() cannot send If-Match / If-None-Match (they
+        would be rewritten into x-amz-meta-* headers), so this goes through
+        the SDK's single-part PutObject call directly."""
+        headers = {"Content-Type": content_type}
+        headers["If-Match" if etag else "If-None-Match"] = f'"{etag}"' if etag else "*"
+        for key, value in (metadata or {}).items():
+            headers[f"x-amz-meta-{key}"] = value
+        try:
+            return self.client._put_object(bucket_name, object_name, data, headers=headers)
+        except S3Error as e:
+            if e.code in ("PreconditionFailed", "ConditionalRequestConflict"):
+                raise ConditionalWriteConflict(f"{bucket_name}/{object_name} changed concurrently") from e
+            raise
+
     def list_objects(self, bucket_name, prefix=None, recursive=False):
         return self.client.list_objects(bucket_name, prefix=prefix, recursive=recursive)
 
@@ -57,6 +244,96 @@ class MinioClientWrapper:
         source = CopySource(source_bucket, source_object)
         return self.client.copy_object(target_bucket, target_object, source)
 
+    def copy_objects(self, source_bucket, target_bucket, objects, *, progress=None, cancel_event=None,
+                     engine: TransferEngine = None) -> TransferReport:
+        """Server-side copy of many objects in parallel. `objects` holds
+        object names, or `(object_name, size)` pairs to get byte throughput."""
+        sizes = {}
+        names = []
+        for obj in objects:
+            name, size = obj if isinstance(obj, tuple) else (obj, 0)
+            sizes[name] = size
+            names.append(name)
+
+        def copy_one(name):
+            self.copy_object(source_bucket, name, target_bucket, name)
+            return sizes[name]
+
+        return (engine or TransferEngine()).run(names, copy_one, progress=progress, cancel_event=cancel_event)
+
+    def upload_objects(self, bucket_name, uploads, *, progress=None, cancel_event=None,
+                       engine: TransferEngine = None) -> TransferReport:
+        """Upload many objects in parallel. `uploads` holds
+        `(object_name, fileobj, size, content_type)` tuples; file objects are
+        streamed (multipart above MINIO_UPLOAD_PART_SIZE), never read whole,
+        and rewound before a retry."""
+        by_name = {u[0]: u for u in uploads}
+
+        def upload_one(name):
+            _name, fileobj, size, content_type = by_name[name]
+            fileobj.seek(0)
+            self.put_object(bucket_name, name, fileobj, size,
+                            content_type=content_type, part_size=MINIO_UPLOAD_PART_SIZE)
+            return size
+
+        return (engine or TransferEngine()).run(list(by_name), upload_one, progress=progress,
+                                                cancel_event=cancel_event)
+
+    # Multipart primitives for client-driven (resumable) uploads. The SDK only
+    # exposes these as private helpers used by put_object.
+    def create_multipart_upload(self, bucket_name, object_name, content_type="application/octet-stream") -> str:
+        return self.client._create_multipart_upload(bucket_name, object_name, {"Content-Type": content_type})
+
+    def upload_part(self, bucket_name, object_name, upload_id: str, part_number: int, data: bytes) -> str:
+        return self.client._upload_part(bucket_name, object_name, data, None, upload_id, part_number)
+
+    def list_parts(self, bucket_name, object_name, upload_id: str) -> list[tuple[int, str, int]]:
+        """All uploaded parts as `(part_number, etag, size)`, in part order."""
+        parts, marker = [], None
+        while True:
+            result = self.client._list_parts(bucket_name, object_name, upload_id, part_number_marker=marker)
+            parts.extend((p.part_number, p.etag, p.size) for p in result.parts)
+            if not result.is_truncated:
+                return parts
+            marker = result.next_part_number_marker
+
+    def complete_multipart_upload(self, bucket_name, object_name, upload_id: str, parts: list[tuple[int, str]]):
+        return self.client._complete_multipart_upload(
+            bucket_name, object_name, upload_id, [Part(number, etag) for number, etag in parts]
+        )
+
+    def abort_multipart_upload(self, bucket_name, object_name, upload_id: str):
+        return self.client._abort_multipart_upload(bucket_name, object_name, upload_id)
+
+    def delete_objects(self, bucket_name, object_names, *, progress=None, cancel_event=None,
+                       engine: TransferEngine = None) -> TransferReport:
+        """Delete many objects using parallel DeleteObjects batches. The
+        report is per object, not per batch."""
+        object_names = list(object_names)
+        batches = [tuple(object_names[i:i + DELETE_BATCH_SIZE])
+                   for i in range(0, len(object_names), DELETE_BATCH_SIZE)]
+
+        def delete_batch(batch):
+            errors = list(self.remove_objects(bucket_name, [DeleteObject(n) for n in batch]))
+            if errors:
+                raise RuntimeError(f"{len(errors)} object(s) failed to delete: {errors[0]}")
+            return 0
+
+        def batch_progress(done, total, nbytes):
+            if progress is not None:
+                progress(min(done * DELETE_BATCH_SIZE, len(object_names)), len(object_names), nbytes)
+
+        batch_report = (engine or TransferEngine()).run(
+            batches, delete_batch, progress=batch_progress, cancel_event=cancel_event
+        )
+        report = TransferReport(total=len(object_names), elapsed_sec=batch_report.elapsed_sec,
+                                cancelled=batch_report.cancelled)
+        for batch in batch_report.succeeded:
+            report.succeeded.extend(batch)
+        for batch, error in batch_report.failed.items():
+            report.failed.update({name: error for name in batch})
+        return report
+
     def create_bucket(self, bucket_name):
         if not self.client.bucket_exists(bucket_name):
             self.client.make_bucket(bucket_name)
@@ -84,6 +361,8 @@ class MinioClientWrapper:
             secure=secure,
             region=self.DEFAULT_REGION,
         ) if ext != endpoint else self.client
+        # Cached URLs carry the old host and credentials.
+        self.presigned_urls.clear()
 
 # Default configuration from environment variables
 # Internal endpoint for backend connection (default to docker service name)
@@ -293,6 +293,10 @@ class TrainingManager:
         confidence_threshold: float = 0.7,
         whisper_model: str = "small",
         language: str = "zh",
+        resume: bool = True,
+        workers: int = 1,
+        whisper_batch_size: int = 1,
+        stream_above_sec: float = 1800.0,
     ) -> None:
         """Queue a long-audio preprocessing task. Reuses the same pipeline
         machinery (single-task queue, log tailing, status reporting) as training."""
@@ -322,10 +326,17 @@ class TrainingManager:
                 "--confidence-threshold", str(confidence_threshold),
                 "--whisper-model", whisper_model,
                 "--language", language,
+                "--stream-above-sec", str(stream_above_sec),
                 "--minio-endpoint", minio_client.endpoint,
                 "--minio-access-key", minio_client.access_key,
                 "--minio-secret-key", minio_client.secret_key,
             ]
+            if not resume:
+                cmd.append("--no-resume")
+            if workers > 1:
+                cmd += ["--workers", str(workers)]
+            if whisper_batch_size > 1:
+                cmd += ["--whisper-batch-size", str(whisper_batch_size)]
             self.command_queue.append(("Preprocessing long audio", cmd, None))
             self.pipeline_steps = ["Preprocessing long audio"]
             self.current_step_index = 0
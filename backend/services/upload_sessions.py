@@ -0,0 +1,247 @@
+"""
+Resumable, chunked dataset uploads.
+
+`/api/upload/bulk` takes every audio file plus the CSV in one multipart
+request, so a dropped connection restarts the whole upload. An upload
+session instead maps each audio file onto an S3 multipart upload:
+
+    init   -> one multipart upload per file, session saved to the bucket
+    parts  -> each part is written straight through to MinIO
+    status -> uploaded parts come from ListParts, so a client can resume
+              after a disconnect (or a backend restart) and skip them
+    commit -> complete every multipart upload, probe the audio headers,
+              then append the metadata rows as a single delta
+
+Session state lives next to the data at `_uploads/{session_id}.json`.
+"""
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from io import BytesIO
+
+import pandas as pd
+from minio.deleteobjects import DeleteObject
+
+from backend.mlops.metadata_format import format_cell
+
+from .dataset_manager import dataset_manager, probe_audio_objects
+from .metadata_store import MetadataStore, is_missing_object
+from .minio_client import minio_client
+
+# S3 requires every part except the last to be at least 5 MiB.
+UPLOAD_SESSION_PART_SIZE = max(int(os.getenv("UPLOAD_SESSION_PART_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+
+SESSION_PREFIX = "_uploads/"
+
+
+class UploadSessionError(ValueError):
+    """The request does not fit the session (unknown file, bad part, incomplete upload)."""
+
+
+class UploadSessionNotFound(KeyError):
+    pass
+
+
+def _session_key(session_id: str) -> str:
+    return f"{SESSION_PREFIX}{session_id}.json"
+
+
+class UploadSessionManager:
+    def __init__(self, client, store: MetadataStore, part_size: int = UPLOAD_SESSION_PART_SIZE):
+        self.client = client
+        self.store = store
+        self.part_size = part_size
+        self._sessions = {}  # session_id -> session dict (write-through cache)
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _save(self, session: dict) -> None:
+        payload = json.dumps(session, ensure_ascii=False).encode("utf-8")
+        self.client.put_object(
+            session["bucket"], _session_key(session["id"]), BytesIO(payload), len(payload),
+            content_type="application/json",
+        )
+        with self._lock:
+            self._sessions[session["id"]] = session
+
+    def _load(self, bucket_name: str, session_id: str) -> dict:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is not None and session["bucket"] == bucket_name:
+            return session
+        try:
+            response = self.client.get_object(bucket_name, _session_key(session_id))
+        except Exception as e:
+            if is_missing_object(e):
+                raise UploadSessionNotFound(session_id)
+            raise
+        try:
+            session = json.loads(response.read())
+        finally:
+            response.close()
+            response.release_conn()
+        with self._lock:
+            self._sessions[session_id] = session
+        return session
+
+    def _forget(self, session: dict) -> None:
+        with self._lock:
+            self._sessions.pop(session["id"], None)
+        errors = self.client.remove_objects(session["bucket"], [DeleteObject(_session_key(session["id"]))])
+        for error in errors:
+            print(f"Error deleting upload session {error}")
+
+    def _file(self, session: dict, file_name: str) -> dict:
+        entry = session["files"].get(file_name)
+        if entry is None:
+            raise UploadSessionError(f"{file_name} is not part of upload session {session['id']}")
+        return entry
+
+    # ------------------------------------------------------------------
+    # Protocol
+    # ------------------------------------------------------------------
+
+    def init(self, bucket_name: str, split: str, files: list[dict], metadata_content: bytes) -> dict:
+        """Start a session for `files` (`[{"file_name", "size"}]`) described
+        by the CSV in `metadata_content`."""
+        new_df = pd.read_csv(BytesIO(metadata_content), dtype=str, keep_default_na=False)
+        required_cols = {'file_name', 'transcription'}
+        if not required_cols.issubset(new_df.columns):
+            raise UploadSessionError(f"CSV missing required columns: {required_cols}")
+
+        rows = []
+        for _, row in new_df.iterrows():
+            rows.append({
+                'file_name': row['file_name'],
+                'audio': f"s3://{bucket_name}/{split}/audio/{row['file_name']}",
+                'transcription': row['transcription'],
+                'tags': format_cell('tags', row['tags'] if 'tags' in row else ""),
+                'description': row['description'] if 'description' in row else "",
+            })
+
+        session = {
+            "id": uuid.uuid4().hex,
+            "bucket": bucket_name,
+            "split": split,
+            "created_at": time.time(),
+            "part_size": self.part_size,
+            "files": {},
+            "rows": rows,
+        }
+        for f in files:
+            size = int(f["size"])
+            object_name = f"{split}/audio/{f['file_name']}"
+            session["files"][f["file_name"]] = {
+                "object_name": object_name,
+                "size": size,
+                "parts": math.ceil(size / self.part_size),
+                # Empty files cannot be multipart uploads; they are PUT at commit.
+                "upload_id": self.client.create_multipart_upload(bucket_name, object_name, "audio/wav") if size else None,
+                "completed": False,
+            }
+        self._save(session)
+        return self.status(bucket_name, session["id"])
+
+    def upload_part(self, bucket_name: str, session_id: str, file_name: str, part_number: int, data: bytes) -> dict:
+        session = self._load(bucket_name, session_id)
+        entry = self._file(session, file_name)
+        if entry["completed"]:
+            raise UploadSessionError(f"{file_name} is already committed")
+        if not 1 <= part_number <= entry["parts"]:
+            raise UploadSessionError(f"{file_name} has parts 1..{entry['parts']}, got {part_number}")
+        part_size = session["part_size"]
+        expected = min(part_size, entry["size"] - (part_number - 1) * part_size)
+        if len(data) != expected:
+            raise UploadSessionError(f"part {part_number} of {file_name} must be {expected} bytes, got {len(data)}")
+
+        etag = self.client.upload_part(bucket_name, entry["object_name"], entry["upload_id"], part_number, data)
+        return {"file_name": file_name, "part_number": part_number, "etag": etag}
+
+    def status(self, bucket_name: str, session_id: str) -> dict:
+        """Session summary with the part numbers MinIO already has per file."""
+        session = self._load(bucket_name, session_id)
+        files = []
+        for file_name, entry in session["files"].items():
+            if entry["completed"] or not entry["upload_id"]:
+                uploaded = list(range(1, entry["parts"] + 1))
+            else:
+                uploaded = [number for number, _etag, _size in
+                            self.client.list_parts(bucket_name, entry["object_name"], entry["upload_id"])]
+            files.append({
+                "file_name": file_name,
+                "size": entry["size"],
+                "parts": entry["parts"],
+                "uploaded_parts": uploaded,
+                "completed": entry["completed"],
+            })
+        return {
+            "session_id": session["id"],
+            "bucket": session["bucket"],
+            "split": session["split"],
+            "part_size": session["part_size"],
+            "files": files,
+        }
+
+    def commit(self, bucket_name: str, session_id: str) -> dict:
+        """Complete every file's multipart upload and append the metadata rows
+        once. Safe to retry: files already completed are skipped."""
+        session = self._load(bucket_name, session_id)
+
+        missing = {}
+        uploads = {}
+        for file_name, entry in session["files"].items():
+            if entry["completed"] or not entry["upload_id"]:
+                continue
+            parts = self.client.list_parts(bucket_name, entry["object_name"], entry["upload_id"])
+            have = {number for number, _etag, _size in parts}
+            gaps = [n for n in range(1, entry["parts"] + 1) if n not in have]
+            if gaps:
+                missing[file_name] = gaps
+            uploads[file_name] = [(number, etag) for number, etag, _size in parts]
+        if missing:
+            raise UploadSessionError(f"Upload incomplete, missing parts: {missing}")
+
+        for file_name, entry in session["files"].items():
+            if entry["completed"]:
+                continue
+            if entry["upload_id"]:
+                self.client.complete_multipart_upload(
+                    bucket_name, entry["object_name"], entry["upload_id"], uploads[file_name]
+                )
+            else:
+                self.client.put_object(bucket_name, entry["object_name"], BytesIO(b""), 0, content_type="audio/wav")
+            entry["completed"] = True
+            self._save(session)
+
+        # Duration / sample rate from ranged header reads of the new objects.
+        stats, _report = probe_audio_objects(
+            self.client, bucket_name,
+            [(entry["object_name"], entry["size"]) for entry in session["files"].values() if entry["size"]],
+        )
+        audio_prefix = f"{session['split']}/audio/"
+        rows = [{**r, **stats.get(audio_prefix + r["file_name"], {})} for r in session["rows"]]
+
+        # Upserts are keyed on file_name, so a retried commit does not duplicate rows.
+        if rows:
+            self.store.append(bucket_name, session["split"], [{"op": "upsert", "row": r} for r in rows])
+        self._forget(session)
+        return {"count": len(session["rows"]), "files": len(session["files"])}
+
+    def abort(self, bucket_name: str, session_id: str) -> None:
+        session = self._load(bucket_name, session_id)
+        for file_name, entry in session["files"].items():
+            if entry["upload_id"] and not entry["completed"]:
+                try:
+                    self.client.abort_multipart_upload(bucket_name, entry["object_name"], entry["upload_id"])
+                except Exception as e:
+                    print(f"Failed to abort upload of {file_name}: {e}")
+        self._forget(session)
+
+
+upload_sessions = UploadSessionManager(minio_client, dataset_manager.store)
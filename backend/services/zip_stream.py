@@ -0,0 +1,153 @@
+"""
+Streaming ZIP writer for dataset downloads.
+
+`batch_download` used to build the whole archive in a BytesIO, so a large
+selection had to fit in RAM and nothing was sent until every object had been
+read. `stream_zip()` instead writes into a non-seekable buffer (zipfile then
+emits data descriptors instead of seeking back) and yields the bytes as soon
+as each chunk is written. Members are fetched ahead of the writer on a small
+thread pool; at most `prefetch` members are in flight and only objects up to
+`ZIP_PREFETCH_MAX_BYTES` are read into memory ahead of time — larger ones are
+streamed straight from the open response.
+"""
+import logging
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable
+
+logger = logging.getLogger("jtb.zip_stream")
+
+ZIP_PREFETCH = int(os.getenv("ZIP_PREFETCH", "8"))
+ZIP_PREFETCH_MAX_BYTES = int(os.getenv("ZIP_PREFETCH_MAX_BYTES", str(16 * 1024 * 1024)))
+ZIP_CHUNK_SIZE = 256 * 1024
+
+
+@dataclass
+class ZipMember:
+    arcname: str
+    # Returns (file-like object, size or None). Raising skips the member.
+    fetch: Callable
+    compress_type: int = zipfile.ZIP_STORED
+
+
+class _StreamBuffer:
+    """Write-only, non-seekable sink whose contents are drained after every write."""
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def seek(self, *args):
+        raise OSError("stream is not seekable")
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _close(fileobj) -> None:
+    for method in ("close", "release_conn"):
+        fn = getattr(fileobj, method, None)
+        if fn is not None:
+            try:
+                fn()
+            except Exception:
+                pass
+
+
+def object_fetcher(client, bucket_name: str, object_name: str,
+                   max_buffer_bytes: int = ZIP_PREFETCH_MAX_BYTES) -> Callable:
+    """`ZipMember.fetch` for a MinIO object. Small objects are read fully
+    (so the prefetch actually overlaps network time); large ones return the
+    live response to be streamed by the writer."""
+    def fetch():
+        resp = client.get_object(bucket_name, object_name)
+        length = getattr(resp, "headers", {}).get("Content-Length")
+        size = int(length) if length else None
+        if size is not None and size > max_buffer_bytes:
+            return resp, size
+        try:
+            data = resp.read()
+        finally:
+            _close(resp)
+        return BytesIO(data), len(data)
+    return fetch
+
+
+def stream_zip(members, prefetch: int = ZIP_PREFETCH, chunk_size: int = ZIP_CHUNK_SIZE):
+    """Yield a ZIP archive of `members` (an iterable of ZipMember) chunk by chunk."""
+    members = iter(members)
+    sink = _StreamBuffer()
+    pending = deque()  # (member, future), in archive order
+    pool = ThreadPoolExecutor(max_workers=max(1, prefetch), thread_name_prefix="zip-prefetch")
+
+    def fill():
+        while len(pending) < max(1, prefetch):
+            member = next(members, None)
+            if member is None:
+                return
+            pending.append((member, pool.submit(member.fetch)))
+
+    try:
+        with zipfile.ZipFile(sink, "w", allowZip64=True) as zf:
+            fill()
+            while pending:
+                member, future = pending.popleft()
+                fill()
+                try:
+                    fileobj, size = future.result()
+                except Exception:
+                    logger.warning("Skipping %s during zip stream", member.arcname, exc_info=True)
+                    continue
+
+                info = zipfile.ZipInfo(member.arcname, date_time=time.localtime()[:6])
+                info.compress_type = member.compress_type
+                if size is not None:
+                    info.file_size = size  # lets zipfile decide on zip64 up front
+                try:
+                    with zf.open(info, "w", force_zip64=size is None) as dest:
+                        while True:
+                            block = fileobj.read(chunk_size)
+                            if not block:
+                                break
+                            dest.write(block)
+                            data = sink.drain()
+                            if data:
+                                yield data
+                finally:
+                    _close(fileobj)
+                data = sink.drain()
+                if data:
+                    yield data
+        data = sink.drain()  # central directory
+        if data:
+            yield data
+    finally:
+        # Client disconnected or we failed: drop queued fetches, free open responses.
+        for _member, future in pending:
+            if future.cancel():
+                continue
+            try:
+                fileobj, _size = future.result()
+                _close(fileobj)
+            except Exception:
+                pass
+        pool.shutdown(wait=False)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+import difflib
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.mlops.alignment import anchored_opcodes, get_opcodes  # noqa: E402
+from backend.mlops.audio_chunker import _build_alignment_mapping  # noqa: E402
+from backend.scripts.bench_alignment import run, synthetic_pair  # noqa: E402
+
+
+def _assert_valid(a, b, opcodes):
+    i = j = 0
+    for tag, i1, i2, j1, j2 in opcodes:
+        assert (i1, j1) == (i, j)
+        if tag == "equal":
+            assert a[i1:i2] == b[j1:j2]
+        i, j = i2, j2
+    assert (i, j) == (len(a), len(b))
+
+
+def _matched(opcodes):
+    return sum(i2 - i1 for tag, i1, i2, _j1, _j2 in opcodes if tag == "equal")
+
+
+@pytest.mark.parametrize("a,b", [
+    ("", ""), ("你好", ""), ("", "你好"), ("你好世界", "你好世界"), ("abc", "xyz"),
+    ("你好世界大家好", "你好，大世界家好"),
+])
+def test_anchored_opcodes_edge_cases(a, b):
+    opcodes = anchored_opcodes(a, b)
+    _assert_valid(a, b, opcodes)
+    assert _matched(opcodes) == _matched(difflib.SequenceMatcher(a=a, b=b, autojunk=False).get_opcodes())
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_anchored_matches_difflib_on_long_transcripts(seed):
+    whisper, gt = synthetic_pair(3000, error_rate=0.15, seed=seed)
+    anchored = anchored_opcodes(whisper, gt)
+    reference = difflib.SequenceMatcher(a=whisper, b=gt, autojunk=False).get_opcodes()
+
+    _assert_valid(whisper, gt, anchored)
+    assert _matched(anchored) >= _matched(reference) * 0.99
+    fast = _build_alignment_mapping(whisper, gt, backend="anchored")
+    slow = _build_alignment_mapping(whisper, gt, backend="difflib")
+    assert sum(abs(x - y) for x, y in zip(fast, slow)) / len(slow) < 1.0
+
+
+def test_auto_keeps_difflib_for_short_text_and_rejects_unknown_backend():
+    a, b = "你好世界", "你好大世界"
+    assert get_opcodes(a, b, "auto") == difflib.SequenceMatcher(a=a, b=b, autojunk=False).get_opcodes()
+    with pytest.raises(ValueError):
+        get_opcodes(a, b, "levenshtein")
+
+
+def test_benchmark_reports_each_backend():
+    rows = run([500], error_rate=0.1, backends=["difflib", "anchored"])
+    assert [r["backend"] for r in rows] == ["difflib", "anchored"]
+    assert rows[0]["mean_drift"] == 0.0 and rows[1]["matched"] > 0
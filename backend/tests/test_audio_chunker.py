@@ -4,9 +4,13 @@ faster-whisper) are not exercised here — tests run without GPU/model files."""
 
 from __future__ import annotations
 
+import json
 import sys
+import time
+import types
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -16,12 +20,20 @@ if str(PROJECT_ROOT) not in sys.path:
 from backend.mlops.audio_chunker import (  # noqa: E402
     ChunkAssignment,
     SpeechSegment,
+    StreamingChunker,
+    T2STable,
+    WhisperSegment,
     WhisperWord,
+    WhisperWords,
     _build_alignment_mapping,
+    _chunk_word_texts,
+    load_t2s_table,
     _confidence,
     assign_gt_to_chunks,
+    chunk_long_audio,
     merge_segments_to_chunks,
     normalize_for_alignment,
+    transcribe_batch,
 )
 
 
@@ -41,6 +53,63 @@ def test_normalize_handles_none_and_empty():
     assert normalize_for_alignment(None) == ""  # type: ignore[arg-type]
 
 
+class _CountingT2S:
+    table = {"壓": "压", "體": "体", "們": "们", "後": "后", "乾": "干"}
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, ch):
+        self.calls += 1
+        return self.table.get(ch, ch)
+
+
+def test_t2s_table_matches_per_char_conversion_and_asks_once_per_char():
+    convert = _CountingT2S()
+    text = "他們壓力很大，後來身體好了。乾杯！abc" * 50
+    expected = "".join(convert(ch)[:1] for ch in text)
+    convert.calls = 0
+
+    table = T2STable(convert)
+    assert text.translate(table) == expected
+    assert convert.calls == len(set(text))
+    assert text.translate(table) == expected and convert.calls == len(set(text))
+
+
+def test_t2s_table_disk_cache_round_trip(tmp_path):
+    path = str(tmp_path / "t2s.json")
+    built = load_t2s_table(_CountingT2S(), path)
+    convert = _CountingT2S()
+    loaded = load_t2s_table(convert, path)
+    changes = {ord(k): ord(v) for k, v in _CountingT2S.table.items()}
+    assert dict(loaded) == built.changes() == changes
+    with open(path, encoding="utf-8") as f:
+        assert {int(k): v for k, v in json.load(f)["table"].items()} == changes
+    fingerprint_calls = convert.calls
+    assert "他們壓力".translate(loaded) == "他们压力"
+    assert convert.calls == fingerprint_calls  # CJK chars are covered by the cached table
+    # Identities are memoized too, so later translates skip __missing__.
+    assert loaded[ord("他")] == ord("他") and len(loaded) == len(changes) + 2
+
+
+def test_t2s_table_is_faster_than_per_char_opencc():
+    opencc = pytest.importorskip("opencc")
+    convert = opencc.OpenCC("t2s").convert
+    text = "台灣的語音辨識資料集，們後來壓縮體積。" * 2000
+    table = T2STable(convert)
+    text.translate(table)  # warm the memo
+
+    started = time.perf_counter()
+    per_char = "".join(convert(ch)[:1] or ch for ch in text)
+    per_char_sec = time.perf_counter() - started
+    started = time.perf_counter()
+    translated = text.translate(table)
+    table_sec = time.perf_counter() - started
+
+    assert translated == per_char
+    assert table_sec * 5 < per_char_sec
+
+
 # ---------------------------------------------------------------------------
 # merge_segments_to_chunks
 # ---------------------------------------------------------------------------
@@ -284,3 +353,178 @@ def test_assign_full_5_minute_scenario():
     # Reassembled transcript should match GT (modulo possible 1-char slop).
     rejoined = "".join(a.gt_transcript for a in out)
     assert rejoined == gt
+
+
+def test_assign_scores_chunks_from_the_global_alignment(monkeypatch):
+    import backend.mlops.audio_chunker as audio_chunker
+
+    rng = np.random.default_rng(1)
+    gt = "".join(chr(0x4E00 + int(i)) for i in rng.integers(0, 300, 400))
+    heard = list(gt)
+    for pos in rng.choice(len(heard), 60, replace=False):
+        heard[pos] = "錯"  # Whisper mishears 15% of the characters
+    words = [_word(ch, i * 0.5, i * 0.5 + 0.4) for i, ch in enumerate(heard)]
+    boundaries = [(i * 25.0, (i + 1) * 25.0) for i in range(8)]
+
+    def no_rescoring(*_args):
+        raise AssertionError("chunks must not be re-aligned one by one")
+
+    monkeypatch.setattr(audio_chunker, "_confidence", no_rescoring)
+    out = assign_gt_to_chunks(words, boundaries, gt)
+
+    assert "".join(a.gt_transcript for a in out) == gt
+    for a in out:
+        local = _confidence(normalize_for_alignment(a.whisper_transcript), normalize_for_alignment(a.gt_transcript))
+        assert a.confidence == pytest.approx(local, abs=0.02)
+        assert 0.75 < a.confidence < 0.95
+
+
+def test_chunk_word_texts_matches_midpoint_scan():
+    rng = np.random.default_rng(0)
+    starts = np.sort(rng.uniform(0, 3600, 20000))
+    starts[100:110] = starts[100:110][::-1]  # a few out-of-order timestamps
+    words = [_word(chr(0x4E00 + i % 500), s, s + rng.uniform(0.05, 0.6)) for i, s in enumerate(starts)]
+    boundaries = [(t, t + 25.0) for t in np.arange(0, 3600, 25.0)]
+
+    fast = _chunk_word_texts(WhisperWords.from_words(words), boundaries)
+
+    mid = [(w.start_sec + w.end_sec) / 2.0 for w in words]
+    slow = ["".join(w.text for w, m in zip(words, mid) if t0 <= m < t1) for t0, t1 in boundaries[:20]]
+    assert fast[:20] == slow
+    assert sum(len(t) for t in fast) == sum(1 for m in mid if m < 3600)
+
+
+def test_whisper_words_behaves_like_a_word_list():
+    words = WhisperWords(["你", "好", "嗎"], [0.0, 0.5, 1.0], [0.5, 1.0, 1.5])
+    assert len(words) == 3 and words[1] == WhisperWord("好", 0.5, 1.0)
+    assert list(words[1:]) == [WhisperWord("好", 0.5, 1.0), WhisperWord("嗎", 1.0, 1.5)]
+    assert WhisperWords.from_words(list(words)) == words
+    assert assign_gt_to_chunks(words, [(0.0, 1.0), (1.0, 2.0)], "你好嗎")[1].gt_transcript == "嗎"
+
+
+# ---------------------------------------------------------------------------
+# transcribe_batch (faster-whisper replaced by fakes)
+# ---------------------------------------------------------------------------
+
+
+def _raw_segment(text: str, start: float, end: float):
+    step = (end - start) / len(text)
+    words = [types.SimpleNamespace(word=ch, start=start + i * step, end=start + (i + 1) * step)
+             for i, ch in enumerate(text)]
+    return types.SimpleNamespace(start=start, end=end, text=text, words=words)
+
+
+class _FakeModel:
+    def __init__(self):
+        self.sequential = 0
+
+    def transcribe(self, audio, **kwargs):
+        self.sequential += 1
+        return iter([_raw_segment("慢", 0.0, len(audio) / 16000)]), None
+
+
+def test_transcribe_batch_returns_per_file_output(monkeypatch):
+    batched = []
+
+    class FakePipeline:
+        def __init__(self, model):
+            self.model = model
+
+        def transcribe(self, audio, batch_size, without_timestamps, **kwargs):
+            batched.append((len(audio), batch_size, without_timestamps))
+            if len(audio) == 16000:
+                raise RuntimeError("boom")
+            return iter([_raw_segment("你好", 0.0, 1.0), _raw_segment("世界", 1.0, 2.0)]), None
+
+    monkeypatch.setitem(sys.modules, "faster_whisper",
+                        types.SimpleNamespace(BatchedInferencePipeline=FakePipeline))
+    model = _FakeModel()
+    audios = [np.zeros(32000, dtype=np.float32), np.zeros(16000, dtype=np.float32)]
+
+    out = transcribe_batch(audios, 16000, model=model, batch_size=4)
+
+    assert batched == [(32000, 4, False), (16000, 4, False)]
+    segments, words = out[0]
+    assert [s.text for s in segments] == ["你好", "世界"]
+    assert "".join(w.text for w in words) == "你好世界"
+    # The file the batched pipeline failed on is redone sequentially.
+    assert [w.text for w in out[1][1]] == ["慢"] and model.sequential == 1
+
+
+def test_transcribe_batch_falls_back_without_batched_pipeline(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace())
+    model = _FakeModel()
+    out = transcribe_batch([np.zeros(16000, dtype=np.float32)] * 3, 16000, model=model, batch_size=8)
+    assert len(out) == 3 and model.sequential == 3
+
+
+# ---------------------------------------------------------------------------
+# StreamingChunker (Whisper replaced by a scripted fake)
+# ---------------------------------------------------------------------------
+
+SR = 16000
+
+
+def timed_audio(seconds: float) -> np.ndarray:
+    """Every sample holds its whole second / 1000, so a fake transcriber can
+    tell where a window starts."""
+    return (np.arange(int(seconds * SR)) // SR).astype(np.float32) / 1000
+
+
+def scripted_transcriber(sentences):
+    """Fake `_transcribe`: returns the (start, end, text) sentences that
+    start inside the window, cutting the one that runs past its end."""
+    def transcribe(audio, sample_rate, *_args):
+        first = int(round(float(audio[0]) * 1000))
+        changes_at = int(np.argmax(audio != audio[0]))
+        offset = first + 1 - changes_at / SR if changes_at else first
+        end = offset + len(audio) / SR
+        segments = []
+        for start, stop, text in sentences:
+            if not offset - 1e-6 <= start < end:
+                continue
+            if stop > end:
+                stop, text = end, text[:len(text) // 2]
+            step = (stop - start) / len(text)
+            words = WhisperWords(list(text), [start - offset + i * step for i in range(len(text))],
+                                 [start - offset + (i + 1) * step for i in range(len(text))])
+            segments.append(WhisperSegment(start - offset, stop - offset, text, words))
+        return segments, WhisperWords.from_words([w for seg in segments for w in seg.words])
+    return transcribe
+
+
+def test_streaming_chunker_matches_whole_file_chunking(monkeypatch):
+    import backend.mlops.audio_chunker as audio_chunker
+
+    rng = np.random.default_rng(2)
+    gt = "".join(chr(0x4E00 + int(i)) for i in rng.integers(0, 700, 600))
+    heard = "".join(ch if rng.random() > 0.15 else "錯" for ch in gt)
+    sentences = [(4 * k + 0.2, 4 * k + 3.8, heard[4 * k:4 * k + 4]) for k in range(150)]
+    gt = gt[:300] + "多出來的一段沒有人說過的話" + gt[300:]
+    monkeypatch.setattr(audio_chunker, "_transcribe", scripted_transcriber(sentences))
+    audio = timed_audio(600.0)
+
+    whole = chunk_long_audio(audio, SR, gt)
+    chunker = StreamingChunker(gt, window_sec=60.0)
+    streamed, emitted_at = [], []
+    for i in range(0, len(audio), 7 * SR):
+        out = chunker.feed(audio[i:i + 7 * SR])
+        streamed += out
+        emitted_at += [i / SR] * len(out)
+    streamed += chunker.finish()
+
+    assert [(c.t_start_sec, c.t_end_sec) for c in streamed] == [(c.t_start_sec, c.t_end_sec) for c in whole]
+    assert [c.gt_transcript for c in streamed] == [c.gt_transcript for c in whole]
+    assert all(np.array_equal(a.audio, b.audio) for a, b in zip(streamed, whole))
+    assert "".join(c.gt_transcript for c in streamed) == gt
+    # Chunks come out while audio is still arriving, and the buffer stays
+    # around one window plus the two undecided chunks.
+    assert emitted_at[0] < 120.0
+    assert chunker.peak_buffer / SR < 60.0 + 2 * 25.0 + 7.0
+
+
+def test_streaming_chunker_short_audio_is_one_chunk():
+    chunker = StreamingChunker("  你好  ")
+    assert chunker.feed(np.zeros(10 * SR, dtype=np.float32)) == []
+    [chunk] = chunker.finish()
+    assert (chunk.gt_transcript, chunk.confidence, len(chunk.audio)) == ("你好", 1.0, 10 * SR)
@@ -0,0 +1,106 @@
+import asyncio
+import struct
+import sys
+import wave
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.mlops.audio_probe import probe_bytes, probe_fileobj, probe_object  # noqa: E402
+from backend.services.dataset_manager import DatasetManager  # noqa: E402
+from backend.services.metadata_index import MetadataIndex  # noqa: E402
+from backend.tests.test_dataset_manager import FakeMinio  # noqa: E402
+
+
+def _wav(seconds: float, sr: int = 16000, channels: int = 1) -> bytes:
+    buf = BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(b"\x00\x00" * channels * int(seconds * sr))
+    return buf.getvalue()
+
+
+def _with_list_chunk(wav: bytes, size: int) -> bytes:
+    """Insert a LIST chunk between RIFF/WAVE and fmt, pushing the header
+    chunks past the first probe read."""
+    chunk = b"LIST" + struct.pack("<I", size) + b"\x00" * size
+    body = wav[12:]
+    return b"RIFF" + struct.pack("<I", 4 + len(chunk) + len(body)) + b"WAVE" + chunk + body
+
+
+def test_probe_wav_and_flac_headers():
+    info = probe_bytes(_wav(2.5, sr=22050, channels=2))
+    assert (round(info.duration, 3), info.sample_rate, info.channels) == (2.5, 22050, 2)
+
+    sf = pytest.importorskip("soundfile")
+    buf = BytesIO()
+    sf.write(buf, np.zeros(48000 * 3, dtype=np.float32), 48000, format="FLAC")
+    info = probe_bytes(buf.getvalue())
+    assert (round(info.duration, 3), info.sample_rate, info.channels) == (3.0, 48000, 1)
+
+    assert probe_bytes(b"ID3\x04\x00\x00\x00\x00\x00\x00not audio") is None
+
+
+def test_probe_streamed_wav_uses_object_size():
+    wav = bytearray(_wav(1.0))
+    data_at = wav.index(b"data")
+    wav[data_at + 4:data_at + 8] = struct.pack("<I", 0xFFFFFFFF)
+    info = probe_fileobj(BytesIO(bytes(wav)), size=len(wav))
+    assert round(info.duration, 3) == 1.0
+
+
+def test_probe_object_reads_only_headers():
+    client = FakeMinio()
+    payload = _with_list_chunk(_wav(30.0), 10000)
+    client.objects[("bucket", "train/audio/long.wav")] = payload
+
+    info = probe_object(client, "bucket", "train/audio/long.wav", header_bytes=1024)
+
+    assert round(info.duration, 3) == 30.0
+    assert info.size_bytes == len(payload)
+    # First 1KB, then one hop over the LIST chunk to fmt/data.
+    assert client.calls["ranged_bytes"] < 1100
+
+
+def test_backfill_job_stores_stats_for_missing_rows(tmp_path):
+    client = FakeMinio()
+    manager = DatasetManager(client, index=MetadataIndex(str(tmp_path / "index")))
+    manager.add_audio_record("bucket", "train", "new.wav", "x", _wav(1.0))
+    client.objects[("bucket", "train/audio/old.wav")] = _wav(4.0, sr=8000)
+    client.objects[("bucket", "train/audio/old.mp3")] = b"\xff\xfb" + b"\x00" * 100
+    manager.store.append("bucket", "train", [
+        {"op": "upsert", "row": {"file_name": name, "transcription": "y"}}
+        for name in ("old.wav", "old.mp3", "gone.wav")
+    ])
+
+    result = manager.probe_audio("bucket", "train")
+
+    assert result == {"probed": 1, "unknown_format": 1, "missing_audio": 1, "failed": 0, "cancelled": False}
+    df, _ = manager._read_metadata("bucket", "train")
+    rows = df.set_index("file_name")
+    assert rows.loc["new.wav", "duration"] == "1.000"
+    assert rows.loc["old.wav", ["duration", "sample_rate", "channels"]].tolist() == ["4.000", "8000", "1"]
+    assert rows.loc["old.mp3", "duration"] == "" and rows.loc["old.mp3", "size_bytes"] == "102"
+    assert rows.loc["gone.wav", "duration"] == ""
+
+
+def test_bulk_upload_probes_files_without_a_known_size(tmp_path):
+    client = FakeMinio()
+    manager = DatasetManager(client, index=MetadataIndex(str(tmp_path / "index")))
+    files = [SimpleNamespace(filename="a.wav", file=BytesIO(_wav(2.0, sr=8000)), size=None)]
+
+    asyncio.run(manager.add_bulk_records("bucket", "train", files, b"file_name,transcription\na.wav,x\n"))
+
+    df, _ = manager._read_metadata("bucket", "train")
+    row = df.set_index("file_name").loc["a.wav"]
+    assert row[["duration", "sample_rate", "channels"]].tolist() == ["2.000", "8000", "1"]
+    assert client.objects[("bucket", "train/audio/a.wav")] == _wav(2.0, sr=8000)
@@ -0,0 +1,597 @@
+import asyncio
+import hashlib
+import json
+import sys
+from concurrent.futures import Future
+from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from minio.error import S3Error
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.dataset_manager import DatasetManager  # noqa: E402
+from backend.services.metadata_cache import MetadataCache  # noqa: E402
+from backend.services.metadata_index import MetadataIndex  # noqa: E402
+from backend.services.metadata_store import apply_delta_ops  # noqa: E402
+from backend.services.minio_client import (  # noqa: E402
+    ConditionalWriteConflict,
+    MinioClientWrapper,
+    PresignedUrlCache,
+    TransferEngine,
+)
+
+
+class _Response:
+    def __init__(self, data: bytes, headers: dict = None):
+        self._data = BytesIO(data)
+        self.headers = headers or {}
+
+    def read(self, amt=None):
+        return self._data.read(amt)
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    """In-memory stand-in for MinioClientWrapper that counts requests."""
+
+    def __init__(self):
+        self.objects = {}
+        self.user_meta = {}
+        self.calls = {"get": 0, "put": 0, "stat": 0}
+        self.fail_puts = set()
+
+    def _etag(self, data: bytes) -> str:
+        return hashlib.md5(data).hexdigest()
+
+    def _missing(self, object_name):
+        return S3Error(None, "NoSuchKey", "missing", object_name, "", "")
+
+    def put_object(self, bucket_name, object_name, data, length,
+                   content_type="application/octet-stream", metadata=None, part_size=0):
+        self.calls["put"] += 1
+        if object_name in self.fail_puts:
+            raise RuntimeError(f"upload of {object_name} failed")
+        payload = data.read()
+        self.objects[(bucket_name, object_name)] = payload
+        self.user_meta[(bucket_name, object_name)] = {
+            f"X-Amz-Meta-{k}": v for k, v in (metadata or {}).items()
+        }
+        return SimpleNamespace(etag=self._etag(payload))
+
+    def put_object_if_match(self, bucket_name, object_name, data, etag=None,
+                            content_type="application/octet-stream", metadata=None):
+        current = self.objects.get((bucket_name, object_name))
+        current_etag = self._etag(current) if current is not None else None
+        if current_etag != etag:
+            raise ConditionalWriteConflict(object_name)
+        return self.put_object(bucket_name, object_name, BytesIO(data), len(data),
+                               content_type=content_type, metadata=metadata)
+
+    def get_object(self, bucket_name, object_name, offset=0, length=0):
+        self.calls["get"] += 1
+        if (bucket_name, object_name) not in self.objects:
+            raise self._missing(object_name)
+        payload = self.objects[(bucket_name, object_name)]
+        if not offset and not length:
+            return _Response(payload)
+        end = offset + length if length else len(payload)
+        self.calls.setdefault("ranged_bytes", 0)
+        self.calls["ranged_bytes"] += len(payload[offset:end])
+        return _Response(payload[offset:end],
+                         {"Content-Range": f"bytes {offset}-{min(end, len(payload)) - 1}/{len(payload)}"})
+
+    def stat_object(self, bucket_name, object_name):
+        self.calls["stat"] += 1
+        if (bucket_name, object_name) not in self.objects:
+            raise self._missing(object_name)
+        payload = self.objects[(bucket_name, object_name)]
+        return SimpleNamespace(
+            etag=self._etag(payload),
+            size=len(payload),
+            metadata=self.user_meta.get((bucket_name, object_name), {}),
+        )
+
+    def list_objects(self, bucket_name, prefix=None, recursive=False):
+        return [
+            SimpleNamespace(object_name=key, size=len(payload), etag=self._etag(payload))
+            for (bucket, key), payload in sorted(self.objects.items())
+            if bucket == bucket_name and key.startswith(prefix or "")
+        ]
+
+    def remove_objects(self, bucket_name, objects_iter):
+        for obj in objects_iter:
+            self.objects.pop((bucket_name, obj.name), None)
+        return iter(())
+
+    def copy_object(self, source_bucket, source_object, target_bucket, target_object):
+        self.objects[(target_bucket, target_object)] = self.objects[(source_bucket, source_object)]
+
+    def get_presigned_url(self, bucket_name, object_name):
+        return f"http://minio/{bucket_name}/{object_name}"
+
+    def get_presigned_urls(self, bucket_name, object_names):
+        return [self.get_presigned_url(bucket_name, name) for name in object_names]
+
+    # The bulk helpers only call the primitives above.
+    copy_objects = MinioClientWrapper.copy_objects
+    upload_objects = MinioClientWrapper.upload_objects
+    delete_objects = MinioClientWrapper.delete_objects
+
+
+@pytest.fixture
+def client():
+    return FakeMinio()
+
+
+@pytest.fixture
+def manager(client, tmp_path):
+    return DatasetManager(client, index=MetadataIndex(str(tmp_path / "index")))
+
+
+def _put_csv(client, df, key="train/metadata.csv", bucket="bucket"):
+    payload = df.to_csv(index=False).encode("utf-8")
+    client.objects[(bucket, key)] = payload
+
+
+# ---------------------------------------------------------------------------
+# MetadataCache
+# ---------------------------------------------------------------------------
+
+
+def test_cache_serves_unchanged_object_with_one_head(client):
+    _put_csv(client, pd.DataFrame({"file_name": ["a.wav"], "transcription": ["x"]}))
+    cache = MetadataCache(client)
+
+    cache.get("bucket", "train/metadata.csv")
+    df, _ = cache.get("bucket", "train/metadata.csv")
+
+    assert list(df["file_name"]) == ["a.wav"]
+    assert client.calls["get"] == 1
+    assert client.calls["stat"] == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_reloads_after_etag_change(client):
+    _put_csv(client, pd.DataFrame({"file_name": ["a.wav"]}))
+    cache = MetadataCache(client)
+    cache.get("bucket", "train/metadata.csv")
+
+    _put_csv(client, pd.DataFrame({"file_name": ["a.wav", "b.wav"]}))
+    df, _ = cache.get("bucket", "train/metadata.csv")
+
+    assert len(df) == 2
+    assert cache.stats()["misses"] == 2
+
+
+def test_cache_returns_copies(client):
+    _put_csv(client, pd.DataFrame({"file_name": ["a.wav"]}))
+    cache = MetadataCache(client)
+    df, _ = cache.get("bucket", "train/metadata.csv")
+    df.loc[0, "file_name"] = "mutated.wav"
+
+    again, _ = cache.get("bucket", "train/metadata.csv")
+    assert again.loc[0, "file_name"] == "a.wav"
+
+
+def test_cache_evicts_least_recently_used(client):
+    cache = MetadataCache(client, max_entries=2)
+    for split in ("train", "test", "val"):
+        _put_csv(client, pd.DataFrame({"file_name": [split]}), key=f"{split}/metadata.csv")
+        cache.get("bucket", f"{split}/metadata.csv")
+
+    assert cache.stats()["entries"] == 2
+    cache.get("bucket", "train/metadata.csv")
+    assert cache.stats()["misses"] == 4
+
+
+# ---------------------------------------------------------------------------
+# DatasetManager
+# ---------------------------------------------------------------------------
+
+
+def test_writes_seed_the_cache(manager, client):
+    manager.add_audio_record("bucket", "train", "a.wav", "hello", b"RIFF")
+    gets_before = client.calls["get"]
+
+    manager.update_transcription("bucket", "train", "a.wav", "world")
+    rows = manager.get_rows_metadata("bucket", "train", ["a.wav"])
+
+    assert rows[0]["transcription"] == "world"
+    assert client.calls["get"] == gets_before
+
+
+def test_get_dataset_pages_and_signs_urls(manager):
+    for i in range(3):
+        manager.add_audio_record("bucket", "train", f"{i}.wav", f"text {i}", b"RIFF", tags="a, b")
+
+    page = manager.get_dataset("bucket", "train", page=1, limit=2)
+    assert page["total"] == 3
+    assert page["unique_tags"] == ["a", "b"]
+    assert page["data"][0]["audio_url"] == "http://minio/bucket/train/audio/0.wav"
+
+
+def _deltas(client, split="train", bucket="bucket"):
+    return [k for (b, k) in client.objects if b == bucket and k.startswith(f"{split}/_deltas/")]
+
+
+def test_apply_delta_ops_upserts_in_place_and_appends():
+    df = pd.DataFrame({"file_name": ["a.wav", "b.wav"], "transcription": ["1", "2"]})
+    out = apply_delta_ops(df, [
+        {"op": "upsert", "row": {"file_name": "c.wav", "transcription": "3"}},
+        {"op": "upsert", "row": {"file_name": "a.wav", "transcription": "1b", "tags": "x"}},
+        {"op": "delete", "file_name": "b.wav"},
+    ])
+    assert list(out["file_name"]) == ["a.wav", "c.wav"]
+    assert list(out["transcription"]) == ["1b", "3"]
+    assert list(out["tags"]) == ["x", ""]
+
+
+def test_upload_appends_delta_without_rewriting_csv(manager, client):
+    _put_csv(client, pd.DataFrame({"file_name": ["old.wav"], "audio": [""], "transcription": ["x"]}))
+    manager.add_audio_record("bucket", "train", "new.wav", "hello", b"RIFF")
+
+    # Base CSV untouched, one delta written, merged view has both rows.
+    assert b"new.wav" not in client.objects[("bucket", "train/metadata.csv")]
+    assert len(_deltas(client)) == 1
+    rows = manager.get_rows_metadata("bucket", "train", ["old.wav", "new.wav"])
+    assert sorted(r["file_name"] for r in rows) == ["new.wav", "old.wav"]
+    assert manager.get_dataset("bucket", "train")["total"] == 2
+
+
+def test_compact_folds_deltas_and_records_them(manager, client):
+    manager.add_audio_record("bucket", "train", "a.wav", "one", b"RIFF")
+    manager.add_audio_record("bucket", "train", "b.wav", "two", b"RIFF")
+    pending = _deltas(client)
+
+    assert manager.compact("bucket", "train") == 2
+    assert _deltas(client) == []
+    csv = pd.read_csv(BytesIO(client.objects[("bucket", "train/metadata.csv")]), dtype=str)
+    assert list(csv["file_name"]) == ["a.wav", "b.wav"]
+    manifest = client.user_meta[("bucket", "train/metadata.csv")]["X-Amz-Meta-folded-manifest"]
+    assert json.loads(client.objects[("bucket", f"train/_folded/{manifest}")]) == {"deltas": pending}
+    assert manager.compact("bucket", "train") == 0
+
+
+def test_folded_deltas_are_ignored_if_delete_failed(manager, client):
+    manager.add_audio_record("bucket", "train", "a.wav", "one", b"RIFF")
+    remove_objects = client.remove_objects
+    client.remove_objects = lambda bucket_name, objects_iter: iter(list(objects_iter)[:0])
+    manager.compact("bucket", "train")
+    manager.update_transcription("bucket", "train", "a.wav", "edited")
+
+    # The delta survived both rewrites and is still named as folded.
+    assert len(_deltas(client)) == 1
+    rows = manager.get_rows_metadata("bucket", "train", ["a.wav"])
+    assert rows[0]["transcription"] == "edited"
+
+    client.remove_objects = remove_objects
+    manager.compact("bucket", "train")
+    assert _deltas(client) == []
+    assert manager.get_rows_metadata("bucket", "train", ["a.wav"])[0]["transcription"] == "edited"
+
+
+def test_delta_landing_after_compaction_listed_is_kept(manager, client):
+    manager.add_audio_record("bucket", "train", "a.wav", "one", b"RIFF")
+    store = manager.store
+
+    # Writer A picks an older name, but its PUT lands only after the compactor
+    # has listed the prefix and just before its conditional PUT.
+    late = "train/_deltas/00000000000000000001-aaaaaaaa.jsonl"
+    payload = json.dumps({"op": "upsert", "row": {"file_name": "late.wav", "transcription": "late"}}).encode()
+    original = client.put_object_if_match
+
+    def racing_put(bucket_name, object_name, data, etag=None, **kwargs):
+        client.objects[(bucket_name, late)] = payload
+        return original(bucket_name, object_name, data, etag=etag, **kwargs)
+
+    client.put_object_if_match = racing_put
+    assert manager.compact("bucket", "train") == 1
+    client.put_object_if_match = original
+
+    assert _deltas(client) == [late]
+    assert store.version("bucket", "train").deltas == [late]
+    assert store.compact("bucket", "train") == 1
+    assert _deltas(client) == []
+    rows = manager.get_rows_metadata("bucket", "train", ["a.wav", "late.wav"])
+    assert sorted(r["file_name"] for r in rows) == ["a.wav", "late.wav"]
+
+
+def test_missing_split_raises_for_edits(manager):
+    with pytest.raises(FileNotFoundError):
+        manager.update_transcription("bucket", "nope", "a.wav", "x")
+    assert manager.get_dataset("bucket", "nope")["total"] == 0
+
+
+def test_conflicting_write_is_retried_on_fresh_read(manager, client):
+    manager.add_audio_record("bucket", "train", "a.wav", "one", b"RIFF")
+    manager.add_audio_record("bucket", "train", "b.wav", "two", b"RIFF")
+    manager.compact("bucket", "train")
+
+    original = client.put_object_if_match
+    raced = []
+
+    def racing_put(bucket_name, object_name, data, etag=None, **kwargs):
+        if not raced:
+            # Another annotator commits between our read and our write.
+            raced.append(True)
+            df = pd.read_csv(BytesIO(client.objects[(bucket_name, object_name)]), dtype=str,
+                             keep_default_na=False)
+            df.loc[df["file_name"] == "b.wav", "transcription"] = "theirs"
+            _put_csv(client, df)
+        return original(bucket_name, object_name, data, etag=etag, **kwargs)
+
+    client.put_object_if_match = racing_put
+    manager.update_transcription("bucket", "train", "a.wav", "mine")
+
+    rows = {r["file_name"]: r["transcription"] for r in manager.get_rows_metadata("bucket", "train", ["a.wav", "b.wav"])}
+    assert rows == {"a.wav": "mine", "b.wav": "theirs"}
+
+
+def test_queued_edits_are_committed_together(manager, client):
+    for i in range(3):
+        manager.add_audio_record("bucket", "train", f"{i}.wav", "x", b"RIFF")
+    manager.compact("bucket", "train")
+    store = manager.store
+
+    # Simulate two edits already waiting behind an in-flight rewrite.
+    key = ("bucket", "train")
+    futures = []
+    for i in (1, 2):
+        f = Future()
+        futures.append(f)
+
+        def mutate(df, i=i):
+            df.loc[df["file_name"] == f"{i}.wav", "transcription"] = f"edit {i}"
+            return df, i
+        store._edit_queues.setdefault(key, []).append((mutate, f))
+
+    puts_before = client.calls["put"]
+    manager.update_transcription("bucket", "train", "0.wav", "edit 0")
+
+    assert [f.result() for f in futures] == [1, 2]
+    assert client.calls["put"] == puts_before + 1
+    rows = manager.get_rows_metadata("bucket", "train", ["0.wav", "1.wav", "2.wav"])
+    assert sorted(r["transcription"] for r in rows) == ["edit 0", "edit 1", "edit 2"]
+
+
+def test_failed_edit_does_not_block_batch(manager):
+    manager.add_audio_record("bucket", "train", "a.wav", "one", b"RIFF")
+    with pytest.raises(ValueError):
+        manager.update_transcription("bucket", "train", "missing.wav", "x")
+    assert manager.update_transcription("bucket", "train", "a.wav", "two") is True
+
+
+# ---------------------------------------------------------------------------
+# Parallel transfers
+# ---------------------------------------------------------------------------
+
+
+def test_transfer_engine_retries_and_reports_failures():
+    attempts = {}
+
+    def flaky(item):
+        attempts[item] = attempts.get(item, 0) + 1
+        if item == "bad" or (item == "flaky" and attempts[item] == 1):
+            raise RuntimeError(f"boom {item}")
+        return 10
+
+    seen = []
+    report = TransferEngine(concurrency=4, retries=2, backoff_sec=0).run(
+        ["a", "flaky", "bad", "b"], flaky, progress=lambda done, total, nbytes: seen.append(done)
+    )
+
+    assert sorted(report.succeeded) == ["a", "b", "flaky"]
+    assert list(report.failed) == ["bad"]
+    assert attempts["bad"] == 3
+    assert report.bytes == 30
+    assert sorted(seen) == [1, 2, 3, 4]
+
+
+def test_clone_bucket_copies_audio_and_writes_metadata_once(manager, client):
+    df = pd.DataFrame({
+        "file_name": ["a.wav", "b.wav"],
+        "transcription": ["one", "two"],
+        "audio": ["s3://src/train/audio/a.wav", "s3://src/train/audio/b.wav"],
+    })
+    _put_csv(client, df, bucket="src")
+    client.objects[("src", "train/audio/a.wav")] = b"aaa"
+    client.objects[("src", "train/audio/b.wav")] = b"bbb"
+    manager.add_audio_record("src", "train", "c.wav", "three", b"ccc")
+
+    count = manager.clone_bucket("src", "dst")
+
+    assert count == 4  # three audio files + one metadata.csv
+    assert not [k for (b, k) in client.objects if b == "dst" and "_deltas/" in k]
+    cloned = pd.read_csv(BytesIO(client.objects[("dst", "train/metadata.csv")]), dtype=str)
+    assert list(cloned["file_name"]) == ["a.wav", "b.wav", "c.wav"]
+    assert all(a.startswith("s3://dst/") for a in cloned["audio"])
+
+
+def test_delete_rows_removes_audio_in_batches(manager, client):
+    _put_csv(client, pd.DataFrame({"file_name": ["a.wav", "b.wav"], "transcription": ["x", "y"]}))
+    client.objects[("bucket", "train/audio/a.wav")] = b"aaa"
+    client.objects[("bucket", "train/audio/b.wav")] = b"bbb"
+
+    assert manager.delete_rows("bucket", "train", ["a.wav"]) == 1
+    assert ("bucket", "train/audio/a.wav") not in client.objects
+    assert ("bucket", "train/audio/b.wav") in client.objects
+
+
+def test_bulk_upload_reports_per_file_status_and_skips_failed_rows(manager, client):
+    files = [
+        SimpleNamespace(filename=name, file=BytesIO(name.encode() * 100), size=None)
+        for name in ("a.wav", "b.wav", "c.wav")
+    ]
+    client.fail_puts = {"train/audio/b.wav"}
+    csv = b"file_name,transcription\na.wav,one\nb.wav,two\nc.wav,three\nold.wav,already there\n"
+
+    result = asyncio.run(manager.add_bulk_records("bucket", "train", files, csv))
+
+    assert result["count"] == 3
+    assert {f["file_name"]: f["status"] for f in result["files"]} == {
+        "a.wav": "uploaded", "b.wav": "failed", "c.wav": "uploaded",
+    }
+    assert result["uploaded_bytes"] == 1000
+    assert client.objects[("bucket", "train/audio/c.wav")] == b"c.wav" * 100
+    df, _ = manager._read_metadata("bucket", "train")
+    assert list(df["file_name"]) == ["a.wav", "c.wav", "old.wav"]
+
+
+# ---------------------------------------------------------------------------
+# Presigned URL cache
+# ---------------------------------------------------------------------------
+
+
+def test_presigned_urls_are_cached_until_near_expiry():
+    now = [1000.0]
+    batches = []
+
+    def sign(bucket, names, expires, request_date):
+        batches.append(list(names))
+        return [f"{bucket}/{n}?t={now[0]}" for n in names]
+
+    cache = PresignedUrlCache(sign, expiry_sec=3600, max_entries=2, clock=lambda: now[0])
+
+    first = cache.get_many("b", ["x", "y", "x"])
+    assert batches == [["x", "y"]]
+    assert first[0] == first[2]
+    assert cache.get_many("b", ["y", "x"]) == [first[1], first[0]]
+    assert len(batches) == 1
+
+    now[0] += 3600 - 300  # inside the refresh margin
+    assert cache.get_many("b", ["x"]) != [first[0]]
+    assert batches[-1] == ["x"]
+
+    cache.get_many("b", ["z"])  # evicts least recently used "y"
+    cache.get_many("b", ["y"])
+    assert batches[-1] == ["y"]
+
+
+# ---------------------------------------------------------------------------
+# Parquet metadata sidecar
+# ---------------------------------------------------------------------------
+
+
+def test_parquet_round_trip_types_known_columns():
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    from backend.mlops.metadata_format import read_parquet_bytes, to_parquet_bytes
+
+    df = pd.DataFrame({
+        "file_name": ["a.wav", "b.wav"],
+        "duration": ["1.5", ""],
+        "sample_rate": ["16000", "44100"],
+        "tags": ["x, y", ""],
+        "description": ["", "n/a"],
+    })
+    payload = to_parquet_bytes(df)
+
+    schema = pq.read_schema(BytesIO(payload))
+    assert str(schema.field("duration").type) == "double"
+    assert str(schema.field("sample_rate").type) == "int64"
+    assert str(schema.field("tags").type) == "list<element: string>"
+
+    back = read_parquet_bytes(payload)
+    assert back.to_dict("records") == [
+        {"file_name": "a.wav", "duration": "1.5", "sample_rate": "16000", "tags": "x, y", "description": ""},
+        {"file_name": "b.wav", "duration": "", "sample_rate": "44100", "tags": "", "description": "n/a"},
+    ]
+    only_names = read_parquet_bytes(payload, columns=["file_name"])
+    assert list(only_names.columns) == ["file_name"]
+
+
+def test_parquet_round_trip_matches_csv_reader_exactly():
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    from backend.mlops.metadata_format import read_csv_bytes, read_parquet_bytes, to_parquet_bytes
+
+    csv = (
+        "file_name,duration,confidence,sample_rate,tags\n"
+        "a.wav,12,0.850,16000,\"a, b\"\n"
+        "b.wav,1.5,0.9,44100,\"c,d\"\n"
+        "c.wav,,1e-3, 8000 ,\n"
+    ).encode("utf-8")
+    df = read_csv_bytes(csv)
+    payload = to_parquet_bytes(df)
+
+    # The typed schema is unchanged; only the lossy columns gain raw text.
+    schema = pq.read_schema(BytesIO(payload))
+    assert str(schema.field("duration").type) == "double"
+    assert str(schema.field("sample_rate").type) == "int64"
+    assert "__raw__file_name" not in schema.names
+    pd.testing.assert_frame_equal(read_parquet_bytes(payload), df)
+    pd.testing.assert_frame_equal(read_parquet_bytes(payload, columns=["tags", "duration"]),
+                                  df[["tags", "duration"]])
+    # Only the non-canonical cells are kept verbatim.
+    raw = pq.read_table(BytesIO(payload), columns=["__raw__duration"]).column(0).to_pylist()
+    assert raw == ["12", "1.5", None]
+
+
+def test_parquet_sidecar_of_canonical_writers_has_no_raw_columns():
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    from backend.mlops.audio_probe import AudioInfo
+    from backend.mlops.metadata_format import format_cell, read_parquet_bytes, to_parquet_bytes
+
+    rows = [
+        {
+            "file_name": f"{i}.wav",
+            **AudioInfo(duration=i * 1.2345, sample_rate=16000, channels=1, size_bytes=1000 + i).to_row(),
+            "confidence": format_cell("confidence", 0.1 * i),
+            "t_start_sec": format_cell("t_start_sec", 25.0 * i),
+            "t_end_sec": format_cell("t_end_sec", 25.0 * i + 24.987),
+            "tags": format_cell("tags", "a,b ,  c" if i else ""),
+        }
+        for i in range(4)
+    ]
+    df = pd.DataFrame(rows)
+    payload = to_parquet_bytes(df)
+
+    assert not [name for name in pq.read_schema(BytesIO(payload)).names if name.startswith("__raw__")]
+    assert df.loc[1, "tags"] == "a, b, c"
+    pd.testing.assert_frame_equal(read_parquet_bytes(payload), df.astype(object))
+
+
+def test_store_writes_parquet_sidecar_and_cache_prefers_it(manager, client, monkeypatch):
+    pytest.importorskip("pyarrow")
+    from backend.mlops import metadata_format
+
+    monkeypatch.setattr(metadata_format, "METADATA_FORMAT", "both")
+    _put_csv(client, pd.DataFrame({"file_name": ["a.wav"], "transcription": ["old"], "tags": [""]}))
+    manager.update_transcription("bucket", "train", "a.wav", "new", tags="t1,t2")
+
+    assert ("bucket", "train/metadata.parquet") in client.objects
+    csv_etag = client.stat_object("bucket", "train/metadata.csv").etag
+    assert metadata_format.fresh_parquet(client, "bucket", "train/metadata.csv", csv_etag)
+
+    # A cold cache reads the sidecar, not the CSV.
+    cache = MetadataCache(client)
+    reads = []
+    original_get = client.get_object
+    monkeypatch.setattr(client, "get_object", lambda b, k: reads.append(k) or original_get(b, k))
+    df, _ = cache.get("bucket", "train/metadata.csv")
+    assert reads == ["train/metadata.parquet"]
+    assert df.loc[0, "transcription"] == "new"
+    assert df.loc[0, "tags"] == "t1, t2"
+
+    # Once the CSV changes behind the sidecar's back, it is ignored.
+    _put_csv(client, pd.DataFrame({"file_name": ["a.wav"], "transcription": ["edited by hand"]}))
+    reads.clear()
+    df, _ = cache.get("bucket", "train/metadata.csv")
+    assert reads == ["train/metadata.csv"]
+    assert df.loc[0, "transcription"] == "edited by hand"
@@ -0,0 +1,75 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.job_manager import JobManager  # noqa: E402
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while job.to_dict()["status"] in ("pending", "running", "cancelling"):
+        assert time.time() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return job.to_dict()
+
+
+def test_job_reports_result_and_throughput():
+    manager = JobManager()
+
+    def work(ctx):
+        for i in range(1, 5):
+            ctx.progress(i, 4, i * 1024 * 1024)
+        return {"copied_count": 4}
+
+    status = _wait(manager.submit("copy", work))
+
+    assert status["status"] == "completed"
+    assert status["result"] == {"copied_count": 4}
+    assert (status["done"], status["total"], status["bytes"]) == (4, 4, 4 * 1024 * 1024)
+    assert status["eta_sec"] is None
+    assert manager.get(status["id"]) is not None
+
+
+def test_cancel_sets_event_and_marks_job_cancelled():
+    manager = JobManager()
+    started = threading.Event()
+
+    def work(ctx):
+        started.set()
+        while True:
+            ctx.check_cancelled()
+            time.sleep(0.01)
+
+    job = manager.submit("clone", work)
+    assert started.wait(5)
+    assert manager.cancel(job.id)
+
+    assert _wait(job)["status"] == "cancelled"
+    assert not manager.cancel(job.id)
+    assert not manager.cancel("missing")
+
+
+def test_failed_job_records_error():
+    manager = JobManager()
+
+    def work(ctx):
+        raise RuntimeError("bucket gone")
+
+    status = _wait(manager.submit("delete", work))
+    assert status["status"] == "error"
+    assert status["error"] == "bucket gone"
+
+
+def test_finished_jobs_are_pruned():
+    manager = JobManager(max_finished=2)
+    jobs = [manager.submit("copy", lambda ctx: None) for _ in range(3)]
+    for job in jobs:
+        _wait(job)
+    manager.submit("copy", lambda ctx: None)
+
+    assert manager.get(jobs[0].id) is None
@@ -0,0 +1,166 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.metadata_index import MetadataIndex, split_tags  # noqa: E402
+
+
+def _df(n: int = 5) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "file_name": [f"clip_{i}.wav" for i in range(n)],
+            "audio": [f"s3://bucket/train/audio/clip_{i}.wav" for i in range(n)],
+            "transcription": [f"第{i}句 Hello" for i in range(n)],
+            "tags": ["noisy, male" if i % 2 else "female" for i in range(n)],
+        }
+    )
+
+
+def test_split_tags_strips_and_drops_empty():
+    assert split_tags(" a, b ,,c ") == ["a", "b", "c"]
+    assert split_tags("") == []
+    assert split_tags(None) == []
+
+
+def test_query_paginates_in_csv_order(tmp_path):
+    index = MetadataIndex(str(tmp_path))
+    index.rebuild("bucket", "train", "etag-1", _df(5))
+
+    page = index.query("bucket", "train", page=2, limit=2)
+    assert page["total"] == 5
+    assert [r["file_name"] for r in page["data"]] == ["clip_2.wav", "clip_3.wav"]
+    # Missing columns are filled in so the UI can rely on them.
+    assert page["data"][0]["description"] == ""
+    assert page["unique_tags"] == ["female", "male", "noisy"]
+
+
+def test_query_search_matches_any_field_case_insensitively(tmp_path):
+    index = MetadataIndex(str(tmp_path))
+    index.rebuild("bucket", "train", "etag-1", _df(5))
+
+    assert index.query("bucket", "train", search="HELLO")["total"] == 5
+    assert index.query("bucket", "train", search="clip_3")["total"] == 1
+    assert index.query("bucket", "train", search="noisy")["total"] == 2
+    assert index.query("bucket", "train", search="第4句")["total"] == 1
+
+
+def test_ensure_only_reloads_when_version_changes(tmp_path):
+    index = MetadataIndex(str(tmp_path))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return _df(3)
+
+    index.ensure("bucket", "train", "etag-1", loader)
+    index.ensure("bucket", "train", "etag-1", loader)
+    assert len(calls) == 1
+    assert index.version("bucket", "train") == "etag-1"
+
+    index.ensure("bucket", "train", "etag-2", loader)
+    assert len(calls) == 2
+
+
+def test_index_files_do_not_use_raw_path_components(tmp_path):
+    index = MetadataIndex(str(tmp_path))
+    index.rebuild("bucket", "../../etc", "v", _df(1))
+    assert all(p.parent == tmp_path for p in tmp_path.iterdir())
+
+
+def test_query_syntax_phrase_prefix_and_tag_filter(tmp_path):
+    index = MetadataIndex(str(tmp_path))
+    df = pd.DataFrame(
+        {
+            "file_name": ["a.wav", "b.wav", "c.wav", "d.wav"],
+            "transcription": ["今天天氣很好", "good morning everyone", "say good night", "天氣預報"],
+            "tags": ["weather", "greeting, noisy", "greeting", "weather, noisy"],
+        }
+    )
+    index.rebuild("bucket", "train", "v", df)
+
+    def names(search):
+        return [r["file_name"] for r in index.query("bucket", "train", search=search)["data"]]
+
+    assert names("天氣") == ["a.wav", "d.wav"]
+    assert names("天") == ["a.wav", "d.wav"]
+    assert names('"good morning"') == ["b.wav"]
+    assert names("good night") == ["c.wav"]  # terms are ANDed
+    assert names("mor*") == ["b.wav"]
+    assert names("orn*") == []  # not at a word start
+    assert names("天氣*") == ["d.wav"]
+    assert names("tag:noisy") == ["b.wav", "d.wav"]
+    assert names("tag:noisy 天氣") == ["d.wav"]
+    assert names("tag:nois") == []
+
+
+def test_ensure_patches_changed_rows_without_rebuilding(tmp_path, monkeypatch):
+    index = MetadataIndex(str(tmp_path))
+    index.rebuild("bucket", "train", "v1", _df(4))
+
+    df = _df(4)
+    df.loc[1, "transcription"] = "早安 world"
+    df = df[df["file_name"] != "clip_2.wav"]
+    df = pd.concat([df, pd.DataFrame([{"file_name": "new.wav", "transcription": "晚安", "tags": "fresh"}])])
+    monkeypatch.setattr(index, "rebuild", lambda *a: pytest.fail("should not rebuild"))
+
+    index.ensure("bucket", "train", "v2", lambda: df.copy())
+
+    assert index.version("bucket", "train") == "v2"
+    page = index.query("bucket", "train")
+    assert [r["file_name"] for r in page["data"]] == ["clip_0.wav", "clip_1.wav", "clip_3.wav", "new.wav"]
+    assert index.query("bucket", "train", search="早安")["total"] == 1
+    assert index.query("bucket", "train", search="第1句")["total"] == 0
+    assert index.query("bucket", "train", search="clip_2")["total"] == 0
+    assert index.query("bucket", "train", search="tag:fresh")["total"] == 1
+    assert "fresh" in page["unique_tags"]
+
+
+def test_ensure_rebuilds_when_rows_are_reordered(tmp_path):
+    index = MetadataIndex(str(tmp_path))
+    index.rebuild("bucket", "train", "v1", _df(3))
+
+    index.ensure("bucket", "train", "v2", lambda: _df(3).iloc[::-1].reset_index(drop=True))
+
+    page = index.query("bucket", "train")
+    assert [r["file_name"] for r in page["data"]] == ["clip_2.wav", "clip_1.wav", "clip_0.wav"]
+
+
+def test_tag_counts_and_multi_tag_filters(tmp_path):
+    index = MetadataIndex(str(tmp_path))
+    df = pd.DataFrame(
+        {
+            "file_name": ["a.wav", "b.wav", "c.wav", "d.wav"],
+            "transcription": ["alpha", "beta", "gamma", "delta"],
+            "tags": ["male, noisy", "female", "male", "noisy, female, noisy"],
+        }
+    )
+    index.rebuild("bucket", "train", "v1", df)
+
+    def names(**kwargs):
+        return [r["file_name"] for r in index.query("bucket", "train", **kwargs)["data"]]
+
+    result = index.query("bucket", "train")
+    assert result["tag_counts"] == [
+        {"tag": "female", "count": 2},
+        {"tag": "male", "count": 2},
+        {"tag": "noisy", "count": 2},
+    ]
+    assert names(tags=["male", "noisy"]) == ["a.wav"]
+    assert names(tags=["male", "noisy"], tag_mode="or") == ["a.wav", "c.wav", "d.wav"]
+    assert names(tags=["female", "noisy"], tag_mode="or", search="delta") == ["d.wav"]
+
+    df.loc[2, "tags"] = "female"
+    df = df[df["file_name"] != "a.wav"]
+    index.ensure("bucket", "train", "v2", lambda: df.copy())
+
+    assert index.query("bucket", "train")["tag_counts"] == [
+        {"tag": "female", "count": 3},
+        {"tag": "noisy", "count": 1},
+    ]
+    assert names(tags=["male"]) == []
@@ -0,0 +1,282 @@
+import json
+import os
+import sys
+import threading
+import wave
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+pytest.importorskip("librosa")
+pytest.importorskip("soundfile")
+
+import backend.mlops.audio_chunker as audio_chunker  # noqa: E402
+from backend.scripts import preprocess_long_audio as pla  # noqa: E402
+from backend.tests.test_audio_chunker import scripted_transcriber, timed_audio  # noqa: E402
+from backend.services.metadata_store import MetadataStore  # noqa: E402
+from backend.tests.test_dataset_manager import FakeMinio  # noqa: E402
+
+
+class RawFakeMinio(FakeMinio):
+    """The script talks to a raw `minio.Minio`, whose copy_object takes a CopySource."""
+
+    def copy_object(self, bucket_name, object_name, source):
+        self.objects[(bucket_name, object_name)] = self.objects[(source.bucket_name, source.object_name)]
+
+
+def _wav(seconds: float, sr: int = 16000) -> bytes:
+    buf = BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(b"\x00\x00" * int(seconds * sr))
+    return buf.getvalue()
+
+
+def _args(**overrides) -> pla.CliArgs:
+    values = dict(
+        source_bucket="src", target_bucket="dst", minio_endpoint="", minio_access_key="",
+        minio_secret_key="", minio_secure=False, splits=["train"], max_chunk_sec=25.0,
+        min_chunk_sec=1.0, confidence_threshold=0.7, whisper_model="small", language="zh",
+    )
+    values.update(overrides)
+    return pla.CliArgs(**values)
+
+
+def test_short_files_are_copied_server_side_without_download():
+    client = RawFakeMinio()
+    client.objects[("src", "train/audio/a.wav")] = _wav(3.0)
+    client.objects[("src", "train/audio/b.mp3")] = b"\xff\xfb" + b"\x00" * 5000
+    metadata = pd.DataFrame({
+        "file_name": ["a.wav", "b.mp3"],
+        "transcription": [" 你好 ", "再見"],
+        "duration": ["", "4.2"],  # mp3 has no parseable header, but metadata knows
+    })
+    client.objects[("src", "train/metadata.csv")] = metadata.to_csv(index=False).encode("utf-8")
+
+    pla.process_split(_args(), client, "train", whisper_model=None)
+
+    assert client.objects[("dst", "train/audio/a.wav")] == client.objects[("src", "train/audio/a.wav")]
+    assert ("dst", "train/audio/b.mp3") in client.objects
+    # Only metadata.csv, the (absent) manifest and one ranged header read of a.wav.
+    assert client.calls["get"] == 3
+    assert client.calls["ranged_bytes"] <= 4096
+    out = pd.read_csv(BytesIO(client.objects[("dst", "train/metadata.csv")]), dtype=str, keep_default_na=False)
+    assert out["file_name"].tolist() == ["a.wav", "b.mp3"]
+    assert out["audio"].tolist() == ["s3://dst/train/audio/a.wav", "s3://dst/train/audio/b.mp3"]
+    assert out["transcription"].tolist() == ["你好", "再見"]
+    assert out["duration"].tolist() == ["3.000", "4.2"]
+
+
+def test_pipeline_keeps_row_order_and_runs_inference_on_one_thread(monkeypatch):
+    inference_threads = set()
+
+    def fake_chunk(audio, sr, gt, **kwargs):
+        inference_threads.add(threading.get_ident())
+        half = len(audio) // 2
+        return [
+            pla.ChunkResult(0.0, half / sr, gt[:1], gt[:1], 1.0, audio[:half], sr),
+            pla.ChunkResult(half / sr, len(audio) / sr, gt[1:], "", 0.1, audio[half:], sr),
+        ]
+
+    monkeypatch.setattr(pla, "chunk_long_audio", fake_chunk)
+    client = RawFakeMinio()
+    names = [f"long{i}.wav" for i in range(6)]
+    for name in names:
+        client.objects[("src", f"train/audio/{name}")] = _wav(30.0)
+    client.objects[("src", "train/audio/short.wav")] = _wav(2.0)
+    metadata = pd.DataFrame({"file_name": names[:3] + ["short.wav"] + names[3:],
+                             "transcription": ["ab"] * 7})
+    # Probe stats of the source files, which must not leak into their chunks.
+    long_rows = metadata["file_name"] != "short.wav"
+    metadata.loc[long_rows, ["duration", "sample_rate", "channels", "size_bytes"]] = ["3600.000", "44100", "2", "999"]
+    metadata = metadata.fillna("")
+    client.objects[("src", "train/metadata.csv")] = metadata.to_csv(index=False).encode("utf-8")
+
+    pla.process_split(_args(download_workers=3, upload_workers=2, queue_size=2), client, "train", None)
+
+    assert inference_threads == {threading.get_ident()}
+    out = pd.read_csv(BytesIO(client.objects[("dst", "train/metadata.csv")]), dtype=str, keep_default_na=False)
+    expected = [f"long{i}_part01.wav" for i in range(3)] + ["short.wav"] + [f"long{i}_part01.wav" for i in range(3, 6)]
+    assert out["file_name"].tolist() == expected
+    chunk = out.set_index("file_name").loc["long0_part01.wav"]
+    assert chunk[["duration", "sample_rate", "channels"]].tolist() == ["15.000", "16000", "1"]
+    assert chunk["size_bytes"] == str(len(client.objects[("dst", "train/audio/long0_part01.wav")]))
+    low = pd.read_csv(BytesIO(client.objects[("dst", "train/low_confidence.csv")]), dtype=str, keep_default_na=False)
+    assert low["file_name"].tolist() == [f"long{i}_part02.wav" for i in range(6)]
+    assert all(("dst", f"train/audio/long{i}_part02.wav") in client.objects for i in range(6))
+
+
+def test_interrupted_run_resumes_from_manifest(monkeypatch):
+    calls = []
+
+    def chunker(fail_after):
+        def fake_chunk(audio, sr, gt, **kwargs):
+            if len(calls) == fail_after:
+                raise SystemExit("killed")
+            calls.append(gt)
+            return [pla.ChunkResult(0.0, len(audio) / sr, gt, gt, 0.9, audio[:sr], sr)]
+        return fake_chunk
+
+    client = RawFakeMinio()
+    names = [f"long{i}.wav" for i in range(5)]
+    for name in names:
+        client.objects[("src", f"train/audio/{name}")] = _wav(30.0)
+    metadata = pd.DataFrame({"file_name": names, "transcription": [f"t{i}" for i in range(5)]})
+    client.objects[("src", "train/metadata.csv")] = metadata.to_csv(index=False).encode("utf-8")
+    args = _args(download_workers=1, upload_workers=1, queue_size=1, checkpoint_interval_sec=0.0)
+
+    monkeypatch.setattr(pla, "chunk_long_audio", chunker(fail_after=3))
+    with pytest.raises(SystemExit):
+        pla.process_split(args, client, "train", None)
+    assert ("dst", "train/metadata.csv") not in client.objects
+    manifest = json.loads(client.objects[("dst", f"train/{pla.MANIFEST_NAME}")])
+    checkpointed = set(manifest["files"])
+    assert checkpointed and checkpointed < set(names)
+
+    # Restart: checkpointed rows come from the manifest, only the rest are chunked.
+    calls.clear()
+    monkeypatch.setattr(pla, "chunk_long_audio", chunker(fail_after=None))
+    pla.process_split(args, client, "train", None)
+
+    assert sorted(calls) == [f"t{i}" for i, name in enumerate(names) if name not in checkpointed]
+    out = pd.read_csv(BytesIO(client.objects[("dst", "train/metadata.csv")]), dtype=str, keep_default_na=False)
+    assert out["transcription"].tolist() == [f"t{i}" for i in range(5)]
+
+
+def test_rerun_only_chunks_new_or_changed_rows(monkeypatch):
+    calls = []
+
+    def fake_chunk(audio, sr, gt, **kwargs):
+        calls.append(gt)
+        parts = 1 if gt.startswith("one") else 2
+        step = len(audio) // parts
+        return [pla.ChunkResult(i * step / sr, (i + 1) * step / sr, gt, gt, 0.9, audio[i * step:(i + 1) * step], sr)
+                for i in range(parts)]
+
+    monkeypatch.setattr(pla, "chunk_long_audio", fake_chunk)
+    client = RawFakeMinio()
+    for name in ("a.wav", "b.wav", "c.wav"):
+        client.objects[("src", f"train/audio/{name}")] = _wav(30.0)
+
+    def source(rows):
+        df = pd.DataFrame(rows, columns=["file_name", "transcription"])
+        client.objects[("src", "train/metadata.csv")] = df.to_csv(index=False).encode("utf-8")
+
+    source([("a.wav", "two a"), ("b.wav", "two b"), ("c.wav", "two c")])
+    pla.process_split(_args(), client, "train", None)
+    assert len(calls) == 3
+    # Someone fixes a chunk transcript in the target bucket after the run.
+    out = pd.read_csv(BytesIO(client.objects[("dst", "train/metadata.csv")]), dtype=str, keep_default_na=False)
+    out.loc[out["file_name"] == "a_part01.wav", "transcription"] = "edited"
+    client.objects[("dst", "train/metadata.csv")] = out.to_csv(index=False).encode("utf-8")
+
+    # b's transcript changes, c is dropped, d is new.
+    client.objects[("src", "train/audio/d.wav")] = _wav(30.0)
+    calls.clear()
+    source([("a.wav", "two a"), ("b.wav", "one b"), ("d.wav", "two d")])
+    pla.process_split(_args(), client, "train", None)
+
+    assert sorted(calls) == ["one b", "two d"]
+    out = pd.read_csv(BytesIO(client.objects[("dst", "train/metadata.csv")]), dtype=str, keep_default_na=False)
+    assert out["file_name"].tolist() == ["a_part01.wav", "a_part02.wav", "b.wav", "d_part01.wav", "d_part02.wav"]
+    assert out["transcription"].tolist()[:3] == ["edited", "two a", "one b"]
+    # Chunks the old b and c produced are gone.
+    audio = {key for bucket, key in client.objects if bucket == "dst" and key.startswith("train/audio/")}
+    assert audio == {f"train/audio/{name}" for name in out["file_name"]}
+
+
+def test_workers_shard_rows_across_processes(monkeypatch):
+    def fake_chunk(audio, sr, gt, whisper_model=None, **kwargs):
+        return [pla.ChunkResult(0.0, len(audio) / sr, f"{gt}|{os.getpid()}|{whisper_model}", gt, 0.9, audio[:sr], sr)]
+
+    client = RawFakeMinio()
+    names = [f"long{i}.wav" for i in range(5)]
+    for name in names:
+        client.objects[("src", f"train/audio/{name}")] = _wav(30.0)
+    metadata = pd.DataFrame({"file_name": names, "transcription": [f"t{i}" for i in range(5)]})
+    client.objects[("src", "train/metadata.csv")] = metadata.to_csv(index=False).encode("utf-8")
+    # Forked workers inherit the patched module; uploads land in their copy of the fake.
+    monkeypatch.setattr(pla, "SHARD_START_METHOD", "fork")
+    monkeypatch.setattr(pla, "_make_minio_client", lambda args: client)
+    monkeypatch.setattr(pla, "load_whisper_model", lambda size, cpu_threads=0: f"threads={cpu_threads}")
+    monkeypatch.setattr(pla, "chunk_long_audio", fake_chunk)
+    monkeypatch.setattr(pla.os, "cpu_count", lambda: 8)
+
+    pla.process_split(_args(workers=2), client, "train", None)
+
+    out = pd.read_csv(BytesIO(client.objects[("dst", "train/metadata.csv")]), dtype=str, keep_default_na=False)
+    parts = [t.split("|") for t in out["transcription"]]
+    assert [p[0] for p in parts] == [f"t{i}" for i in range(5)]
+    pids = {p[1] for p in parts}
+    assert len(pids) == 2 and str(os.getpid()) not in pids
+    assert {p[2] for p in parts} == {"threads=4"}
+    manifest = json.loads(client.objects[("dst", f"train/{pla.MANIFEST_NAME}")])
+    assert set(manifest["files"]) == set(names)
+
+
+def test_long_file_is_streamed_and_chunks_uploaded(monkeypatch, tmp_path):
+    import soundfile as sf
+
+    gt = "".join(chr(0x4E00 + i) for i in range(200))
+    sentences = [(4 * k + 0.2, 4 * k + 3.8, gt[4 * k:4 * k + 4]) for k in range(50)]
+    monkeypatch.setattr(audio_chunker, "_transcribe", scripted_transcriber(sentences))
+    monkeypatch.setattr(pla, "chunk_long_audio", None)  # must not decode the file whole
+    monkeypatch.setattr(pla.tempfile, "tempdir", str(tmp_path))
+    buf = BytesIO()
+    sf.write(buf, timed_audio(200.0), 16000, format="WAV", subtype="FLOAT")
+    client = RawFakeMinio()
+    client.objects[("src", "train/audio/long.wav")] = buf.getvalue()
+    metadata = pd.DataFrame({"file_name": ["long.wav"], "transcription": [gt]})
+    client.objects[("src", "train/metadata.csv")] = metadata.to_csv(index=False).encode("utf-8")
+
+    pla.process_split(_args(stream_above_sec=60.0), client, "train", None)
+
+    out = pd.read_csv(BytesIO(client.objects[("dst", "train/metadata.csv")]), dtype=str, keep_default_na=False)
+    assert out["file_name"].tolist() == [f"long_part{i:02d}.wav" for i in range(1, 10)]
+    assert "".join(out["transcription"]) == gt
+    chunk = sf.read(BytesIO(client.objects[("dst", "train/audio/long_part02.wav")]))[0]
+    assert abs(len(chunk) / 16000 - 23.6) < 0.01
+    assert list(tmp_path.iterdir()) == []  # spooled download removed
+
+
+def test_rerun_merges_into_target_metadata(monkeypatch):
+    def fake_chunk(audio, sr, gt, **kwargs):
+        half = len(audio) // 2
+        return [pla.ChunkResult(0.0, half / sr, gt, gt, 0.9, audio[:half], sr),
+                pla.ChunkResult(half / sr, len(audio) / sr, gt, gt, 0.9, audio[half:], sr)]
+
+    monkeypatch.setattr(pla, "chunk_long_audio", fake_chunk)
+    client = RawFakeMinio()
+    client.objects[("src", "train/audio/a.wav")] = _wav(30.0)
+
+    def source(transcript):
+        df = pd.DataFrame({"file_name": ["a.wav"], "transcription": [transcript]})
+        client.objects[("src", "train/metadata.csv")] = df.to_csv(index=False).encode("utf-8")
+
+    source("first")
+    pla.process_split(_args(), client, "train", None)
+
+    # After the run: a file uploaded to the target directly (still a pending
+    # delta) and an edit folded into metadata.csv by the backend's store.
+    store = MetadataStore(client)
+    store.append("dst", "train", [{"op": "upsert", "row": {"file_name": "upload.wav", "transcription": "up"}}])
+    store.append("dst", "train", [{"op": "upsert", "row": {"file_name": "manual.wav", "transcription": "m"}}])
+    store.compact("dst", "train")
+    store.append("dst", "train", [{"op": "upsert", "row": {"file_name": "late.wav", "transcription": "late"}}])
+
+    source("second")
+    pla.process_split(_args(), client, "train", None)
+
+    df, version = MetadataStore(client).load("dst", "train")
+    assert version.deltas == []  # the pending delta was folded, not re-applied later
+    assert sorted(df["file_name"]) == ["a_part01.wav", "a_part02.wav", "late.wav", "manual.wav", "upload.wav"]
+    rows = df.set_index("file_name")["transcription"]
+    assert rows["a_part01.wav"] == "second" and rows["late.wav"] == "late"
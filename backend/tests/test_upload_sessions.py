@@ -0,0 +1,110 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from backend.services.metadata_store import MetadataStore  # noqa: E402
+from backend.services.upload_sessions import (  # noqa: E402
+    UploadSessionError,
+    UploadSessionManager,
+    UploadSessionNotFound,
+)
+from backend.tests.test_dataset_manager import FakeMinio  # noqa: E402
+
+
+class MultipartFakeMinio(FakeMinio):
+    def __init__(self):
+        super().__init__()
+        self.uploads = {}  # upload_id -> {part_number: bytes}
+
+    def create_multipart_upload(self, bucket_name, object_name, content_type="application/octet-stream"):
+        upload_id = f"up-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return upload_id
+
+    def upload_part(self, bucket_name, object_name, upload_id, part_number, data):
+        self.uploads[upload_id][part_number] = data
+        return self._etag(data)
+
+    def list_parts(self, bucket_name, object_name, upload_id):
+        parts = self.uploads[upload_id]
+        return [(n, self._etag(parts[n]), len(parts[n])) for n in sorted(parts)]
+
+    def complete_multipart_upload(self, bucket_name, object_name, upload_id, parts):
+        stored = self.uploads.pop(upload_id)
+        self.objects[(bucket_name, object_name)] = b"".join(stored[n] for n, _etag in parts)
+
+    def abort_multipart_upload(self, bucket_name, object_name, upload_id):
+        self.uploads.pop(upload_id)
+
+
+PART = 5 * 1024 * 1024
+CSV = b"file_name,transcription\na.wav,one\nempty.wav,none\n"
+
+
+@pytest.fixture
+def client():
+    return MultipartFakeMinio()
+
+
+@pytest.fixture
+def sessions(client):
+    return UploadSessionManager(client, MetadataStore(client), part_size=PART)
+
+
+def _fresh(client):
+    """Simulate a backend restart: state must come back from the bucket."""
+    return UploadSessionManager(client, MetadataStore(client), part_size=PART)
+
+
+def test_session_resumes_after_restart_and_commits_metadata_once(sessions, client):
+    audio = bytes(range(256)) * (PART * 2 // 256) + b"tail"
+    status = sessions.init("bucket", "train", [
+        {"file_name": "a.wav", "size": len(audio)},
+        {"file_name": "empty.wav", "size": 0},
+    ], CSV)
+    session_id = status["session_id"]
+    assert [f["parts"] for f in status["files"]] == [3, 0]
+
+    sessions.upload_part("bucket", session_id, "a.wav", 1, audio[:PART])
+    with pytest.raises(UploadSessionError):
+        sessions.commit("bucket", session_id)
+
+    resumed = _fresh(client)
+    assert resumed.status("bucket", session_id)["files"][0]["uploaded_parts"] == [1]
+    resumed.upload_part("bucket", session_id, "a.wav", 3, audio[2 * PART:])
+    resumed.upload_part("bucket", session_id, "a.wav", 2, audio[PART:2 * PART])
+
+    assert resumed.commit("bucket", session_id) == {"count": 2, "files": 2}
+    assert client.objects[("bucket", "train/audio/a.wav")] == audio
+    assert client.objects[("bucket", "train/audio/empty.wav")] == b""
+    assert not [k for (_b, k) in client.objects if k.startswith("_uploads/")]
+    deltas = [k for (_b, k) in client.objects if "/_deltas/" in k]
+    assert len(deltas) == 1
+    df, _ = MetadataStore(client).load("bucket", "train")
+    assert list(df["file_name"]) == ["a.wav", "empty.wav"]
+
+
+def test_parts_are_validated(sessions):
+    session_id = sessions.init("bucket", "train", [{"file_name": "a.wav", "size": PART + 10}], CSV)["session_id"]
+
+    with pytest.raises(UploadSessionError):
+        sessions.upload_part("bucket", session_id, "a.wav", 2, b"short")
+    with pytest.raises(UploadSessionError):
+        sessions.upload_part("bucket", session_id, "a.wav", 3, b"x" * 10)
+    with pytest.raises(UploadSessionError):
+        sessions.upload_part("bucket", session_id, "other.wav", 1, b"x")
+
+
+def test_abort_discards_session(sessions, client):
+    session_id = sessions.init("bucket", "train", [{"file_name": "a.wav", "size": 10}], CSV)["session_id"]
+    sessions.abort("bucket", session_id)
+
+    assert client.uploads == {}
+    with pytest.raises(UploadSessionNotFound):
+        _fresh(client).status("bucket", session_id)
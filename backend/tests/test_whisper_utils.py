@@ -0,0 +1,33 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("datasets")
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from datasets import Audio  # noqa: E402
+
+from backend.mlops.whisper_utils import load_split_metadata  # noqa: E402
+
+
+def test_csv_metadata_with_probe_columns_loads_training_columns(tmp_path):
+    csv = tmp_path / "metadata.csv"
+    csv.write_text(
+        "file_name,audio,transcription,tags,description,duration,sample_rate,channels,size_bytes\n"
+        "a.wav,s3://bucket/train/audio/a.wav,hello,\"x, y\",,1.000,8000,1,16044\n"
+        "b.wav,s3://bucket/train/audio/b.wav,world,,,,,,\n",
+        encoding="utf-8",
+    )
+
+    ds = load_split_metadata("csv", str(csv)).cast_column("audio", Audio(decode=False))
+    rows = list(ds)
+
+    assert [sorted(row) for row in rows] == [["audio", "file_name", "transcription"]] * 2
+    assert rows[0]["transcription"] == "hello"
+    assert rows[1]["audio"]["path"] == "s3://bucket/train/audio/b.wav"
@@ -62,6 +62,9 @@ const App = () => {
     const [limit, setLimit] = useState(50);
     const [data, setData] = useState([]);
     const [uniqueTags, setUniqueTags] = useState([]);
+    const [tagCounts, setTagCounts] = useState([]);
+    const [filterTags, setFilterTags] = useState([]);
+    const [tagMode, setTagMode] = useState('and');
     const [totalItems, setTotalItems] = useState(0);
     const [loading, setLoading] = useState(false);
     const [searchTerm, setSearchTerm] = useState("");
@@ -129,6 +132,8 @@ const App = () => {
                     page,
                     limit,
                     search: debouncedSearchTerm, // Send search param
+                    tags: filterTags.length ? filterTags.join(',') : undefined,
+                    tag_mode: tagMode,
                     t: Date.now()
                 }
             });
@@ -136,6 +141,7 @@ const App = () => {
                 setData(res.data.data);
                 setTotalItems(res.data.total);
                 setUniqueTags(res.data.unique_tags || []);
+                setTagCounts(res.data.tag_counts || []);
             } else {
                 setData(res.data);
                 setTotalItems(res.data.length);
@@ -153,12 +159,12 @@ const App = () => {
             // Persist
             localStorage.setItem('minio_bucket', bucket);
         }
-    }, [split, page, limit, bucket, apiBaseUrl, debouncedSearchTerm]); // Added limit dependency
+    }, [split, page, limit, bucket, apiBaseUrl, debouncedSearchTerm, filterTags, tagMode]); // Added limit dependency
 
-    // Reset page when split changes
+    // Reset page when split or tag filter changes
     useEffect(() => {
         setPage(1);
-    }, [split]);
+    }, [split, filterTags, tagMode]);
 
     const handleUpdate = async (fileName, newText, newTags, newDescription) => {
         await axios.post(`${apiBaseUrl}/dataset/row`, {
@@ -231,16 +237,29 @@ const App = () => {
         setIsBucketSelectionOpen(false);
     }
 
+    // Clone / copy / delete run as background jobs; poll until they finish.
+    const waitForJob = async (jobId) => {
+        while (true) {
+            const res = await axios.get(`${apiBaseUrl}/jobs/${jobId}`);
+            const job = res.data;
+            if (job.status === 'completed') return job.result;
+            if (job.status === 'cancelled') throw new Error('Job was cancelled');
+            if (job.status === 'error') throw new Error(job.error || 'Job failed');
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    };
+
     const handleBatchDelete = async () => {
         if (!confirm(`Are you sure you want to delete ${selectedIds.length} items? This cannot be undone.`)) return;
 
         try {
             setLoading(true);
-            await axios.post(`${apiBaseUrl}/dataset/batch/delete`, {
+            const res = await axios.post(`${apiBaseUrl}/dataset/batch/delete`, {
                 bucket_name: bucket,
                 split: split,
                 file_names: selectedIds
             });
+            await waitForJob(res.data.job_id);
             alert("Items deleted successfully.");
             setSelectedIds([]);
             await fetchData();
@@ -298,7 +317,8 @@ const App = () => {
                 split: split,
                 file_names: selectedIds
             });
-            alert(`Successfully copied ${res.data.copied_count} items to ${targetBucket}`);
+            const result = await waitForJob(res.data.job_id);
+            alert(`Successfully copied ${result.copied_count} items to ${targetBucket}`);
             setSelectedIds([]);
         } catch (err) {
             alert("Batch copy failed: " + (err.response?.data?.detail || err.message));
@@ -335,13 +355,28 @@ const App = () => {
         }
     };
 
+    const handleProbeAudio = async () => {
+        try {
+            setLoading(true);
+            const res = await axios.post(`${apiBaseUrl}/dataset/${bucket}/${split}/probe`);
+            const result = await waitForJob(res.data.job_id);
+            alert(`Probed ${result.probed} file(s); ${result.unknown_format} in formats without a readable header, ${result.missing_audio} missing.`);
+            await fetchData();
+        } catch (err) {
+            alert("Audio probe failed: " + err.message);
+        } finally {
+            setLoading(false);
+        }
+    };
+
     const handleCloneBucket = async (newBucketName) => {
         try {
             const res = await axios.post(`${apiBaseUrl}/buckets/clone`, {
                 source_bucket: bucket,
                 new_bucket_name: newBucketName
             });
-            alert(res.data.message);
+            const result = await waitForJob(res.data.job_id);
+            alert(`Cloned ${result.cloned_count} objects to ${newBucketName}`);
             // Update available buckets if not exists
             setAvailableBuckets(prev => {
                 if (prev.includes(newBucketName)) return prev;
@@ -425,6 +460,11 @@ const App = () => {
                     <TableToolbar
                         searchTerm={searchTerm}
                         setSearchTerm={setSearchTerm}
+                        tagCounts={tagCounts}
+                        filterTags={filterTags}
+                        setFilterTags={setFilterTags}
+                        tagMode={tagMode}
+                        setTagMode={setTagMode}
                         selectedCount={selectedIds.length}
                         onBatchDelete={handleBatchDelete}
                         onBatchTag={() => setIsBatchTagOpen(true)}
@@ -432,6 +472,7 @@ const App = () => {
                         onBatchDownload={handleBatchDownload}
                         onUploadClick={() => setIsUploadOpen(true)}
                         onBulkUploadClick={() => setIsBulkUploadOpen(true)}
+                        onProbeAudio={handleProbeAudio}
                     />
 
                     {/* Content Area */}
@@ -51,6 +51,13 @@ const TableRow = ({ row, bucket, split, onUpdate, availableTags, selected, onSel
             </td>
             <td className="p-4 font-mono text-sm text-slate-400">
                 {row.file_name}
+                {row.duration && (
+                    <div className="text-xs text-slate-500">
+                        {Number(row.duration).toFixed(1)}s
+                        {row.sample_rate && ` · ${Number(row.sample_rate) / 1000}kHz`}
+                        {row.channels && row.channels !== "1" && ` · ${row.channels}ch`}
+                    </div>
+                )}
             </td>
             <td className="p-4 w-1/3">
                 <input
@@ -1,16 +1,22 @@
 import React from 'react';
-import { Search, Trash2, Tag, Database, Upload, FileAudio, Download } from 'lucide-react';
+import { Search, Trash2, Tag, Database, Upload, FileAudio, Download, Activity } from 'lucide-react';
 
 const TableToolbar = ({
     searchTerm,
     setSearchTerm,
+    tagCounts = [],
+    filterTags = [],
+    setFilterTags,
+    tagMode = 'and',
+    setTagMode,
     selectedCount,
     onBatchDelete,
     onBatchTag,
     onBatchCopy,
     onBatchDownload,
     onUploadClick,
-    onBulkUploadClick
+    onBulkUploadClick,
+    onProbeAudio
 }) => {
     return (
         <div className="p-4 flex items-center justify-between gap-4">
@@ -18,13 +24,45 @@ const TableToolbar = ({
                 <Search size={18} className="text-slate-500" />
                 <input
                     type="text"
-                    placeholder="Search files, transcriptions, tags..."
+                    placeholder='Search... ("phrase", prefix*, tag:name)'
                     value={searchTerm}
                     onChange={(e) => setSearchTerm(e.target.value)}
                     className="bg-transparent border-none outline-none text-slate-200 placeholder-slate-500 text-sm w-full"
                 />
             </div>
 
+            {tagCounts.length > 0 && (
+                <div className="flex items-center gap-2 flex-wrap">
+                    <select
+                        value=""
+                        onChange={(e) => e.target.value && setFilterTags([...filterTags, e.target.value])}
+                        className="bg-slate-800 border border-slate-700 text-slate-300 text-sm rounded-lg px-2 py-2"
+                    >
+                        <option value="">Filter by tag...</option>
+                        {tagCounts.filter(t => !filterTags.includes(t.tag)).map(t => (
+                            <option key={t.tag} value={t.tag}>{t.tag} ({t.count})</option>
+                        ))}
+                    </select>
+                    {filterTags.map(tag => (
+                        <button
+                            key={tag}
+                            onClick={() => setFilterTags(filterTags.filter(t => t !== tag))}
+                            className="flex items-center gap-1 bg-indigo-600/20 text-indigo-300 px-2 py-1 rounded-lg text-xs border border-indigo-500/20"
+                        >
+                            <Tag size={12} /> {tag} ×
+                        </button>
+                    ))}
+                    {filterTags.length > 1 && (
+                        <button
+                            onClick={() => setTagMode(tagMode === 'and' ? 'or' : 'and')}
+                            className="bg-slate-700 hover:bg-slate-600 text-slate-200 px-2 py-1 rounded-lg text-xs uppercase"
+                        >
+                            {tagMode}
+                        </button>
+                    )}
+                </div>
+            )}
+
             <div className="flex items-center gap-2">
                 {selectedCount > 0 && (
                     <div className="flex items-center gap-2 mr-2 animate-in fade-in slide-in-from-right-4 duration-300">
@@ -55,6 +93,13 @@ const TableToolbar = ({
                     </div>
                 )}
                 <div className="h-6 w-px bg-slate-700 mx-2" />
+                <button
+                    onClick={onProbeAudio}
+                    title="Read duration / sample rate from audio headers for rows that lack them"
+                    className="flex items-center gap-2 bg-slate-800 hover:bg-slate-700 text-slate-300 px-3 py-2 rounded-lg transition-all text-sm border border-slate-700"
+                >
+                    <Activity size={16} /> Probe Audio
+                </button>
                 <button
                     onClick={onUploadClick}
                     className="flex items-center gap-2 bg-indigo-600 hover:bg-indigo-500 text-white px-4 py-2 rounded-lg shadow-lg shadow-indigo-500/20 transition-all text-sm font-medium"
@@ -9,11 +9,77 @@ const BulkUploadModal = ({ isOpen, onClose, bucket, split, onUploadComplete, api
 
     if (!isOpen) return null;
 
+    // Large selections go through a resumable upload session: files are sent
+    // in parts, and a retry after a dropped connection only re-sends the
+    // parts the server does not have yet.
+    const CHUNKED_THRESHOLD = 50 * 1024 * 1024;
+
+    const uploadWithSession = async () => {
+        const sessionKey = `upload_session:${bucket}:${split}:` +
+            Array.from(audioFiles).map(f => `${f.name}:${f.size}`).join('|');
+        const params = { bucket };
+
+        let status = null;
+        const savedId = localStorage.getItem(sessionKey);
+        if (savedId) {
+            try {
+                status = (await axios.get(`${apiBaseUrl}/upload/sessions/${savedId}`, { params })).data;
+            } catch {
+                localStorage.removeItem(sessionKey);
+            }
+        }
+        if (!status) {
+            status = (await axios.post(`${apiBaseUrl}/upload/sessions`, {
+                bucket,
+                split,
+                files: Array.from(audioFiles).map(f => ({ file_name: f.name, size: f.size })),
+                metadata_csv: await csvFile.text(),
+            })).data;
+            localStorage.setItem(sessionKey, status.session_id);
+        }
+
+        const filesByName = Object.fromEntries(Array.from(audioFiles).map(f => [f.name, f]));
+        for (const entry of status.files) {
+            const file = filesByName[entry.file_name];
+            const done = new Set(entry.uploaded_parts);
+            for (let part = 1; part <= entry.parts; part++) {
+                if (done.has(part)) continue;
+                const start = (part - 1) * status.part_size;
+                await axios.put(
+                    `${apiBaseUrl}/upload/sessions/${status.session_id}/parts`,
+                    file.slice(start, start + status.part_size),
+                    {
+                        params: { ...params, file_name: entry.file_name, part_number: part },
+                        headers: { 'Content-Type': 'application/octet-stream' },
+                    }
+                );
+            }
+        }
+
+        const res = await axios.post(`${apiBaseUrl}/upload/sessions/${status.session_id}/commit`, null, { params });
+        localStorage.removeItem(sessionKey);
+        alert(`Successfully uploaded ${res.data.count} records.`);
+    };
+
     const handleSubmit = async (e) => {
         e.preventDefault();
         if (!csvFile || audioFiles.length === 0) return;
 
         setIsUploading(true);
+        const totalSize = Array.from(audioFiles).reduce((sum, f) => sum + f.size, 0);
+        if (totalSize >= CHUNKED_THRESHOLD) {
+            try {
+                await uploadWithSession();
+                onUploadComplete();
+                onClose();
+            } catch (err) {
+                alert("Bulk upload interrupted (submit again to resume): " + (err.response?.data?.detail || err.message));
+            } finally {
+                setIsUploading(false);
+            }
+            return;
+        }
+
         const formData = new FormData();
         formData.append('bucket', bucket);
         formData.append('split', split);
@@ -30,7 +96,9 @@ const BulkUploadModal = ({ isOpen, onClose, bucket, split, onUploadComplete, api
                     'Content-Type': 'multipart/form-data'
                 }
             });
-            alert(`Successfully uploaded ${res.data.count} records.`);
+            const failed = (res.data.files || []).filter(f => f.status === 'failed');
+            alert(`Successfully uploaded ${res.data.count} records (${res.data.mb_per_sec} MB/s).` +
+                (failed.length ? `\nFailed: ${failed.map(f => f.file_name).join(', ')}` : ''));
             onUploadComplete();
             onClose();
         } catch (err) {